@@ -2,6 +2,8 @@ import csv
 import math
 from pathlib import Path
 
+from annotation.registry import annotator_names
+
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 ANNOTATIONS_DIR = ROOT_DIR / "data" / "annotations"
@@ -15,7 +17,7 @@ EMOTION_COLUMNS = [
     "fear",
     "sadness",
 ]
-MODEL_NAMES = ["deepseek", "gemini", "mistral"]
+MODEL_NAMES = annotator_names()
 
 
 def _load_rows(path: Path) -> list[dict]:
@@ -44,9 +46,9 @@ def _cosine_similarity(xs: list[float], ys: list[float]) -> float:
     return numerator / (x_norm * y_norm)
 
 
-def run(fold_number) -> dict:
+def run(fold_number, fold_dir: Path | None = None) -> dict:
     issues = []
-    fold_dir = ANNOTATIONS_DIR / f"fold_{fold_number}"
+    fold_dir = fold_dir or ANNOTATIONS_DIR / f"fold_{fold_number}"
     model_rows = {}
     for model_name in MODEL_NAMES:
         path = fold_dir / f"{model_name}.csv"
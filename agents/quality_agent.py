@@ -2,6 +2,9 @@ import csv
 import json
 from pathlib import Path
 
+from annotation.registry import annotator_names
+from evaluation.fold_users import fold_test_users
+
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 USER_RESPONSES_PATH = ROOT_DIR / "data" / "user_emotion_responses.json"
@@ -17,21 +20,20 @@ EMOTION_COLUMNS = [
     "fear",
     "sadness",
 ]
-MODEL_NAMES = ["deepseek", "gemini", "mistral"]
+MODEL_NAMES = annotator_names()
 
 
-def _load_expected_song_count(fold_number: int) -> tuple[int | None, list[str]]:
-    if not USER_FOLDS_PATH.exists():
-        return None, [f"Missing fold assignments: {USER_FOLDS_PATH.relative_to(ROOT_DIR)}"]
+def _load_expected_song_count(fold_number: int, user_folds_path: Path) -> tuple[int | None, list[str]]:
+    if not user_folds_path.exists():
+        return None, [f"Missing fold assignments: {user_folds_path.relative_to(ROOT_DIR)}"]
 
-    with USER_FOLDS_PATH.open("r", encoding="utf-8") as handle:
+    with user_folds_path.open("r", encoding="utf-8") as handle:
         fold_assignments = json.load(handle)
 
-    fold_info = fold_assignments.get("folds", {}).get(str(fold_number))
-    if not fold_info:
-        return None, [f"Fold {fold_number} not found in {USER_FOLDS_PATH.relative_to(ROOT_DIR)}"]
+    if str(fold_number) not in fold_assignments.get("folds", {}):
+        return None, [f"Fold {fold_number} not found in {user_folds_path.relative_to(ROOT_DIR)}"]
 
-    test_users = set(fold_info.get("test_users", []))
+    test_users = fold_test_users(fold_assignments, fold_number)
     with USER_RESPONSES_PATH.open("r", encoding="utf-8") as handle:
         raw_data = json.load(handle)
 
@@ -85,12 +87,12 @@ def _check_csv(path: Path, expected_rows: int) -> list[str]:
     return issues
 
 
-def run(fold_number) -> dict:
-    expected_rows, issues = _load_expected_song_count(fold_number)
+def run(fold_number, fold_dir: Path | None = None, user_folds_path: Path = USER_FOLDS_PATH) -> dict:
+    expected_rows, issues = _load_expected_song_count(fold_number, user_folds_path)
     if expected_rows is None:
         return {"agent": "quality", "status": "fail", "issues": issues, "fold": fold_number}
 
-    fold_dir = ANNOTATIONS_DIR / f"fold_{fold_number}"
+    fold_dir = fold_dir or ANNOTATIONS_DIR / f"fold_{fold_number}"
     for model_name in MODEL_NAMES:
         issues.extend(_check_csv(fold_dir / f"{model_name}.csv", expected_rows))
 
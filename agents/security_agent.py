@@ -59,9 +59,10 @@ def _check_file(path: Path, issues: list[str]) -> None:
         issues.append(f"Prompt injection phrase found in {path.relative_to(ROOT_DIR)}")
 
 
-def _iter_default_files(fold_number: int) -> list[Path]:
+def _iter_default_files(fold_number: int, fold_dir: Path | None = None) -> list[Path]:
     files = []
-    for directory in [AGENTS_DIR, ANNOTATION_DIR, SECTIONS_DIR, DATA_ANNOTATIONS_DIR / f"fold_{fold_number}"]:
+    fold_dir = fold_dir or DATA_ANNOTATIONS_DIR / f"fold_{fold_number}"
+    for directory in [AGENTS_DIR, ANNOTATION_DIR, SECTIONS_DIR, fold_dir]:
         if directory.exists():
             files.extend(
                 sorted(
@@ -88,12 +89,12 @@ def _check_annotations_tree(issues: list[str]) -> None:
             issues.append(f"Disallowed file in data/annotations: {path.relative_to(ROOT_DIR)}")
 
 
-def run(fold_number, files_to_check=None) -> dict:
+def run(fold_number, files_to_check=None, fold_dir: Path | None = None) -> dict:
     issues = []
     if files_to_check:
         paths = [ROOT_DIR / relative_path for relative_path in files_to_check]
     else:
-        paths = _iter_default_files(fold_number)
+        paths = _iter_default_files(fold_number, fold_dir)
 
     for path in paths:
         _check_file(path, issues)
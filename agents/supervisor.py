@@ -20,23 +20,38 @@ def _record_agent_result(results: list[dict], agent_result: dict) -> None:
     results.append(agent_result)
 
 
-def run(fold_number) -> dict:
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+def run(
+    fold_number,
+    fold_dir: Path | None = None,
+    user_folds_path: Path | None = None,
+    report_path: Path | None = None,
+) -> dict:
+    """Run the agents on a fold's annotation CSVs.
+
+    The defaults check the manual workflow's fold; re-folds pass their own
+    fold directory, fold assignment file and report path.
+    """
+    report_path = report_path or REPORTS_DIR / f"fold_{fold_number}_report.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
 
     results = []
-    security_result = security_agent.run(fold_number)
+    security_result = security_agent.run(fold_number, fold_dir=fold_dir)
     _record_agent_result(results, security_result)
     _record_agent_result(results, _inline_self_check(fold_number))
 
     if security_result["status"] == "pass":
-        quality_result = quality_agent.run(fold_number)
+        quality_result = quality_agent.run(
+            fold_number,
+            fold_dir=fold_dir,
+            user_folds_path=user_folds_path or quality_agent.USER_FOLDS_PATH,
+        )
         _record_agent_result(results, quality_result)
         _record_agent_result(results, _inline_self_check(fold_number))
     else:
         quality_result = None
 
     if quality_result and quality_result["status"] == "pass":
-        consistency_result = consistency_agent.run(fold_number)
+        consistency_result = consistency_agent.run(fold_number, fold_dir=fold_dir)
         _record_agent_result(results, consistency_result)
         _record_agent_result(results, _inline_self_check(fold_number))
 
@@ -47,7 +62,6 @@ def run(fold_number) -> dict:
         "agents": results,
     }
 
-    report_path = REPORTS_DIR / f"fold_{fold_number}_report.json"
     report_path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
 
     if overall != "pass":
@@ -1,9 +1,33 @@
-import csv
+import asyncio
+import os
 from pathlib import Path
 
+import numpy as np
+
 from agents import supervisor
-from annotation.llm_clients import call_deepseek, call_gemini, call_mistral
-from annotation.prompt_builder import build_prompt
+from annotation.batch_jobs import RESULTS_FILENAME, ingest_batch_results, job_dir, write_batch_requests
+from annotation.llm_clients import (
+    build_scheduler,
+    cached_response,
+    call_model_async,
+    call_model_batch_async,
+    close_async_openrouter_clients,
+    get_run_mode,
+    persist_hedge_stats,
+    preferred_endpoint,
+)
+from annotation.mock_annotator import annotate_matrix_with_mock
+from annotation.pool import (
+    append_pool_rows,
+    ensure_pool_is_current,
+    harvest_fold_annotations,
+    load_pool,
+    write_pool_view,
+)
+from annotation.prompt_builder import AnnotationRequest
+from annotation.registry import annotator_names
+from annotation.scheduler import AsyncScheduler
+from annotation.telemetry import new_run_id
 
 
 EMOTION_ORDER = [
@@ -17,65 +41,258 @@ EMOTION_ORDER = [
     "sadness",
 ]
 
-OUTPUT_MODELS = {
-    "deepseek": call_deepseek,
-    "gemini": call_gemini,
-    "mistral": call_mistral,
-}
+OUTPUT_MODELS = annotator_names()
+# Songs packed into one request; 1 keeps the single-song prompt.
+ANNOTATION_BATCH_SIZE = int(os.environ.get("ANNOTATION_BATCH_SIZE", "1"))
+# "batch_job" writes pending prompts to a JSONL job instead of calling the providers interactively.
+ANNOTATION_MODES = ["interactive", "batch_job"]
+ANNOTATION_MODE = os.environ.get("ANNOTATION_MODE", "interactive")
+
+
+async def run_annotation_tasks(
+    tasks: list[AnnotationRequest],
+    on_result,
+    batch_size: int | None = None,
+    scheduler: AsyncScheduler | None = None,
+    run_id: str | None = None,
+) -> list[str]:
+    """Fan out annotation requests through the per-provider scheduler.
+
+    With batch_size > 1 each model's songs are sent in batches; songs a batch
+    did not answer validly are split in halves and retried, down to the
+    single-song prompt. on_result(filename, model_name, row) runs on the event
+    loop as each answer arrives, so rows are saved in completion order. A
+    failed call does not cancel the others; failures are returned once every
+    task has finished. A configuration error (e.g. a missing API key) stops
+    the run instead and is raised. Cache hits are served without going
+    through the scheduler, and mock runs are not rate limited. scheduler
+    defaults to one for every registered annotator, run_id to a new one.
+    """
+    batch_size = ANNOTATION_BATCH_SIZE if batch_size is None else batch_size
+    scheduler = scheduler or build_scheduler(OUTPUT_MODELS)
+    run_id = run_id or new_run_id()
+    failures = []
+
+    def save(request: AnnotationRequest, result: dict, endpoint: str) -> None:
+        row = {
+            "filename": request.filename,
+            **{emotion: result[emotion] for emotion in EMOTION_ORDER},
+            "endpoint": endpoint,
+        }
+        on_result(request.filename, request.model, row)
+
+    async def run_one(request: AnnotationRequest) -> None:
+        trace = {"run_id": run_id, "songs": [request.filename]}
+        answer = cached_response(request, trace=trace)
+        if answer is None:
+
+            def attempt_call(attempt: int, endpoint: str):
+                return call_model_async(
+                    request,
+                    trace={**trace, "attempt": attempt},
+                    endpoint=endpoint,
+                    scheduler=scheduler,
+                )
 
+            try:
+                answer = await scheduler.run(request.model, attempt_call)
+            except Exception as exc:
+                if scheduler.abort_error is None:
+                    failures.append(f"{request.model} on {request.filename}: {exc}")
+                    print(f"  - {request.model}: failed on {request.filename} ({exc})")
+                return
+        save(request, *answer)
 
-def _intended_emotion_from_filename(filename: str) -> str:
-    parts = filename.replace("\\", "/").split("/")
-    if len(parts) > 1:
-        return parts[0]
-    return "unknown"
+    async def run_batch(requests: list[AnnotationRequest]) -> None:
+        if not requests:
+            return
+        if len(requests) == 1:
+            await run_one(requests[0])
+            return
 
+        model_name = requests[0].model
+        pending = []
+        for request in requests:
+            trace = {"run_id": run_id, "songs": [request.filename]}
+            cached = cached_response(request, batched=True, trace=trace)
+            if cached is not None:
+                save(request, *cached)
+            else:
+                pending.append(request)
+        if not pending:
+            return
 
-def _load_existing_filenames(path: Path) -> set[str]:
-    if not path.exists():
-        return set()
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        return {row["filename"] for row in csv.DictReader(handle)}
+        trace = {"run_id": run_id, "songs": [request.filename for request in pending]}
+        try:
+            results, errors, endpoint = await scheduler.run(
+                model_name,
+                lambda attempt, endpoint: call_model_batch_async(
+                    pending,
+                    trace={**trace, "attempt": attempt},
+                    endpoint=endpoint,
+                    scheduler=scheduler,
+                ),
+            )
+        except Exception as exc:
+            if scheduler.abort_error is not None:
+                return
+            results, errors, endpoint = {}, {request.filename: str(exc) for request in pending}, None
+        for request in pending:
+            if request.filename in results:
+                save(request, results[request.filename], endpoint)
+
+        retry = [request for request in pending if request.filename in errors]
+        if retry:
+            print(f"  - {model_name}: retrying {len(retry)} of {len(requests)} batched songs")
+            middle = (len(retry) + 1) // 2
+            await asyncio.gather(run_batch(retry[:middle]), run_batch(retry[middle:]))
+
+    if batch_size > 1:
+        by_model = {}
+        for request in tasks:
+            by_model.setdefault(request.model, []).append(request)
+        jobs = [
+            run_batch(requests[start:start + batch_size])
+            for requests in by_model.values()
+            for start in range(0, len(requests), batch_size)
+        ]
+    else:
+        jobs = [run_one(request) for request in tasks]
+
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        await close_async_openrouter_clients()
+    for model_name, stats in scheduler.stats().items():
+        if stats["requests"]:
+            print(f"[scheduler] {model_name}: {stats}")
+    persist_hedge_stats()
+    if scheduler.abort_error is not None:
+        raise scheduler.abort_error
+    return failures
+
+
+def _missing_pool_tasks(songs: list[dict], pools: dict) -> list[AnnotationRequest]:
+    return [
+        AnnotationRequest.from_song(song, model_name)
+        for song in songs
+        for model_name in OUTPUT_MODELS
+        if song["filename"] not in pools[model_name]
+    ]
 
 
-def _append_row(path: Path, row: dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fieldnames = ["filename", *EMOTION_ORDER]
-    write_header = not path.exists()
-    with path.open("a", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+def _annotate_pool_songs_with_bulk_mock(songs: list[dict], pools: dict, requested: dict) -> None:
+    """Mock mode: answer every missing (song, model) pair in one vectorised pass.
 
+    Skips the per-call client path (scheduler, response cache and telemetry);
+    the answers match annotate_with_mock for the same song.
+    """
+    missing = [song for song in songs if any(song["filename"] not in pools[name] for name in OUTPUT_MODELS)]
+    if not missing:
+        return
+    song_keys = [song["filename"] for song in missing]
+    ground_truth = np.array([[float(song[emotion]) for emotion in EMOTION_ORDER] for song in missing])
+    predictions = annotate_matrix_with_mock(ground_truth, list(OUTPUT_MODELS), song_keys)
 
-def annotate_songs(songs: list[dict], fold_number: int) -> None:
+    for model_name, values in predictions.items():
+        endpoint = preferred_endpoint(model_name)
+        rows = [
+            {"filename": song_key, **dict(zip(EMOTION_ORDER, row.tolist())), "endpoint": endpoint}
+            for song_key, row in zip(song_keys, values)
+            if song_key not in pools[model_name]
+        ]
+        append_pool_rows(model_name, rows)
+        pools[model_name].update({row["filename"]: row for row in rows})
+        requested[model_name] += len(rows)
+        print(f"[pool] {model_name}: annotated {len(rows)} songs with the bulk mock")
+
+
+def annotate_pool_songs(songs: list[dict]) -> dict:
+    """Annotate only the (song, model) pairs missing from the global annotation pool."""
+    ensure_pool_is_current()
+    pools = {model_name: load_pool(model_name) for model_name in OUTPUT_MODELS}
+    requested = {model_name: 0 for model_name in OUTPUT_MODELS}
+    if get_run_mode() == "mock":
+        _annotate_pool_songs_with_bulk_mock(songs, pools, requested)
+        return requested
+    tasks = _missing_pool_tasks(songs, pools)
+
+    def save(filename: str, model_name: str, row: dict) -> None:
+        append_pool_rows(model_name, [row])
+        pools[model_name][filename] = row
+        requested[model_name] += 1
+        print(f"[pool] {model_name}: annotated {filename}")
+
+    failures = asyncio.run(run_annotation_tasks(tasks, save))
+    if failures:
+        raise RuntimeError(f"{len(failures)} pool annotation call(s) failed; rerun to retry them: {failures}")
+    return requested
+
+
+def annotate_pool_songs_via_batch_job(songs: list[dict], fold_number: int) -> None:
+    """Two-phase annotation through the fold's batch job.
+
+    Ingests any results already saved for the job, then writes the pairs still
+    missing from the pool as a request file and stops. Once the job has run
+    out-of-band, rerunning the fold ingests its results and continues.
+    """
+    path = job_dir(fold_number)
+    if (path / RESULTS_FILENAME).exists():
+        summary = ingest_batch_results(path)
+        print(f"[batch job] fold {fold_number}: {summary}")
+
+    ensure_pool_is_current()
+    tasks = _missing_pool_tasks(songs, {model_name: load_pool(model_name) for model_name in OUTPUT_MODELS})
+    if tasks:
+        requests_path = write_batch_requests(path, tasks)
+        raise RuntimeError(
+            f"{len(tasks)} annotation request(s) for fold {fold_number} were written to {requests_path}. "
+            f"Run them as a batch job, save the output as {path / RESULTS_FILENAME} and rerun the fold."
+        )
+
+
+def annotate_songs(songs: list[dict], fold_number: int) -> dict:
+    """Fill the global pool for this fold's songs, then write the fold CSVs as views of it.
+
+    Returns, per model, which songs were already pooled, which were requested
+    and the endpoint that answered each row.
+    """
     output_dir = Path("data/annotations") / f"fold_{fold_number}"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    existing_by_model = {
-        model_name: _load_existing_filenames(output_dir / f"{model_name}.csv")
-        for model_name in OUTPUT_MODELS
-    }
-
-    total = len(songs)
-    for index, song in enumerate(songs, start=1):
-        filename = song["filename"]
-        ground_truth = {emotion: float(song[emotion]) for emotion in EMOTION_ORDER}
-        intended_emotion = song.get("intended_emotion") or _intended_emotion_from_filename(filename)
-        prompt = build_prompt(filename, intended_emotion, ground_truth)
-
-        print(f"[fold {fold_number}] Processing {index}/{total}: {filename}")
-        for model_name, caller in OUTPUT_MODELS.items():
-            if filename in existing_by_model[model_name]:
-                print(f"  - {model_name}: skipped (already saved)")
-                continue
-
-            result = caller(prompt)
-            row = {"filename": filename, **{emotion: result[emotion] for emotion in EMOTION_ORDER}}
-            _append_row(output_dir / f"{model_name}.csv", row)
-            existing_by_model[model_name].add(filename)
-            print(f"  - {model_name}: saved")
+    harvest_fold_annotations(list(OUTPUT_MODELS))
+    pooled_before = {model_name: set(load_pool(model_name)) for model_name in OUTPUT_MODELS}
+    song_keys = [song["filename"] for song in songs]
+    missing_pairs = sum(
+        song_key not in pooled_before[model_name] for song_key in song_keys for model_name in OUTPUT_MODELS
+    )
+    print(
+        f"[fold {fold_number}] {missing_pairs} annotation calls queued, "
+        f"{len(song_keys) * len(OUTPUT_MODELS) - missing_pairs} reused from the pool"
+    )
+    if ANNOTATION_MODE not in ANNOTATION_MODES:
+        raise ValueError(f"Unknown annotation mode '{ANNOTATION_MODE}'. Expected one of: {ANNOTATION_MODES}.")
+    if ANNOTATION_MODE == "batch_job":
+        annotate_pool_songs_via_batch_job(songs, fold_number)
+    else:
+        annotate_pool_songs(songs)
+
+    pool_usage = {}
+    for model_name in OUTPUT_MODELS:
+        pool = load_pool(model_name)
+        write_pool_view(output_dir / f"{model_name}.csv", model_name, song_keys, pool=pool)
+        reused = [song_key for song_key in song_keys if song_key in pooled_before[model_name]]
+        pool_usage[model_name] = {
+            "reused_count": len(reused),
+            "requested_count": len(song_keys) - len(reused),
+            "reused_songs": reused,
+            # Rows harvested from older fold CSVs predate routing and have no endpoint.
+            "row_endpoints": {
+                song_key: pool[song_key].get("endpoint") or "unknown"
+                for song_key in song_keys
+                if song_key in pool
+            },
+        }
 
     try:
         report = supervisor.run(fold_number)
@@ -84,3 +301,4 @@ def annotate_songs(songs: list[dict], fold_number: int) -> None:
 
     if report.get("overall") != "pass":
         raise RuntimeError(f"Annotation supervisor reported failure for fold {fold_number}: {report}")
+    return pool_usage
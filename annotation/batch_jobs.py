@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from annotation.llm_clients import (
+    DECODING_PARAMS,
+    call_model,
+    get_run_mode,
+    parse_answer_content,
+    preferred_endpoint,
+)
+from annotation.pool import EMOTION_ORDER, append_pool_rows, ensure_pool_is_current, load_pool, pool_identity
+from annotation.prompt_builder import DEFAULT_PROMPT_VARIANT, AnnotationRequest
+from evaluation.utils import read_json, utc_now, write_json
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BATCH_JOBS_DIR = ROOT_DIR / "state" / "batch_jobs"
+REQUESTS_FILENAME = "requests.jsonl"
+RESULTS_FILENAME = "results.jsonl"
+JOB_FILENAME = "job.json"
+# Request lines follow the OpenAI-compatible batch format so the file can be uploaded as is.
+BATCH_REQUEST_URL = "/v1/chat/completions"
+
+
+def job_dir(fold_number: int) -> Path:
+    """One job directory per fold; mock and live jobs are kept apart like the pool."""
+    return BATCH_JOBS_DIR / get_run_mode() / f"fold_{fold_number}"
+
+
+def custom_id(model_name: str, filename: str, prompt: str) -> str:
+    """Stable id for a (song, model) prompt, so results stay valid across rewrites of the request file."""
+    digest = hashlib.sha256(f"{model_name}\n{filename}\n{prompt}".encode("utf-8")).hexdigest()
+    return f"ann-{digest[:24]}"
+
+
+def _load_job(path: Path) -> dict:
+    return read_json(path / JOB_FILENAME, default=None) or {"run_mode": get_run_mode(), "entries": {}}
+
+
+def _read_jsonl(path: Path) -> list[tuple[int, str]]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        return [(line_number, line) for line_number, line in enumerate(handle, start=1) if line.strip()]
+
+
+def write_batch_requests(path: Path, requests: list[AnnotationRequest]) -> Path:
+    """Phase one: write the pending annotation requests as a batch request file.
+
+    The request file is rewritten with only the requests given; job.json keeps
+    every id ever issued for the job, with the request inputs, so late results
+    from an earlier submission still ingest.
+    """
+    job = _load_job(path)
+    lines = []
+    for request in requests:
+        endpoint = preferred_endpoint(request.model)
+        request_id = custom_id(request.model, request.filename, request.prompt)
+        job["entries"][request_id] = {
+            "model": request.model,
+            "endpoint": endpoint,
+            "filename": request.filename,
+            "intended_emotion": request.intended_emotion,
+            "ground_truth": request.ground_truth,
+            "prompt_variant": request.variant,
+        }
+        lines.append(
+            {
+                "custom_id": request_id,
+                "method": "POST",
+                "url": BATCH_REQUEST_URL,
+                "body": {
+                    "model": endpoint,
+                    "messages": request.messages,
+                    **DECODING_PARAMS,
+                },
+            }
+        )
+
+    path.mkdir(parents=True, exist_ok=True)
+    requests_path = path / REQUESTS_FILENAME
+    with requests_path.open("w", encoding="utf-8") as handle:
+        for line in lines:
+            handle.write(json.dumps(line, sort_keys=True) + "\n")
+    job["requests_written_at"] = utc_now()
+    job["pending_requests"] = len(lines)
+    write_json(path / JOB_FILENAME, job)
+    return requests_path
+
+
+def _result_answer(result: dict, endpoint: str) -> dict:
+    if result.get("error"):
+        raise ValueError(f"{endpoint} batch request failed: {result['error']}")
+    response = result.get("response") or {}
+    if response.get("status_code", 200) != 200:
+        raise ValueError(f"{endpoint} batch request returned HTTP {response['status_code']}.")
+
+    choices = (response.get("body") or {}).get("choices") or []
+    return parse_answer_content(choices[0].get("message", {}).get("content") if choices else "", endpoint)
+
+
+def ingest_batch_results(path: Path, results_path: Path | None = None) -> dict:
+    """Phase two: validate a results file and append every valid answer to the pool.
+
+    Idempotent and resumable: answers already in the pool are skipped and each
+    row is appended as soon as it validates, so an interrupted ingest can be
+    rerun on the same or a longer results file. Failed lines stay pending and
+    are written again by the next phase one. Answers to requests written for
+    another prompt variant than the pool's are refused.
+    """
+    results_path = results_path or path / RESULTS_FILENAME
+    job = _load_job(path)
+    ensure_pool_is_current()
+    pool_variant = pool_identity().get("prompt_variant")
+    pools = {}
+    summary = {"ingested": 0, "already_pooled": 0, "unknown_ids": 0, "failed": {}}
+
+    for line_number, line in _read_jsonl(results_path):
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            summary["failed"][f"line {line_number}"] = "malformed JSON line"
+            continue
+        entry = job["entries"].get(result.get("custom_id"))
+        if entry is None:
+            summary["unknown_ids"] += 1
+            continue
+
+        model_name = entry["model"]
+        pool = pools.setdefault(model_name, load_pool(model_name))
+        if entry["filename"] in pool:
+            summary["already_pooled"] += 1
+            continue
+        variant = entry.get("prompt_variant", DEFAULT_PROMPT_VARIANT)
+        if pool_variant not in {None, variant}:
+            summary["failed"][result["custom_id"]] = (
+                f"requested with prompt variant {variant}, but the pool holds {pool_variant} answers"
+            )
+            continue
+        try:
+            answer = _result_answer(result, entry["endpoint"])
+        except ValueError as exc:
+            summary["failed"][result["custom_id"]] = str(exc)
+            continue
+
+        row = {
+            "filename": entry["filename"],
+            **{emotion: answer[emotion] for emotion in EMOTION_ORDER},
+            "endpoint": entry["endpoint"],
+        }
+        append_pool_rows(model_name, [row])
+        pool[entry["filename"]] = row
+        summary["ingested"] += 1
+
+    job["last_ingest"] = {**summary, "results_path": str(results_path), "ingested_at": utc_now()}
+    if job["entries"]:
+        write_json(path / JOB_FILENAME, job)
+    return summary
+
+
+def process_batch_locally(path: Path, limit: int | None = None) -> int:
+    """Stand-in for a provider batch API: answer pending requests with the mock annotator.
+
+    Appends to results.jsonl and skips ids that already have a valid result;
+    limit leaves the rest pending to exercise partial results.
+    """
+    job = _load_job(path)
+    if job["run_mode"] != "mock":
+        raise RuntimeError("The local batch processor only answers mock jobs; submit live jobs to the provider.")
+    if not (path / REQUESTS_FILENAME).exists():
+        raise RuntimeError(f"No batch requests in {path}. Run the fold with ANNOTATION_MODE=batch_job first.")
+
+    results_path = path / RESULTS_FILENAME
+    answered = set()
+    for _, line in _read_jsonl(results_path):
+        try:
+            result = json.loads(line)
+            entry = job["entries"][result["custom_id"]]
+            _result_answer(result, entry["endpoint"])
+        except (json.JSONDecodeError, KeyError, ValueError):
+            continue
+        answered.add(result["custom_id"])
+    processed = 0
+    with results_path.open("a", encoding="utf-8") as handle:
+        for _, line in _read_jsonl(path / REQUESTS_FILENAME):
+            if limit is not None and processed >= limit:
+                break
+            request = json.loads(line)
+            if request["custom_id"] in answered:
+                continue
+            entry = job["entries"][request["custom_id"]]
+            answer = call_model(
+                AnnotationRequest(
+                    entry["model"],
+                    entry["filename"],
+                    entry["intended_emotion"],
+                    entry["ground_truth"],
+                    # Jobs written before prompt variants all used the default layout.
+                    variant=entry.get("prompt_variant", DEFAULT_PROMPT_VARIANT),
+                )
+            )
+            body = {
+                "model": request["body"]["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": json.dumps(answer)},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+            result = {
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": body},
+                "error": None,
+            }
+            handle.write(json.dumps(result, sort_keys=True) + "\n")
+            processed += 1
+    return processed
+
+
+def job_status(path: Path) -> dict:
+    job = _load_job(path)
+    pools = {}
+    pending = 0
+    for entry in job["entries"].values():
+        pool = pools.setdefault(entry["model"], load_pool(entry["model"]))
+        pending += entry["filename"] not in pool
+    return {
+        "job_dir": str(path),
+        "run_mode": job["run_mode"],
+        "issued": len(job["entries"]),
+        "pending": pending,
+        "last_ingest": job.get("last_ingest"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process, ingest or inspect fold annotation batch jobs")
+    parser.add_argument("command", choices=["process", "ingest", "status"])
+    parser.add_argument("--fold", type=int, required=True, help="Fold whose batch job to use")
+    parser.add_argument("--results", type=Path, help="Results JSONL to ingest (default: the job's results.jsonl)")
+    parser.add_argument("--limit", type=int, help="Answer at most this many requests (process only)")
+    args = parser.parse_args()
+
+    path = job_dir(args.fold)
+    if args.command == "process":
+        print(f"Answered {process_batch_locally(path, limit=args.limit)} request(s) into {path / RESULTS_FILENAME}")
+    elif args.command == "ingest":
+        print(json.dumps(ingest_batch_results(path, args.results), indent=2))
+    else:
+        print(json.dumps(job_status(path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
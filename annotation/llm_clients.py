@@ -1,8 +1,17 @@
+import asyncio
 import json
 import os
-import re
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
 
+from annotation import response_cache, telemetry
 from annotation.mock_annotator import annotate_with_mock
+from annotation.prompt_builder import DEFAULT_PROMPT_VARIANT, AnnotationRequest, build_batch_messages
+from annotation.routing import ROUTER, routable_endpoints
+from annotation.scheduler import AsyncScheduler, classify_error
 
 try:
     import streamlit as st
@@ -12,6 +21,33 @@ except ImportError:  # pragma: no cover - optional at CLI runtime
 
 USE_MOCK = False
 
+# Point at annotation/standin_server.py (e.g. http://127.0.0.1:8765/v1) for offline load tests.
+# Any other base URL runs in "standin" mode, with its own cache entries, telemetry tag and pool.
+DEFAULT_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", DEFAULT_OPENROUTER_BASE_URL)
+OPENROUTER_TIMEOUT_SECONDS = float(os.environ.get("OPENROUTER_TIMEOUT_SECONDS", "60"))
+OPENROUTER_MAX_RETRIES = int(os.environ.get("OPENROUTER_MAX_RETRIES", "2"))
+OPENROUTER_MAX_CONNECTIONS = int(os.environ.get("OPENROUTER_MAX_CONNECTIONS", "32"))
+# Extra chat.completions parameters; part of the response cache key.
+DECODING_PARAMS = {}
+# Batched answers are cached per song under the single-song prompt plus this marker.
+BATCH_CACHE_PARAMS = {"prompt_mode": "batch"}
+
+# Hedging: duplicate a live call still running after the observed p90 latency.
+HEDGING_ENABLED = os.environ.get("LLM_HEDGING", "0") == "1"
+HEDGE_QUANTILE = 0.9
+HEDGE_MIN_SAMPLES = 20
+HEDGE_LATENCY_WINDOW = 200
+# Extra requests allowed, as a fraction of primary requests per endpoint.
+HEDGE_BUDGET_FRACTION = 0.1
+HEDGE_STATS_PATH = Path(__file__).resolve().parent.parent / "state" / "hedging_stats.json"
+
+# One keep-alive client per API key, shared by every thread; async clients are
+# additionally tied to the event loop that owns their connections.
+_SYNC_CLIENTS = {}
+_ASYNC_CLIENTS = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
 EMOTION_ORDER = [
     "amusement",
     "anger",
@@ -25,22 +61,9 @@ EMOTION_ORDER = [
 
 
 def get_run_mode() -> str:
-    return "mock" if USE_MOCK else "live"
-
-
-def _extract_ground_truth_from_prompt(prompt: str) -> dict:
-    values = {}
-    for emotion in EMOTION_ORDER:
-        match = re.search(rf"{emotion}=([0-9]*\.?[0-9]+)", prompt)
-        if not match:
-            raise ValueError(f"Malformed prompt: missing score for '{emotion}'.")
-        values[emotion] = float(match.group(1))
-    return values
-
-
-def _extract_song_key_from_prompt(prompt: str) -> str:
-    match = re.search(r"primarily evoking ([^.]+)\.", prompt)
-    return match.group(1) if match else "unknown"
+    if USE_MOCK:
+        return "mock"
+    return "live" if OPENROUTER_BASE_URL == DEFAULT_OPENROUTER_BASE_URL else "standin"
 
 
 def _validate_response(payload: dict, provider_name: str) -> dict:
@@ -66,6 +89,40 @@ def _validate_response(payload: dict, provider_name: str) -> dict:
     return validated
 
 
+def _validate_batch_response(payload, song_ids: list[str], provider_name: str) -> tuple[dict, dict]:
+    """Validate each array element like a single response; return (validated, errors) keyed by song_id."""
+    if isinstance(payload, dict):
+        arrays = [value for value in payload.values() if isinstance(value, list)]
+        if len(arrays) == 1:
+            payload = arrays[0]
+    if not isinstance(payload, list):
+        raise ValueError(f"{provider_name} returned a non-array batch response.")
+
+    expected = set(song_ids)
+    validated = {}
+    errors = {}
+    for element in payload:
+        if not isinstance(element, dict) or str(element.get("song_id")) not in expected:
+            continue
+        song_id = str(element["song_id"])
+        if song_id in validated or song_id in errors:
+            validated.pop(song_id, None)
+            errors[song_id] = f"{provider_name} returned song_id {song_id} more than once."
+            continue
+        try:
+            validated[song_id] = _validate_response(
+                {key: value for key, value in element.items() if key != "song_id"},
+                provider_name,
+            )
+        except ValueError as exc:
+            errors[song_id] = str(exc)
+
+    for song_id in song_ids:
+        if song_id not in validated and song_id not in errors:
+            errors[song_id] = f"{provider_name} response has no element for song_id {song_id}."
+    return validated, errors
+
+
 def _get_api_key(secret_name: str) -> str:
     if st is not None:
         try:
@@ -81,50 +138,562 @@ def _get_api_key(secret_name: str) -> str:
     )
 
 
-def _mock_response(prompt: str, model_name: str) -> dict:
-    ground_truth = _extract_ground_truth_from_prompt(prompt)
-    song_key = _extract_song_key_from_prompt(prompt)
-    return annotate_with_mock(ground_truth, model_name=model_name, song_key=song_key)
+def _mock_response(request: AnnotationRequest) -> dict:
+    """Same values as the bulk mock path, which is keyed by filename too."""
+    return annotate_with_mock(request.ground_truth, model_name=request.model, song_key=request.filename)
 
 
-def _call_openrouter(prompt: str, model_name: str) -> dict:
+def _import_openai():
     try:
-        from openai import OpenAI
+        import openai
     except ImportError as exc:
         raise RuntimeError("The 'openai' package is required for OpenRouter calls.") from exc
+    return openai
 
-    client = OpenAI(
-        api_key=_get_api_key("OPENROUTER_API_KEY"),
-        base_url="https://openrouter.ai/api/v1",
-    )
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}],
+
+def _pooled_http_client(openai, async_client: bool):
+    """Size the keep-alive pool when the installed openai exposes its httpx defaults."""
+    factory_name = "DefaultAsyncHttpxClient" if async_client else "DefaultHttpxClient"
+    factory = getattr(openai, factory_name, None)
+    if factory is None:
+        return None
+    try:
+        import httpx
+    except ImportError:
+        return None
+    limits = httpx.Limits(
+        max_connections=OPENROUTER_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENROUTER_MAX_CONNECTIONS,
     )
+    return factory(limits=limits, timeout=OPENROUTER_TIMEOUT_SECONDS)
+
+
+def _client_options(openai, api_key: str, async_client: bool) -> dict:
+    options = {
+        "api_key": api_key,
+        "base_url": OPENROUTER_BASE_URL,
+        "timeout": OPENROUTER_TIMEOUT_SECONDS,
+        # Async calls always run through the AsyncScheduler, which owns retries, backoff and the breaker.
+        "max_retries": 0 if async_client else OPENROUTER_MAX_RETRIES,
+    }
+    http_client = _pooled_http_client(openai, async_client)
+    if http_client is not None:
+        options["http_client"] = http_client
+    return options
+
+
+def get_openrouter_client():
+    openai = _import_openai()
+    api_key = _get_api_key("OPENROUTER_API_KEY")
+    with _CLIENTS_LOCK:
+        client = _SYNC_CLIENTS.get(api_key)
+        if client is None:
+            client = openai.OpenAI(**_client_options(openai, api_key, async_client=False))
+            _SYNC_CLIENTS[api_key] = client
+    return client
+
+
+def get_async_openrouter_client():
+    """Return the shared async client for the running event loop."""
+    openai = _import_openai()
+    api_key = _get_api_key("OPENROUTER_API_KEY")
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            client = openai.AsyncOpenAI(**_client_options(openai, api_key, async_client=True))
+            clients[api_key] = client
+    return client
+
+
+def close_openrouter_clients() -> None:
+    with _CLIENTS_LOCK:
+        clients = list(_SYNC_CLIENTS.values())
+        _SYNC_CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+async def close_async_openrouter_clients() -> None:
+    """Close the async clients of the running loop before asyncio.run() tears it down."""
+    with _CLIENTS_LOCK:
+        clients = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+def _openrouter_payload(response, model_name: str):
     content = response.choices[0].message.content if response.choices else ""
     if not content:
         raise ValueError(f"OpenRouter returned an empty response for model '{model_name}'.")
 
     try:
-        payload = json.loads(content)
+        return json.loads(content)
     except json.JSONDecodeError as exc:
         raise ValueError(f"OpenRouter returned malformed JSON for model '{model_name}': {content}") from exc
-    return _validate_response(payload, model_name)
 
 
-def call_deepseek(prompt: str) -> dict:
-    if USE_MOCK:
-        return _mock_response(prompt, "deepseek")
-    return _call_openrouter(prompt, "deepseek/deepseek-chat:free")
+def parse_answer_content(content: str, endpoint: str) -> dict:
+    """Validate the message content of a response that did not come through the client, e.g. a batch result."""
+    if not content:
+        raise ValueError(f"{endpoint} returned an empty response.")
+    try:
+        payload = json.loads(content)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"{endpoint} returned malformed JSON: {content}") from exc
+    return _validate_response(payload, endpoint)
 
 
-def call_gemini(prompt: str) -> dict:
-    if USE_MOCK:
-        return _mock_response(prompt, "gemini")
-    return _call_openrouter(prompt, "google/gemini-2.0-flash-exp:free")
+def _response_usage(response) -> dict:
+    usage = getattr(response, "usage", None)
+    # Prompt tokens served from the provider's prefix cache, where the provider reports them.
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_prompt_tokens": getattr(details, "cached_tokens", None),
+    }
 
 
-def call_mistral(prompt: str) -> dict:
-    if USE_MOCK:
-        return _mock_response(prompt, "mistral")
-    return _call_openrouter(prompt, "mistralai/mistral-7b-instruct:free")
+def _call_openrouter(messages: list[dict], model_name: str) -> tuple[dict, dict]:
+    response = get_openrouter_client().chat.completions.create(
+        model=model_name,
+        messages=messages,
+        **DECODING_PARAMS,
+    )
+    return _validate_response(_openrouter_payload(response, model_name), model_name), _response_usage(response)
+
+
+async def _request_openrouter_async(messages: list[dict], model_name: str) -> tuple[object, dict]:
+    client = get_async_openrouter_client()
+    response = await client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        **DECODING_PARAMS,
+    )
+    return _openrouter_payload(response, model_name), _response_usage(response)
+
+
+async def _call_openrouter_async(messages: list[dict], model_name: str) -> tuple[dict, dict]:
+    payload, usage = await _request_openrouter_async(messages, model_name)
+    return _validate_response(payload, model_name), usage
+
+
+class HedgePolicy:
+    """Rolling per-endpoint latencies, the hedge trigger and the extra-request budget."""
+
+    def __init__(
+        self,
+        quantile: float = HEDGE_QUANTILE,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        budget_fraction: float = HEDGE_BUDGET_FRACTION,
+        window: int = HEDGE_LATENCY_WINDOW,
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.budget_fraction = budget_fraction
+        self.window = window
+        self.latencies = {}
+        self.counts = {}
+
+    def _counts(self, key: str) -> dict:
+        return self.counts.setdefault(
+            key,
+            {"primary": 0, "hedged": 0, "hedge_wins": 0, "skipped_budget": 0, "skipped_admission": 0},
+        )
+
+    def record_latency(self, key: str, latency: float) -> None:
+        self.latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def trigger_delay(self, key: str) -> float | None:
+        """Seconds to wait before hedging a new primary call, or None while there is too little history."""
+        self._counts(key)["primary"] += 1
+        latencies = self.latencies.get(key)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+
+    def try_spend(self, key: str) -> bool:
+        counts = self._counts(key)
+        if counts["hedged"] + 1 > self.budget_fraction * counts["primary"]:
+            counts["skipped_budget"] += 1
+            return False
+        counts["hedged"] += 1
+        return True
+
+    def refund(self, key: str) -> None:
+        """Give back a spent hedge the scheduler would not admit."""
+        counts = self._counts(key)
+        counts["hedged"] -= 1
+        counts["skipped_admission"] += 1
+
+    def record_hedge_win(self, key: str) -> None:
+        self._counts(key)["hedge_wins"] += 1
+
+    def stats(self) -> dict:
+        return {
+            key: {
+                **counts,
+                "hedge_rate": counts["hedged"] / counts["primary"] if counts["primary"] else 0.0,
+                "hedge_hit_rate": counts["hedge_wins"] / counts["hedged"] if counts["hedged"] else 0.0,
+            }
+            for key, counts in sorted(self.counts.items())
+        }
+
+
+HEDGING = HedgePolicy()
+
+
+async def hedged_race(
+    hedging: HedgePolicy | None,
+    key: str,
+    make_call,
+    scheduler: AsyncScheduler | None = None,
+    endpoint: str | None = None,
+    on_abandoned=None,
+):
+    """Await make_call(); past the hedge trigger, race a duplicate and return the first successful result.
+
+    The duplicate is admitted through the scheduler's policy for endpoint (a
+    token and a concurrency slot) and skipped when it cannot start right away.
+    Attempts whose result is not returned are passed to
+    on_abandoned(elapsed, result, exc), with CancelledError for a cancelled
+    loser. A loser's elapsed time enters the latency window as a lower bound,
+    so hedging does not hide the slow tail it reacts to.
+    """
+    loop = asyncio.get_running_loop()
+    delay = hedging.trigger_delay(key) if hedging is not None else None
+    primary = asyncio.ensure_future(make_call())
+    started = {primary: loop.time()}
+    admitted = None
+    if delay is not None:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if not done and hedging.try_spend(key):
+            # Without a scheduler (e.g. a single call outside a run) the hedge starts unconditionally.
+            admitted = scheduler.try_admit(endpoint) if scheduler is not None else True
+            if admitted is None:
+                hedging.refund(key)
+
+    if not admitted:
+        result = await primary
+        if hedging is not None:
+            hedging.record_latency(key, loop.time() - started[primary])
+        return result
+
+    hedge = asyncio.ensure_future(make_call())
+    started[hedge] = loop.time()
+    pending = {primary, hedge}
+    winner = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in (primary, hedge) if task in done and task.exception() is None), None)
+    finally:
+        for task in pending:
+            task.cancel()
+        ended = loop.time()
+        for task in (primary, hedge):
+            elapsed = ended - started[task]
+            exc = asyncio.CancelledError() if task in pending else task.exception()
+            if exc is None or isinstance(exc, asyncio.CancelledError):
+                hedging.record_latency(key, elapsed)
+            if task is hedge and scheduler is not None:
+                scheduler.finish_extra(admitted, exc, elapsed)
+            # Without a winner the primary's error is raised, so only the hedge is abandoned.
+            if on_abandoned is not None and task is not winner and (winner is not None or task is hedge):
+                on_abandoned(elapsed, None if exc is not None else task.result(), exc)
+    if winner is None:
+        # Neither answered; surface the primary's error.
+        raise primary.exception()
+    if winner is hedge:
+        hedging.record_hedge_win(key)
+    return winner.result()
+
+
+async def _hedged_call(key: str, make_call, scheduler: AsyncScheduler | None, endpoint: str, abandoned: list):
+    return await hedged_race(
+        HEDGING if HEDGING_ENABLED else None,
+        key,
+        make_call,
+        scheduler=scheduler,
+        endpoint=endpoint,
+        on_abandoned=lambda *attempt: abandoned.append(attempt),
+    )
+
+
+def persist_hedge_stats() -> None:
+    if not HEDGING_ENABLED:
+        return
+    HEDGE_STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    HEDGE_STATS_PATH.write_text(json.dumps(HEDGING.stats(), indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _endpoint_ids(model_name: str) -> list[str]:
+    """Mock answers are cached under their own ids so they never stand in for live ones."""
+    return [f"mock/{model_name}"] if USE_MOCK else routable_endpoints(model_name)
+
+
+def preferred_endpoint(model_name: str) -> str:
+    """Endpoint for requests sent outside the router, such as batch jobs."""
+    return _endpoint_ids(model_name)[0]
+
+
+def _choose_endpoint(model_name: str) -> str:
+    return f"mock/{model_name}" if USE_MOCK else ROUTER.choose(routable_endpoints(model_name))
+
+
+def build_scheduler(model_names, rate_limited: bool | None = None, limits: dict | None = None) -> AsyncScheduler:
+    """Scheduler with one policy per routable endpoint; the router picks among the admissible ones.
+
+    Live runs are rate limited unless rate_limited says otherwise.
+    """
+    return AsyncScheduler(
+        model_names,
+        rate_limited=get_run_mode() == "live" if rate_limited is None else rate_limited,
+        limits=limits,
+        endpoints={model_name: _endpoint_ids(model_name) for model_name in model_names},
+        choose=ROUTER.choose,
+    )
+
+
+def _cache_params(batched: bool, variant: str = DEFAULT_PROMPT_VARIANT) -> dict:
+    """Like the batch marker, the prompt variant and base URL are only added when they are not the default."""
+    params = {**DECODING_PARAMS, **BATCH_CACHE_PARAMS} if batched else dict(DECODING_PARAMS)
+    if variant != DEFAULT_PROMPT_VARIANT:
+        params["prompt_variant"] = variant
+    if get_run_mode() == "standin":
+        # Stand-in answers share model ids with live ones and must never be served in their place.
+        params["base_url"] = OPENROUTER_BASE_URL
+    return params
+
+
+def cached_response(
+    request: AnnotationRequest,
+    batched: bool = False,
+    trace: dict | None = None,
+) -> tuple[dict, str] | None:
+    """(answer, endpoint) from the cache for any of the annotator's endpoints, or None.
+
+    Checked before a call is scheduled so hits skip rate limiting.
+    """
+    for endpoint in _endpoint_ids(request.model):
+        cached = response_cache.lookup(endpoint, request.prompt, _cache_params(batched, request.variant))
+        if cached is not None:
+            now = time.time()
+            telemetry.record_call(
+                request.model,
+                endpoint,
+                trace,
+                now,
+                now,
+                cache="hit",
+                outcome="ok",
+                prompt_variant=request.variant,
+                run_mode=get_run_mode(),
+            )
+            return cached, endpoint
+    return None
+
+
+def _finish_call(
+    model_name: str,
+    endpoint: str,
+    trace: dict | None,
+    started: float,
+    exc: Exception | None = None,
+    usage: dict | None = None,
+    batch_size: int = 1,
+    outcome: str = "ok",
+    prompt_variant: str | None = None,
+) -> None:
+    """Feed one provider attempt to the router and the telemetry log."""
+    ended = time.time()
+    if exc is not None:
+        outcome = classify_error(exc)[0]
+        status = getattr(exc, "status_code", None)
+    else:
+        status = None if USE_MOCK else 200
+    if not USE_MOCK and outcome != "cancelled":
+        ROUTER.record(endpoint, ended - started, ok=outcome == "ok")
+    telemetry.record_call(
+        model_name,
+        endpoint,
+        trace,
+        started,
+        ended,
+        cache="bypass" if response_cache.get_cache_mode() == "bypass" else "miss",
+        outcome=outcome,
+        status=status,
+        usage=usage,
+        error=str(exc) if exc is not None else None,
+        batch_size=batch_size,
+        prompt_variant=prompt_variant,
+        run_mode=get_run_mode(),
+    )
+
+
+def _record_abandoned(
+    model_name: str,
+    endpoint: str,
+    trace: dict | None,
+    abandoned: list,
+    usage: dict | None,
+    batch_size: int = 1,
+    prompt_variant: str | None = None,
+) -> None:
+    """Log hedged attempts whose answer was not used.
+
+    A cancelled request carried the same prompt, so it is logged with the
+    answered request's prompt token count; its completion tokens are unknown.
+    """
+    for elapsed, result, exc in abandoned:
+        started = time.time() - elapsed
+        if isinstance(exc, asyncio.CancelledError):
+            prompt_tokens = (usage or {}).get("prompt_tokens")
+            _finish_call(
+                model_name,
+                endpoint,
+                trace,
+                started,
+                usage={"prompt_tokens": prompt_tokens},
+                batch_size=batch_size,
+                outcome="cancelled",
+                prompt_variant=prompt_variant,
+            )
+        else:
+            _finish_call(
+                model_name,
+                endpoint,
+                trace,
+                started,
+                exc=exc,
+                usage=result[1] if result is not None else None,
+                batch_size=batch_size,
+                prompt_variant=prompt_variant,
+            )
+
+
+def call_model(request: AnnotationRequest, trace: dict | None = None) -> dict:
+    hit = cached_response(request, trace=trace)
+    if hit is not None:
+        return hit[0]
+    response_cache.ensure_miss_allowed(request.model, request.prompt)
+
+    endpoint = _choose_endpoint(request.model)
+    started = time.time()
+    usage = None
+    try:
+        if USE_MOCK:
+            result = _mock_response(request)
+        else:
+            result, usage = _call_openrouter(request.messages, endpoint)
+    except Exception as exc:
+        _finish_call(request.model, endpoint, trace, started, exc=exc, prompt_variant=request.variant)
+        raise
+    _finish_call(request.model, endpoint, trace, started, usage=usage, prompt_variant=request.variant)
+    response_cache.store(endpoint, request.prompt, _cache_params(False, request.variant), result, time.time() - started)
+    return result
+
+
+async def call_model_async(
+    request: AnnotationRequest,
+    trace: dict | None = None,
+    endpoint: str | None = None,
+    scheduler: AsyncScheduler | None = None,
+) -> tuple[dict, str]:
+    """Return (validated answer, endpoint that produced it).
+
+    endpoint is the one the scheduler admitted the call to; the router
+    picks one when it is not given. Hedges are admitted through scheduler.
+    """
+    hit = cached_response(request, trace=trace)
+    if hit is not None:
+        return hit
+    response_cache.ensure_miss_allowed(request.model, request.prompt)
+
+    endpoint = endpoint or _choose_endpoint(request.model)
+    started = time.time()
+    usage = None
+    abandoned = []
+    try:
+        if USE_MOCK:
+            result = _mock_response(request)
+        else:
+            result, usage = await _hedged_call(
+                endpoint,
+                lambda: _call_openrouter_async(request.messages, endpoint),
+                scheduler,
+                endpoint,
+                abandoned,
+            )
+    except Exception as exc:
+        _finish_call(request.model, endpoint, trace, started, exc=exc, prompt_variant=request.variant)
+        _record_abandoned(request.model, endpoint, trace, abandoned, None, prompt_variant=request.variant)
+        raise
+    _finish_call(request.model, endpoint, trace, started, usage=usage, prompt_variant=request.variant)
+    _record_abandoned(request.model, endpoint, trace, abandoned, usage, prompt_variant=request.variant)
+    response_cache.store(endpoint, request.prompt, _cache_params(False, request.variant), result, time.time() - started)
+    return result, endpoint
+
+
+async def call_model_batch_async(
+    requests: list[AnnotationRequest],
+    trace: dict | None = None,
+    endpoint: str | None = None,
+    scheduler: AsyncScheduler | None = None,
+) -> tuple[dict, dict, str]:
+    """Annotate several songs for one model in one request.
+
+    Cache hits are expected to be filtered out already. Returns (results,
+    errors, endpoint) with results and errors keyed by filename; songs in
+    errors were not answered validly and should be retried.
+    """
+    model_name, variant = requests[0].model, requests[0].variant
+    if any(request.model != model_name or request.variant != variant for request in requests):
+        raise ValueError("A batched annotation request must target a single model and prompt variant.")
+    response_cache.ensure_miss_allowed(model_name, requests[0].prompt)
+    # Batch prompts refer to songs by position; answers are mapped back to filenames below.
+    song_ids = {str(index): request for index, request in enumerate(requests, start=1)}
+
+    endpoint = endpoint or _choose_endpoint(model_name)
+    started = time.time()
+    usage = None
+    abandoned = []
+    try:
+        if USE_MOCK:
+            validated = {song_id: _mock_response(request) for song_id, request in song_ids.items()}
+            errors = {}
+        else:
+            batch_messages = build_batch_messages(requests, list(song_ids))
+            payload, usage = await _hedged_call(
+                f"{endpoint} batch",
+                lambda: _request_openrouter_async(batch_messages, endpoint),
+                scheduler,
+                endpoint,
+                abandoned,
+            )
+            validated, errors = _validate_batch_response(payload, list(song_ids), endpoint)
+    except Exception as exc:
+        _finish_call(model_name, endpoint, trace, started, exc=exc, batch_size=len(requests), prompt_variant=variant)
+        _record_abandoned(model_name, endpoint, trace, abandoned, None, len(requests), variant)
+        raise
+    outcome = "ok" if not errors else ("partial" if validated else "invalid")
+    _finish_call(
+        model_name,
+        endpoint,
+        trace,
+        started,
+        usage=usage,
+        batch_size=len(requests),
+        outcome=outcome,
+        prompt_variant=variant,
+    )
+    _record_abandoned(model_name, endpoint, trace, abandoned, usage, len(requests), variant)
+    latency_per_song = (time.time() - started) / len(requests)
+
+    for song_id, answer in validated.items():
+        response_cache.store(endpoint, song_ids[song_id].prompt, _cache_params(True, variant), answer, latency_per_song)
+    results = {song_ids[song_id].filename: answer for song_id, answer in validated.items()}
+    return results, {song_ids[song_id].filename: error for song_id, error in errors.items()}, endpoint
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import csv
+import json
+import time
+import urllib.request
+from pathlib import Path
+
+from annotation.annotate import run_annotation_tasks
+from annotation.llm_clients import OPENROUTER_BASE_URL, build_scheduler, get_run_mode
+from annotation.pool import GROUND_TRUTH_PATH
+from annotation.prompt_builder import AnnotationRequest
+from annotation.registry import annotator_config, annotator_names
+from annotation.telemetry import TELEMETRY_PATH, load_events, new_run_id
+from evaluation.utils import write_json
+
+
+def _ground_truth_songs() -> list[dict]:
+    with GROUND_TRUTH_PATH.open("r", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def _percentile(sorted_values: list[float], quantile: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(quantile * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        **{f"p{round(quantile * 100)}": _percentile(values, quantile) for quantile in [0.5, 0.9, 0.95, 0.99]},
+        "max": values[-1] if values else None,
+    }
+
+
+def _server_stats() -> dict | None:
+    """Counters from the stand-in server; None for providers without a /stats endpoint."""
+    try:
+        with urllib.request.urlopen(f"{OPENROUTER_BASE_URL.rstrip('/')}/stats", timeout=5) as response:
+            return json.loads(response.read())
+    except Exception:
+        return None
+
+
+async def run_load_test(
+    request_count: int,
+    model_names: list[str],
+    batch_size: int = 1,
+    max_concurrency: int | None = None,
+    client_rate_limit: bool = False,
+) -> dict:
+    """Send request_count (song, model) annotations through the annotation engine and time them.
+
+    Requests cycle over every song and model, so runs longer than one pass hit
+    the response cache unless LLM_CACHE_MODE=bypass. Songs go through
+    run_annotation_tasks like a fold run, including batch splitting and
+    retries; call latencies are the provider attempts the run logged to
+    telemetry.
+    """
+    songs = _ground_truth_songs()
+    pairs = [AnnotationRequest.from_song(song, model_name) for song in songs for model_name in model_names]
+    tasks = [pairs[index % len(pairs)] for index in range(request_count)]
+    limits = None
+    if max_concurrency is not None:
+        limits = {name: {**annotator_config(name), "max_concurrency": max_concurrency} for name in model_names}
+    scheduler = build_scheduler(model_names, rate_limited=client_rate_limit, limits=limits)
+    run_id = new_run_id()
+    answered = []
+
+    started = time.perf_counter()
+    failures = await run_annotation_tasks(
+        tasks,
+        lambda filename, model_name, row: answered.append(filename),
+        batch_size=batch_size,
+        scheduler=scheduler,
+        run_id=run_id,
+    )
+    elapsed = time.perf_counter() - started
+
+    events = [event for event in load_events(TELEMETRY_PATH) if event["run_id"] == run_id]
+    calls = [event for event in events if event["cache"] != "hit" and event["outcome"] in {"ok", "partial"}]
+    scheduler_stats = scheduler.stats()
+    attempts = sum(stats["requests"] for stats in scheduler_stats.values())
+    return {
+        "base_url": OPENROUTER_BASE_URL,
+        "run_id": run_id,
+        "requested_songs": request_count,
+        "models": model_names,
+        "batch_size": batch_size,
+        "calls": len(calls),
+        "songs_answered": len(answered),
+        "cache_hits": sum(event["cache"] == "hit" for event in events),
+        "failed_songs": len(failures),
+        "elapsed_seconds": elapsed,
+        "calls_per_second": len(calls) / elapsed if elapsed else None,
+        "attempts_per_second": attempts / elapsed if elapsed else None,
+        "songs_per_second": len(answered) / elapsed if elapsed else None,
+        "call_latency_seconds": latency_summary([event["latency_seconds"] for event in calls]),
+        "scheduler": scheduler_stats,
+        "server": _server_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the annotation client against an OpenAI-compatible server")
+    parser.add_argument("--requests", type=int, default=200, help="(song, model) annotations to request")
+    parser.add_argument("--models", nargs="+", default=None, help="Annotators to use (default: all registered)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Songs per request")
+    parser.add_argument("--max-concurrency", type=int, help="Override each annotator's max_concurrency")
+    parser.add_argument("--client-rate-limit", action="store_true", help="Pace requests by requests_per_minute")
+    parser.add_argument("--output", type=Path, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if get_run_mode() == "mock":
+        raise RuntimeError("The load test sends HTTP requests; set USE_MOCK = False and OPENROUTER_BASE_URL first.")
+    report = asyncio.run(
+        run_load_test(
+            args.requests,
+            args.models or annotator_names(),
+            batch_size=args.batch_size,
+            max_concurrency=args.max_concurrency,
+            client_rate_limit=args.client_rate_limit,
+        )
+    )
+    print(json.dumps(report, indent=2))
+    if args.output:
+        write_json(args.output, report)
+
+
+if __name__ == "__main__":
+    main()
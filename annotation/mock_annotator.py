@@ -1,6 +1,8 @@
 import hashlib
 import random
 
+import numpy as np
+
 
 EMOTION_ORDER = [
     "amusement",
@@ -82,28 +84,81 @@ MODEL_SCALES = {
         "sadness": 1.2,
     },
 }
+# Bump whenever mock values change; mock pools record it and a pool from another version is refused.
+MOCK_GENERATOR_VERSION = 2
+MODEL_NOISE = 0.12
+DERIVED_MODEL_NOISE = 0.2
+# SplitMix64 constants; the bulk mock draws noise from a counter-based stream per (model, song).
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
 
 
-def _clamp(value: float) -> float:
-    return max(0.0, min(1.0, value))
+def _mock_profile(model_name: str) -> tuple[int, dict, dict, float]:
+    """Seed, biases, scales and noise for a model.
 
+    Registry annotators without a hand-tuned profile get one derived from
+    their name, with extra noise so they stay distinct for the consistency agent.
+    """
+    if model_name in MODEL_SEEDS:
+        return MODEL_SEEDS[model_name], MODEL_BIASES[model_name], MODEL_SCALES[model_name], MODEL_NOISE
 
-def annotate_with_mock(ground_truth_vector: dict, model_name: str, song_key: str = "") -> dict:
-    if model_name not in MODEL_SEEDS:
-        raise ValueError(f"Unsupported mock model: {model_name}")
-
-    seed_material = f"{model_name}:{song_key}:{sorted(ground_truth_vector.items())}"
-    seed_digest = hashlib.sha256(seed_material.encode("utf-8")).hexdigest()
-    rng = random.Random(MODEL_SEEDS[model_name] + int(seed_digest[:8], 16))
-
-    return {
-        emotion: round(
-            _clamp(
-                (float(ground_truth_vector[emotion]) * MODEL_SCALES[model_name][emotion])
-                + MODEL_BIASES[model_name][emotion]
-                + rng.uniform(-0.12, 0.12)
-            ),
-            6,
+    name_digest = hashlib.sha256(model_name.encode("utf-8")).hexdigest()
+    rng = random.Random(int(name_digest[:8], 16))
+    biases = {emotion: round(rng.uniform(-0.06, 0.06), 3) for emotion in EMOTION_ORDER}
+    scales = {emotion: round(rng.uniform(0.75, 1.3), 2) for emotion in EMOTION_ORDER}
+    return int(name_digest[8:11], 16), biases, scales, DERIVED_MODEL_NOISE
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser, applied elementwise to uint64 arrays (overflow wraps by design)."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_MULTIPLIERS[0]
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_MULTIPLIERS[1]
+    return values ^ (values >> np.uint64(31))
+
+
+def _song_stream_keys(song_keys: list[str], ground_truth: np.ndarray) -> np.ndarray:
+    """One 64-bit stream key per song from its key and ground-truth values, independent of the other rows."""
+    keys = np.array(
+        [int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") for key in song_keys],
+        dtype=np.uint64,
+    )
+    value_bits = ground_truth.view(np.uint64)
+    for column in range(value_bits.shape[1]):
+        keys = _mix64(keys ^ value_bits[:, column])
+    return keys
+
+
+def annotate_matrix_with_mock(ground_truth: np.ndarray, model_names: list[str], song_keys: list[str]) -> dict:
+    """Mock predictions for every song and model in one vectorised pass.
+
+    ground_truth is a (songs x 8) array in EMOTION_ORDER and song_keys names
+    its rows. Returns model name -> (songs x 8) array. Each value's noise is
+    counter `emotion` of the stream keyed by (model, song key, ground truth),
+    so a song gets the same answer whatever else is in the matrix.
+    """
+    ground_truth = np.ascontiguousarray(ground_truth, dtype=np.float64).reshape(-1, len(EMOTION_ORDER))
+    if len(song_keys) != ground_truth.shape[0]:
+        raise ValueError(f"Got {len(song_keys)} song keys for {ground_truth.shape[0]} ground-truth rows.")
+
+    stream_keys = _song_stream_keys(song_keys, ground_truth)
+    counters = np.arange(1, len(EMOTION_ORDER) + 1, dtype=np.uint64) * _GOLDEN_GAMMA
+    predictions = {}
+    for model_name in model_names:
+        model_seed, biases, scales, noise = _mock_profile(model_name)
+        model_keys = _mix64(stream_keys ^ _mix64(np.array([model_seed], dtype=np.uint64)))
+        uniform = (_mix64(model_keys[:, None] + counters[None, :]) >> np.uint64(11)) * 2.0**-53
+        values = (
+            ground_truth * np.array([scales[emotion] for emotion in EMOTION_ORDER])
+            + np.array([biases[emotion] for emotion in EMOTION_ORDER])
+            + (2.0 * uniform - 1.0) * noise
         )
-        for emotion in EMOTION_ORDER
-    }
+        predictions[model_name] = np.round(np.clip(values, 0.0, 1.0), 6)
+    return predictions
+
+
+def annotate_with_mock(ground_truth_vector: dict, model_name: str, song_key: str = "") -> dict:
+    ground_truth = np.array([[float(ground_truth_vector[emotion]) for emotion in EMOTION_ORDER]])
+    values = annotate_matrix_with_mock(ground_truth, [model_name], [song_key])[model_name][0]
+    return {emotion: float(value) for emotion, value in zip(EMOTION_ORDER, values)}
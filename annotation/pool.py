@@ -0,0 +1,169 @@
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+from annotation.llm_clients import get_run_mode
+from annotation.mock_annotator import MOCK_GENERATOR_VERSION
+from annotation.prompt_builder import DEFAULT_PROMPT_VARIANT, PROMPT_VARIANT
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+GROUND_TRUTH_PATH = ROOT_DIR / "data" / "song_emotion_ground_truth.csv"
+ANNOTATIONS_DIR = ROOT_DIR / "data" / "annotations"
+POOL_DIR = ROOT_DIR / "state" / "annotation_pool"
+# Pools and folds written before prompt variants were recorded all used the default layout.
+LEGACY_POOL_IDENTITY = {"prompt_variant": DEFAULT_PROMPT_VARIANT}
+
+EMOTION_ORDER = [
+    "amusement",
+    "anger",
+    "awe",
+    "contentment",
+    "disgust",
+    "excitement",
+    "fear",
+    "sadness",
+]
+
+
+def _ground_truth_sha256() -> str:
+    return hashlib.sha256(GROUND_TRUTH_PATH.read_bytes()).hexdigest()
+
+
+def pool_dir() -> Path:
+    """Pools are kept apart per run mode so mock rows never leak into live runs."""
+    return POOL_DIR / get_run_mode()
+
+
+def pool_path(model_name: str) -> Path:
+    return pool_dir() / f"{model_name}.csv"
+
+
+def _pool_manifest_path() -> Path:
+    return pool_dir() / "pool_manifest.json"
+
+
+def pool_identity() -> dict:
+    """Settings besides the ground truth that pooled answers depend on; fold manifests record them too.
+
+    Mock answers ignore the prompt, so mock pools are tied to the generator
+    version rather than the prompt variant.
+    """
+    if get_run_mode() == "mock":
+        return {"mock_generator": MOCK_GENERATOR_VERSION}
+    return {"prompt_variant": PROMPT_VARIANT}
+
+
+def _identity_mismatch(manifest: dict, identity: dict) -> dict:
+    """The entries of identity that manifest records differently, with the manifest's values."""
+    recorded = {key: manifest.get(key, LEGACY_POOL_IDENTITY.get(key)) for key in identity}
+    return {key: value for key, value in recorded.items() if value != identity[key]}
+
+
+def ensure_pool_is_current() -> None:
+    """Prompts depend only on the ground-truth vectors, so the pool is valid until they or pool_identity() change."""
+    manifest_path = _pool_manifest_path()
+    current_sha = _ground_truth_sha256()
+    identity = pool_identity()
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("ground_truth_sha256") != current_sha:
+            raise RuntimeError(
+                f"The annotation pool in {pool_dir()} was built from different ground-truth data. "
+                "Remove it before annotating against the current data files."
+            )
+        mismatched = _identity_mismatch(manifest, identity)
+        if mismatched:
+            raise RuntimeError(
+                f"The annotation pool in {pool_dir()} was built with {mismatched}, but the current settings are "
+                f"{identity}. Remove it to annotate the songs again."
+            )
+        return
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps(
+            {"run_mode": get_run_mode(), "ground_truth_sha256": current_sha, **identity},
+            indent=2,
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+
+
+def load_pool(model_name: str) -> dict:
+    path = pool_path(model_name)
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return {row["filename"]: row for row in csv.DictReader(handle)}
+
+
+def _pool_fieldnames(path: Path) -> list[str]:
+    """Keep the header of an existing pool file; new pools also record the answering endpoint."""
+    if path.exists():
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            header = next(csv.reader(handle), None)
+        if header:
+            return header
+    return ["filename", *EMOTION_ORDER, "endpoint"]
+
+
+def append_pool_rows(model_name: str, rows: list[dict]) -> None:
+    if not rows:
+        return
+    path = pool_path(model_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not path.exists()
+    fieldnames = _pool_fieldnames(path)
+    with path.open("a", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def harvest_fold_annotations(model_names: list[str]) -> dict:
+    """Copy rows from saved fold CSVs into the pool when the pool does not have them yet.
+
+    Only folds whose run manifest matches the current run mode, ground-truth
+    data and pool_identity() are harvested.
+    """
+    ensure_pool_is_current()
+    current_sha = _ground_truth_sha256()
+    identity = pool_identity()
+    added = {model_name: 0 for model_name in model_names}
+    pools = {model_name: load_pool(model_name) for model_name in model_names}
+
+    for manifest_path in sorted(ANNOTATIONS_DIR.glob("fold_*/run_manifest.json")):
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("run_mode") != get_run_mode():
+            continue
+        if manifest.get("source_files", {}).get("ground_truth", {}).get("sha256") != current_sha:
+            continue
+        if _identity_mismatch(manifest, identity):
+            continue
+
+        for model_name in model_names:
+            fold_csv = manifest_path.parent / f"{model_name}.csv"
+            if not fold_csv.exists():
+                continue
+            with fold_csv.open("r", encoding="utf-8", newline="") as handle:
+                new_rows = [row for row in csv.DictReader(handle) if row["filename"] not in pools[model_name]]
+            append_pool_rows(model_name, new_rows)
+            pools[model_name].update({row["filename"]: row for row in new_rows})
+            added[model_name] += len(new_rows)
+    return added
+
+
+def write_pool_view(path: Path, model_name: str, song_keys: list[str], pool: dict | None = None) -> int:
+    """Write the pool rows for song_keys as a fold-style annotation CSV."""
+    pool = load_pool(model_name) if pool is None else pool
+    rows = [pool[song_key] for song_key in song_keys if song_key in pool]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=["filename", *EMOTION_ORDER], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
@@ -1,3 +1,6 @@
+import os
+
+
 EMOTION_ORDER = [
     "amusement",
     "anger",
@@ -9,13 +12,45 @@ EMOTION_ORDER = [
     "sadness",
 ]
 
+# Named prompt layouts; "inline" is the original single user message.
+DEFAULT_PROMPT_VARIANT = "inline"
+PROMPT_VARIANT = os.environ.get("PROMPT_VARIANT", DEFAULT_PROMPT_VARIANT)
+
+# The system_prefix variant keeps every fixed instruction in an identical system message, so
+# providers that cache prompt prefixes can reuse it; only the short user message varies.
+SYSTEM_PREFIX_INSTRUCTIONS = (
+    "You are an expert music psychologist. Each request describes one music clip: the emotion it is "
+    "categorised as primarily evoking and the ratings musicologists gave it on 8 emotions (0 to 1 scale). "
+    "Based on your knowledge of how humans perceive music emotion, predict how an average listener "
+    "would rate the same clip on all 8 emotions. Return only a JSON object with exactly these keys: "
+    "amusement, anger, awe, contentment, disgust, excitement, fear, sadness. "
+    "All values must be floats between 0 and 1. No explanation, no markdown, just the JSON object."
+)
+SYSTEM_PREFIX_BATCH_INSTRUCTIONS = (
+    "You are an expert music psychologist. Each request lists several music clips, each with the emotion "
+    "it is categorised as primarily evoking and the ratings musicologists gave it on 8 emotions (0 to 1 scale). "
+    "Based on your knowledge of how humans perceive music emotion, predict how an average listener "
+    "would rate each clip on all 8 emotions. Return only a JSON array with one object per clip. "
+    "Each object must have exactly these keys: song_id, amusement, anger, awe, contentment, disgust, "
+    "excitement, fear, sadness. song_id must be copied from the request. "
+    "All emotion values must be floats between 0 and 1. No explanation, no markdown, just the JSON array."
+)
+
+
+def _ratings(ground_truth_vector: dict) -> str:
+    return ", ".join(f"{emotion}={float(ground_truth_vector[emotion])}" for emotion in EMOTION_ORDER)
+
+
+def _batch_song_line(song: dict) -> str:
+    return (
+        f"- song_id {song['song_id']}: categorised as primarily evoking {song['intended_emotion']}. "
+        f"Musicologist ratings: {_ratings(song['ground_truth'])}."
+    )
+
 
 def build_prompt(song_filename: str, intended_emotion: str, ground_truth_vector: dict) -> str:
     _ = song_filename
-    values = ", ".join(
-        f"{emotion}={float(ground_truth_vector[emotion])}"
-        for emotion in EMOTION_ORDER
-    )
+    values = _ratings(ground_truth_vector)
     return (
         "You are an expert music psychologist. "
         f"A music clip is categorised as primarily evoking {intended_emotion}. "
@@ -25,3 +60,128 @@ def build_prompt(song_filename: str, intended_emotion: str, ground_truth_vector:
         "amusement, anger, awe, contentment, disgust, excitement, fear, sadness. "
         "All values must be floats between 0 and 1. No explanation, no markdown, just the JSON object."
     )
+
+
+def intended_emotion_from_filename(filename: str) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    if len(parts) > 1:
+        return parts[0]
+    return "unknown"
+
+
+def build_batch_prompt(songs: list[dict]) -> str:
+    """One request for several songs; each song dict has song_id, intended_emotion and ground_truth."""
+    lines = [_batch_song_line(song) for song in songs]
+    return (
+        "You are an expert music psychologist. "
+        f"Below are {len(songs)} music clips. For each, musicologists have rated it on 8 emotions (0 to 1 scale).\n"
+        + "\n".join(lines)
+        + "\nBased on your knowledge of how humans perceive music emotion, predict how an average listener "
+        "would rate each clip on all 8 emotions. Return only a JSON array with one object per clip. "
+        "Each object must have exactly these keys: song_id, amusement, anger, awe, contentment, disgust, "
+        "excitement, fear, sadness. song_id must be copied from the list above. "
+        "All emotion values must be floats between 0 and 1. No explanation, no markdown, just the JSON array."
+    )
+
+
+def _inline_messages(intended_emotion: str, ground_truth: dict) -> list[dict]:
+    return [{"role": "user", "content": build_prompt("", intended_emotion, ground_truth)}]
+
+
+def _inline_batch_messages(songs: list[dict]) -> list[dict]:
+    return [{"role": "user", "content": build_batch_prompt(songs)}]
+
+
+def _system_prefix_messages(intended_emotion: str, ground_truth: dict) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PREFIX_INSTRUCTIONS},
+        {
+            "role": "user",
+            "content": (
+                f"A music clip is categorised as primarily evoking {intended_emotion}. "
+                f"Musicologist ratings: {_ratings(ground_truth)}."
+            ),
+        },
+    ]
+
+
+def _system_prefix_batch_messages(songs: list[dict]) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PREFIX_BATCH_INSTRUCTIONS},
+        {
+            "role": "user",
+            "content": f"{len(songs)} music clips:\n" + "\n".join(_batch_song_line(song) for song in songs),
+        },
+    ]
+
+
+PROMPT_VARIANTS = {
+    "inline": {
+        "description": "Song data inside the instructions, one user message",
+        "messages": _inline_messages,
+        "batch_messages": _inline_batch_messages,
+    },
+    "system_prefix": {
+        "description": "Static system message followed by a short per-song user message",
+        "messages": _system_prefix_messages,
+        "batch_messages": _system_prefix_batch_messages,
+    },
+}
+
+
+def prompt_variant(name: str) -> dict:
+    if name not in PROMPT_VARIANTS:
+        raise ValueError(f"Unknown prompt variant '{name}'. Expected one of: {list(PROMPT_VARIANTS)}.")
+    return PROMPT_VARIANTS[name]
+
+
+def messages_text(messages: list[dict]) -> str:
+    """The text a set of chat messages is cached and identified by; a lone message is its content."""
+    return "\n\n".join(message["content"] for message in messages)
+
+
+class AnnotationRequest:
+    """One (song, model) annotation with its inputs kept structured.
+
+    Backends read the ground truth and song key from here instead of parsing
+    the prompt; the messages are rendered once for the prompt variant, and
+    their text is what gets cached.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        filename: str,
+        intended_emotion: str,
+        ground_truth: dict,
+        variant: str | None = None,
+    ):
+        self.model = model
+        self.filename = filename
+        self.intended_emotion = intended_emotion
+        self.ground_truth = {emotion: float(ground_truth[emotion]) for emotion in EMOTION_ORDER}
+        self.variant = variant or PROMPT_VARIANT
+        self.messages = prompt_variant(self.variant)["messages"](intended_emotion, self.ground_truth)
+        self.prompt = messages_text(self.messages)
+
+    @classmethod
+    def from_song(cls, song: dict, model: str, variant: str | None = None) -> "AnnotationRequest":
+        """From a ground-truth row: filename plus the eight emotion columns."""
+        filename = song["filename"]
+        intended_emotion = song.get("intended_emotion") or intended_emotion_from_filename(filename)
+        return cls(model, filename, intended_emotion, song, variant=variant)
+
+    def __repr__(self) -> str:
+        return f"AnnotationRequest(model={self.model!r}, filename={self.filename!r}, variant={self.variant!r})"
+
+
+def build_batch_messages(requests: list[AnnotationRequest], song_ids: list[str]) -> list[dict]:
+    """Chat messages for several requests of one prompt variant, labelled with song_ids."""
+    variant = requests[0].variant
+    if any(request.variant != variant for request in requests):
+        raise ValueError("A batched annotation request must use a single prompt variant.")
+    songs = [
+        {"song_id": song_id, "intended_emotion": request.intended_emotion, "ground_truth": request.ground_truth}
+        for song_id, request in zip(song_ids, requests)
+    ]
+    return prompt_variant(variant)["batch_messages"](songs)
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+from annotation.llm_clients import build_scheduler, call_model_async, close_async_openrouter_clients, get_run_mode
+from annotation.load_test import latency_summary
+from annotation.pool import EMOTION_ORDER, GROUND_TRUTH_PATH
+from annotation.prompt_builder import PROMPT_VARIANTS, AnnotationRequest
+from annotation.registry import annotator_names
+from annotation.telemetry import load_events, new_run_id
+from evaluation.utils import write_json
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+EXPERIMENTS_DIR = ROOT_DIR / "state" / "prompt_experiments"
+
+
+def assign_variant(filename: str, variants: list[str], seed: str = "") -> str:
+    """Deterministic A/B arm for a song: the same seed and variant list always give the same arm."""
+    digest = hashlib.sha256(f"{seed}\n{filename}".encode("utf-8")).digest()
+    return variants[int.from_bytes(digest[:8], "big") % len(variants)]
+
+
+def _mean(values: list[float]) -> float | None:
+    return sum(values) / len(values) if values else None
+
+
+def variant_summary(events: list[dict], answers: dict) -> dict:
+    """Per-variant token, latency, cost and accuracy figures for one experiment run.
+
+    events are the run's telemetry events; answers maps variant to
+    (ground truth, answer) pairs. Cache hits are counted but left out of the
+    token and latency figures.
+    """
+    summary = {}
+    for variant, pairs in answers.items():
+        variant_events = [event for event in events if event.get("prompt_variant") == variant]
+        calls = [event for event in variant_events if event["cache"] != "hit" and event["outcome"] == "ok"]
+        errors = [abs(answer[emotion] - truth[emotion]) for truth, answer in pairs for emotion in EMOTION_ORDER]
+        summary[variant] = {
+            "songs_answered": len(pairs),
+            "provider_calls": len(calls),
+            "cache_hits": sum(event["cache"] == "hit" for event in variant_events),
+            "failed_attempts": sum(event["outcome"] not in {"ok", "cancelled"} for event in variant_events),
+            "mean_prompt_tokens": _mean(
+                [event["prompt_tokens"] for event in calls if event["prompt_tokens"] is not None]
+            ),
+            "mean_cached_prompt_tokens": _mean(
+                [event["cached_prompt_tokens"] for event in calls if event.get("cached_prompt_tokens") is not None]
+            ),
+            "mean_completion_tokens": _mean(
+                [event["completion_tokens"] for event in calls if event["completion_tokens"] is not None]
+            ),
+            "call_latency_seconds": latency_summary([event["latency_seconds"] for event in calls]),
+            "cost_usd": sum(event["cost_usd"] for event in calls),
+            "mean_abs_deviation_from_ground_truth": _mean(errors),
+        }
+    return summary
+
+
+async def run_experiment(
+    variants: list[str],
+    model_names: list[str],
+    song_limit: int | None = None,
+    seed: str = "",
+) -> dict:
+    """Annotate songs with each song assigned to one prompt variant, then summarise per variant.
+
+    Answers are not written to the annotation pool. Every call goes through
+    the scheduler and is logged to telemetry under the experiment's run id.
+    """
+    for variant in variants:
+        if variant not in PROMPT_VARIANTS:
+            raise ValueError(f"Unknown prompt variant '{variant}'. Expected one of: {list(PROMPT_VARIANTS)}.")
+    with GROUND_TRUTH_PATH.open("r", encoding="utf-8", newline="") as handle:
+        songs = list(csv.DictReader(handle))[:song_limit]
+
+    requests = [
+        AnnotationRequest.from_song(song, model_name, variant=assign_variant(song["filename"], variants, seed))
+        for song in songs
+        for model_name in model_names
+    ]
+    scheduler = build_scheduler(model_names)
+    run_id = new_run_id()
+    answers = {variant: [] for variant in variants}
+    failures = []
+
+    async def run_one(request: AnnotationRequest) -> None:
+        trace = {"run_id": run_id, "songs": [request.filename]}
+        try:
+            answer, _ = await scheduler.run(
+                request.model,
+                lambda attempt, endpoint: call_model_async(
+                    request,
+                    trace={**trace, "attempt": attempt},
+                    endpoint=endpoint,
+                    scheduler=scheduler,
+                ),
+            )
+        except Exception as exc:
+            if scheduler.abort_error is None:
+                failures.append(f"{request.model} on {request.filename} ({request.variant}): {exc}")
+            return
+        answers[request.variant].append((request.ground_truth, answer))
+
+    try:
+        await asyncio.gather(*(run_one(request) for request in requests))
+    finally:
+        await close_async_openrouter_clients()
+    if scheduler.abort_error is not None:
+        raise scheduler.abort_error
+
+    events = [event for event in load_events() if event.get("run_id") == run_id]
+    return {
+        "run_id": run_id,
+        "run_mode": get_run_mode(),
+        "seed": seed,
+        "models": model_names,
+        "songs": len(songs),
+        "songs_per_variant": {
+            variant: sum(assign_variant(song["filename"], variants, seed) == variant for song in songs)
+            for variant in variants
+        },
+        "variants": variant_summary(events, answers),
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="A/B test prompt variants on the ground-truth songs")
+    parser.add_argument("--variants", nargs="+", default=list(PROMPT_VARIANTS), help="Prompt variants to compare")
+    parser.add_argument("--models", nargs="+", default=None, help="Annotators to use (default: all registered)")
+    parser.add_argument("--songs", type=int, help="Only use the first N ground-truth songs")
+    parser.add_argument("--seed", default="", help="Changes which songs go to which variant")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_experiment(args.variants, args.models or annotator_names(), args.songs, args.seed))
+    path = EXPERIMENTS_DIR / f"{report['run_id']}.json"
+    write_json(path, report)
+    print(json.dumps(report["variants"], indent=2))
+    print(f"Report written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+REGISTRY_PATH = Path(os.environ.get("ANNOTATOR_REGISTRY_PATH", ROOT_DIR / "config" / "annotators.json"))
+DEFAULT_REQUESTS_PER_MINUTE = 20
+DEFAULT_MAX_CONCURRENCY = 2
+# Names the fold workflow uses for its own human and reference annotators.
+RESERVED_NAMES = {"human_test", "human_consensus", "human_train_consensus", "ground_truth"}
+
+
+@lru_cache(maxsize=None)
+def _load_registry(path: Path) -> dict:
+    if not path.exists():
+        raise RuntimeError(f"Missing annotator registry: {path}")
+    registry = json.loads(path.read_text(encoding="utf-8"))
+
+    annotators = {}
+    for entry in registry.get("annotators", []):
+        name = entry.get("name")
+        if not name or name in RESERVED_NAMES or name in annotators:
+            raise ValueError(f"Invalid or duplicate annotator name in {path}: {name!r}")
+        if not entry.get("endpoints"):
+            raise ValueError(f"Annotator '{name}' in {path} lists no endpoints.")
+        annotators[name] = {
+            "name": name,
+            "endpoints": list(entry["endpoints"]),
+            "requests_per_minute": entry.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE),
+            "max_concurrency": entry.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+        }
+    if not annotators:
+        raise ValueError(f"Annotator registry {path} defines no annotators.")
+    return {
+        "annotators": annotators,
+        "endpoint_prices_per_mtoken": registry.get("endpoint_prices_per_mtoken", {}),
+    }
+
+
+def annotator_names() -> list[str]:
+    """LLM annotators in registry order; every fold annotates with all of them."""
+    return list(_load_registry(REGISTRY_PATH)["annotators"])
+
+
+def annotator_config(name: str) -> dict:
+    annotators = _load_registry(REGISTRY_PATH)["annotators"]
+    if name not in annotators:
+        raise ValueError(f"Unknown annotator '{name}'. Registered: {list(annotators)}.")
+    return annotators[name]
+
+
+def endpoint_prices() -> dict:
+    return _load_registry(REGISTRY_PATH)["endpoint_prices_per_mtoken"]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from evaluation.utils import utc_now
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CACHE_PATH = ROOT_DIR / "state" / "llm_cache.sqlite3"
+CACHE_MODES = ["read_through", "write_through", "replay", "bypass"]
+CACHE_MODE = os.environ.get("LLM_CACHE_MODE", "read_through")
+
+_LOCK = threading.Lock()
+_CONNECTIONS = {}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    model_id TEXT NOT NULL,
+    prompt_sha256 TEXT NOT NULL,
+    params_json TEXT NOT NULL,
+    response_json TEXT NOT NULL,
+    latency_seconds REAL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (model_id, prompt_sha256, params_json)
+)
+"""
+
+
+def get_cache_mode() -> str:
+    if CACHE_MODE not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode '{CACHE_MODE}'. Expected one of: {CACHE_MODES}.")
+    return CACHE_MODE
+
+
+def _connection(path: Path | None = None) -> sqlite3.Connection:
+    """One shared connection per database file (CACHE_PATH by default); every access goes through _LOCK."""
+    path = path or CACHE_PATH
+    connection = _CONNECTIONS.get(path)
+    if connection is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(SCHEMA)
+        connection.commit()
+        _CONNECTIONS[path] = connection
+    return connection
+
+
+def _cache_key(model_id: str, prompt: str, params: dict) -> tuple[str, str, str]:
+    prompt_sha256 = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return model_id, prompt_sha256, json.dumps(params, sort_keys=True)
+
+
+def lookup(model_id: str, prompt: str, params: dict) -> dict | None:
+    """Return the cached response, or None when the caller should query the provider."""
+    if get_cache_mode() in {"bypass", "write_through"}:
+        return None
+
+    with _LOCK:
+        row = _connection().execute(
+            "SELECT response_json FROM responses WHERE model_id = ? AND prompt_sha256 = ? AND params_json = ?",
+            _cache_key(model_id, prompt, params),
+        ).fetchone()
+    return json.loads(row[0]) if row is not None else None
+
+
+def ensure_miss_allowed(model_name: str, prompt: str) -> None:
+    """In replay mode a cache miss is an error instead of a provider call."""
+    if get_cache_mode() == "replay":
+        prompt_sha256 = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raise RuntimeError(
+            f"LLM cache replay miss for {model_name} (prompt sha256 {prompt_sha256}). "
+            "Switch LLM_CACHE_MODE to read_through to query the provider."
+        )
+
+
+def store(model_id: str, prompt: str, params: dict, response: dict, latency_seconds: float) -> None:
+    if get_cache_mode() in {"bypass", "replay"}:
+        return
+
+    key = _cache_key(model_id, prompt, params)
+    with _LOCK:
+        connection = _connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, json.dumps(response, sort_keys=True), latency_seconds, utc_now()),
+        )
+        connection.commit()
+
+
+def cache_stats() -> dict:
+    if not CACHE_PATH.exists():
+        return {"path": str(CACHE_PATH), "entries": 0, "models": {}}
+    with _LOCK:
+        rows = _connection().execute(
+            "SELECT model_id, COUNT(*), AVG(latency_seconds) FROM responses GROUP BY model_id"
+        ).fetchall()
+    return {
+        "path": str(CACHE_PATH),
+        "entries": sum(count for _, count, _ in rows),
+        "models": {
+            model_id: {"entries": count, "mean_latency_seconds": mean_latency}
+            for model_id, count, mean_latency in rows
+        },
+    }
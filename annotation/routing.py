@@ -0,0 +1,77 @@
+import os
+import random
+import threading
+
+from annotation.registry import annotator_config
+
+
+# Each annotator lists equivalent OpenRouter endpoints in config/annotators.json,
+# preferred first. Paid variants are only routed to when OPENROUTER_ALLOW_PAID=1;
+# the default registry has one :free endpoint per annotator, so without the
+# opt-in (or a second free endpoint) there is nothing to fall back to.
+ALLOW_PAID_ENDPOINTS = os.environ.get("OPENROUTER_ALLOW_PAID", "0") == "1"
+EWMA_ALPHA = 0.2
+EXPLORE_PROBABILITY = 0.05
+# Error rates are capped below 1 so a failing endpoint keeps a finite score and can recover.
+MAX_ERROR_RATE = 0.95
+
+
+def routable_endpoints(annotator: str) -> list[str]:
+    endpoints = annotator_config(annotator)["endpoints"]
+    if ALLOW_PAID_ENDPOINTS:
+        return list(endpoints)
+    return [endpoint for endpoint in endpoints if endpoint.endswith(":free")] or endpoints[:1]
+
+
+class EndpointRouter:
+    """Pick the endpoint with the lowest expected time per valid answer.
+
+    Each endpoint keeps an EWMA of its latency and error rate; the score is
+    latency / (1 - error rate). Untried endpoints are tried once, and a small
+    share of calls explores the others so a recovered endpoint is noticed.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.endpoint_stats = {}
+
+    def _stats(self, endpoint: str) -> dict:
+        return self.endpoint_stats.setdefault(
+            endpoint,
+            {"calls": 0, "errors": 0, "latency_ewma": None, "error_rate_ewma": 0.0},
+        )
+
+    def _score(self, endpoint: str) -> float:
+        stats = self._stats(endpoint)
+        latency = stats["latency_ewma"] if stats["latency_ewma"] is not None else 0.0
+        return latency / (1.0 - min(stats["error_rate_ewma"], MAX_ERROR_RATE))
+
+    def choose(self, candidates: list[str]) -> str:
+        """Pick one of an annotator's endpoints, e.g. those the scheduler can admit a call to now."""
+        if len(candidates) == 1:
+            return candidates[0]
+        with self.lock:
+            untried = [endpoint for endpoint in candidates if self._stats(endpoint)["calls"] == 0]
+            if untried:
+                return untried[0]
+            if self.rng.random() < EXPLORE_PROBABILITY:
+                return self.rng.choice(candidates)
+            return min(candidates, key=self._score)
+
+    def record(self, endpoint: str, latency: float | None, ok: bool) -> None:
+        with self.lock:
+            stats = self._stats(endpoint)
+            stats["calls"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["error_rate_ewma"] += EWMA_ALPHA * ((0.0 if ok else 1.0) - stats["error_rate_ewma"])
+            if ok and latency is not None:
+                previous = stats["latency_ewma"]
+                stats["latency_ewma"] = latency if previous is None else previous + EWMA_ALPHA * (latency - previous)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {endpoint: dict(stats) for endpoint, stats in sorted(self.endpoint_stats.items())}
+
+
+ROUTER = EndpointRouter()
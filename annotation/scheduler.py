@@ -0,0 +1,394 @@
+import asyncio
+import random
+import time
+
+from annotation.registry import annotator_config
+
+
+# Per-annotator requests_per_minute and max_concurrency come from config/annotators.json.
+RATE_HEADROOM = 0.9
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+LATENCY_TARGET_SECONDS = 30.0
+DECREASE_COOLDOWN_SECONDS = 5.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 60.0
+# Failed probes in a row after which the provider is given up on for the run.
+BREAKER_MAX_OPENS = 3
+BREAKER_POLL_SECONDS = 1.0
+CONCURRENCY_POLL_SECONDS = 0.1
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """Consume a token and return 0.0, or return the seconds to wait before one is available."""
+        self._refill(now)
+        # Tolerate float drift from refills; otherwise a virtual clock can be asked to wait ~1e-15 seconds forever.
+        if self.tokens >= 1.0 - 1e-9:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class AdaptiveConcurrency:
+    """AIMD limit: +1 per window of successes, halve on throttling or slow answers.
+
+    Decreases are spaced by a cooldown so one burst of 429s from requests that
+    were already in flight only counts once.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, latency_target: float = LATENCY_TARGET_SECONDS):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = float(maximum)
+        self.last_decrease_at = None
+
+    @property
+    def allowed(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def on_success(self, latency: float, now: float) -> None:
+        if latency > self.latency_target:
+            self.on_congestion(now)
+            return
+        self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+
+    def on_congestion(self, now: float) -> None:
+        if self.last_decrease_at is not None and now - self.last_decrease_at < DECREASE_COOLDOWN_SECONDS:
+            return
+        self.limit = max(self.minimum, self.limit / 2.0)
+        self.last_decrease_at = now
+
+
+class CircuitBreaker:
+    """Park a provider after repeated failures; let one probe through after the reset timeout."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.open_count = 0
+        self.open_streak = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.open_streak >= BREAKER_MAX_OPENS
+
+    def blocked(self, now: float) -> bool:
+        """Open and still cooling down; no request, not even a probe, may start."""
+        return self.state == "open" and now - self.opened_at < self.reset_seconds
+
+    def allow(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def retry_in(self, now: float) -> float:
+        if self.state == "open":
+            return max(self.opened_at + self.reset_seconds - now, 0.0)
+        return BREAKER_POLL_SECONDS
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.probe_in_flight = False
+        self.open_streak = 0
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.open_count += 1
+                self.open_streak += 1
+            self.state = "open"
+            self.opened_at = now
+
+
+def backoff_delay(attempt: int, retry_after: float | None, rng: random.Random) -> float:
+    """Full-jitter exponential backoff that never undercuts the server's Retry-After."""
+    delay = rng.uniform(0.0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return getattr(exc, "retry_after", None)
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+def classify_error(exc: Exception) -> tuple[str, float | None]:
+    """Return (kind, retry_after) with kind one of throttled, transient, invalid, config or fatal.
+
+    config covers errors raised before a request is sent (missing package or
+    API key, a replay-mode cache miss); they fail every call the same way.
+    """
+    status_code = getattr(exc, "status_code", None)
+    if status_code == 429:
+        return "throttled", _retry_after_seconds(exc)
+    if status_code is not None:
+        if status_code >= 500 or status_code == 408:
+            return "transient", _retry_after_seconds(exc)
+        return "fatal", None
+    if isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in {
+        "APITimeoutError",
+        "APIConnectionError",
+    }:
+        return "transient", None
+    if isinstance(exc, ValueError):
+        # Malformed or out-of-range answers; sampling again usually fixes them.
+        return "invalid", None
+    if isinstance(exc, RuntimeError):
+        return "config", None
+    return "fatal", None
+
+
+class ProviderUnavailableError(RuntimeError):
+    pass
+
+
+class RunAbortedError(RuntimeError):
+    pass
+
+
+class ProviderPolicy:
+    """All scheduling decisions for one provider, driven by an explicit clock value."""
+
+    def __init__(
+        self,
+        name: str,
+        now: float,
+        rate_limited: bool = True,
+        seed: int | None = None,
+        limits: dict | None = None,
+    ):
+        limits = limits or annotator_config(name)
+        self.name = name
+        self.bucket = None
+        if rate_limited:
+            rate = limits["requests_per_minute"] * RATE_HEADROOM / 60.0
+            self.bucket = TokenBucket(rate, capacity=max(1.0, limits["max_concurrency"]), now=now)
+        self.concurrency = AdaptiveConcurrency(limits["max_concurrency"])
+        self.breaker = CircuitBreaker()
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.stats = {"requests": 0, "successes": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def admission_delay(self, now: float) -> float | None:
+        """Return None when a request may start now (and account for it), else seconds to wait."""
+        if self.breaker.exhausted:
+            raise ProviderUnavailableError(
+                f"{self.name} kept failing after {BREAKER_MAX_OPENS} circuit-breaker probes; parked for this run."
+            )
+        if self.in_flight >= self.concurrency.allowed:
+            return CONCURRENCY_POLL_SECONDS
+        if not self.breaker.allow(now):
+            return self.breaker.retry_in(now)
+        if self.bucket is not None:
+            wait = self.bucket.take(now)
+            if wait > 0.0:
+                if self.breaker.state == "half_open":
+                    self.breaker.probe_in_flight = False
+                return wait
+        self.in_flight += 1
+        self.stats["requests"] += 1
+        return None
+
+    def on_success(self, latency: float, now: float) -> None:
+        self.in_flight -= 1
+        self.stats["successes"] += 1
+        self.breaker.record_success()
+        self.concurrency.on_success(latency, now)
+
+    def on_cancel(self) -> None:
+        """A request abandoned before it answered, such as a losing hedge; it only frees its slot."""
+        self.in_flight -= 1
+
+    def on_failure(self, exc: Exception, attempt: int, now: float, retryable: bool = True) -> float | None:
+        """Record a failed attempt; return the backoff before retrying, or None to give up."""
+        self.in_flight -= 1
+        kind, retry_after = classify_error(exc)
+        if kind == "throttled":
+            self.stats["throttled"] += 1
+            self.concurrency.on_congestion(now)
+        if kind in {"throttled", "transient"}:
+            self.breaker.record_failure(now)
+        else:
+            # Invalid answers, rejected requests and configuration errors say nothing about provider health.
+            self.breaker.probe_in_flight = False
+        if not retryable or kind in {"fatal", "config"} or attempt + 1 >= MAX_ATTEMPTS:
+            self.stats["failures"] += 1
+            return None
+        self.stats["retries"] += 1
+        return backoff_delay(attempt, retry_after, self.rng)
+
+
+class AsyncScheduler:
+    """Runs provider calls through per-endpoint ProviderPolicies on the asyncio event loop.
+
+    Each provider (annotator) lists one or more equivalent endpoints. Rate
+    limits, adaptive concurrency and the circuit breaker are kept per
+    endpoint, and every attempt is sent to an endpoint whose breaker is not
+    open, so one degraded endpoint does not stall the provider.
+    """
+
+    def __init__(
+        self,
+        provider_names,
+        rate_limited: bool = True,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+        limits: dict | None = None,
+        endpoints: dict | None = None,
+        choose=None,
+    ):
+        """limits optionally maps provider names to limits that replace their registry entry.
+
+        endpoints maps provider names to their endpoint ids (default: the
+        provider name alone); each endpoint gets the provider's limits.
+        choose(candidates) picks among endpoints that can take a call now,
+        e.g. EndpointRouter.choose; by default the first one is used.
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.choose = choose or (lambda candidates: candidates[0])
+        limits = limits or {}
+        endpoints = endpoints or {}
+        self.endpoints = {name: list(endpoints.get(name) or [name]) for name in provider_names}
+        self.policies = {
+            endpoint: ProviderPolicy(
+                endpoint,
+                clock(),
+                rate_limited=rate_limited,
+                limits=limits.get(name) or annotator_config(name),
+            )
+            for name in provider_names
+            for endpoint in self.endpoints[name]
+        }
+        self._released = asyncio.Event()
+        self.abort_error = None
+
+    def abort(self, exc: Exception) -> None:
+        """Stop admitting calls for every provider; waiting calls raise RunAbortedError."""
+        if self.abort_error is None:
+            self.abort_error = exc
+        self._released.set()
+
+    def _select(self, provider_name: str) -> ProviderPolicy:
+        """Pick the endpoint for the next attempt, preferring ones that can start a call right away."""
+        policies = [self.policies[endpoint] for endpoint in self.endpoints[provider_name]]
+        usable = [policy for policy in policies if not policy.breaker.exhausted]
+        if not usable:
+            # admission_delay raises ProviderUnavailableError for a parked endpoint.
+            return policies[0]
+        now = self.clock()
+        closed = [policy for policy in usable if not policy.breaker.blocked(now)] or usable
+        ready = [policy for policy in closed if policy.in_flight < policy.concurrency.allowed] or closed
+        if len(ready) == 1:
+            return ready[0]
+        return self.policies[self.choose([policy.name for policy in ready])]
+
+    async def _admit(self, provider_name: str) -> ProviderPolicy:
+        while True:
+            if self.abort_error is not None:
+                raise RunAbortedError(f"Run stopped after a configuration error: {self.abort_error}")
+            policy = self._select(provider_name)
+            wait = policy.admission_delay(self.clock())
+            if wait is None:
+                return policy
+            if policy.in_flight >= policy.concurrency.allowed:
+                # Only a finishing call frees a slot or moves the limit, and each one sets _released.
+                self._released.clear()
+                await self._released.wait()
+                continue
+            await self.sleep(wait)
+
+    def try_admit(self, endpoint: str) -> ProviderPolicy | None:
+        """Admit an extra request (a hedge) to endpoint if it may start right now; never waits.
+
+        It takes a token and a concurrency slot like any other request and is
+        refused while the endpoint's breaker is not closed. Settle it with
+        finish_extra.
+        """
+        policy = self.policies[endpoint]
+        if self.abort_error is not None or policy.breaker.state != "closed":
+            return None
+        return policy if policy.admission_delay(self.clock()) is None else None
+
+    def finish_extra(self, policy: ProviderPolicy, exc: BaseException | None, latency: float) -> None:
+        """Feed the outcome of a request admitted by try_admit back to its policy; it is never retried."""
+        if exc is None:
+            policy.on_success(latency, self.clock())
+        elif isinstance(exc, asyncio.CancelledError):
+            policy.on_cancel()
+        else:
+            policy.on_failure(exc, 0, self.clock(), retryable=False)
+        self._released.set()
+
+    async def run(self, provider_name: str, call):
+        """Await call(attempt, endpoint) (a coroutine factory) with admission control and retries."""
+        attempt = 0
+        while True:
+            policy = await self._admit(provider_name)
+            started = self.clock()
+            try:
+                result = await call(attempt, policy.name)
+            except Exception as exc:
+                delay = policy.on_failure(exc, attempt, self.clock())
+                if classify_error(exc)[0] == "config":
+                    self.abort(exc)
+                self._released.set()
+                if delay is None:
+                    raise
+                print(f"  - {policy.name}: {type(exc).__name__}, retrying in {delay:.1f}s")
+                attempt += 1
+                await self.sleep(delay)
+                continue
+            policy.on_success(self.clock() - started, self.clock())
+            self._released.set()
+            return result
+
+    def stats(self) -> dict:
+        """Scheduler counters per endpoint."""
+        return {
+            name: {
+                **policy.stats,
+                "concurrency_limit": policy.concurrency.allowed,
+                "breaker_state": policy.breaker.state,
+                "breaker_open_count": policy.breaker.open_count,
+            }
+            for name, policy in self.policies.items()
+        }
@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import math
+import random
+import selectors
+
+from annotation.llm_clients import HEDGE_BUDGET_FRACTION, HEDGE_QUANTILE, HedgePolicy, hedged_race
+from annotation.pool import load_pool
+from annotation.registry import annotator_config, annotator_names
+from annotation.scheduler import AsyncScheduler, ProviderUnavailableError
+from annotation.telemetry import TELEMETRY_PATH, load_events
+from evaluation import fold_orchestrator
+from evaluation.fold_users import fold_test_users
+
+
+# Without a recorded batch of the requested size, latency grows by this share of a single call per extra song.
+BATCH_LATENCY_PER_SONG = 0.5
+SYNTHETIC_DEFAULTS = {
+    "latency_median": 2.0,
+    "latency_sigma": 0.6,
+    "throttle_rate": 0.02,
+    "transient_rate": 0.02,
+    "invalid_rate": 0.01,
+}
+OUTCOME_STATUS = {"throttled": 429, "transient": 503, "fatal": 400}
+
+
+class SimulatedProviderError(Exception):
+    """Carries what classify_error reads from a real provider error."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None):
+        super().__init__(f"simulated HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ProviderTrace:
+    """Per-call (latency, outcome, cost) samples for one provider, recorded or synthetic."""
+
+    def __init__(self, samples: dict | None = None, synthetic: dict | None = None):
+        self.samples = samples or {}
+        self.synthetic = {**SYNTHETIC_DEFAULTS, **(synthetic or {})}
+        singles = self.samples.get(1, [])
+        if singles:
+            self.invalid_rate = sum(sample["outcome"] == "invalid" for sample in singles) / len(singles)
+        else:
+            self.invalid_rate = self.synthetic["invalid_rate"]
+
+    def sample(self, rng: random.Random, batch_size: int) -> dict:
+        if not self.samples:
+            latency = rng.lognormvariate(math.log(self.synthetic["latency_median"]), self.synthetic["latency_sigma"])
+            draw = rng.random()
+            outcome = "ok"
+            for kind, key in [("throttled", "throttle_rate"), ("transient", "transient_rate"), ("invalid", "invalid_rate")]:
+                if draw < self.synthetic[key]:
+                    outcome = kind
+                    break
+                draw -= self.synthetic[key]
+            latency *= 1 + BATCH_LATENCY_PER_SONG * (batch_size - 1)
+            return {"latency": latency, "outcome": outcome, "cost_usd": 0.0}
+
+        if batch_size in self.samples:
+            return rng.choice(self.samples[batch_size])
+        source_size = min(self.samples, key=lambda size: abs(size - batch_size))
+        sample = rng.choice(self.samples[source_size])
+        scale = (1 + BATCH_LATENCY_PER_SONG * (batch_size - 1)) / (1 + BATCH_LATENCY_PER_SONG * (source_size - 1))
+        return {
+            "latency": sample["latency"] * scale,
+            "outcome": sample["outcome"],
+            "cost_usd": sample["cost_usd"] * batch_size / source_size,
+        }
+
+
+def recorded_traces(events: list[dict]) -> dict:
+    """Group live provider calls from the telemetry log by model and batch size.
+
+    Mock and stand-in calls are left out, as are cancelled hedge losers, whose
+    latency is cut short. Events logged before run_mode was recorded are
+    told apart by their mock/ endpoint ids.
+    """
+    traces = {}
+    for event in events:
+        endpoint = event.get("endpoint") or ""
+        if (event.get("run_mode") or "live") != "live" or endpoint.startswith("mock/"):
+            continue
+        if event.get("cache") == "hit" or event.get("latency_seconds") is None:
+            continue
+        if event["outcome"] == "cancelled":
+            continue
+        outcome = "ok" if event["outcome"] == "partial" else event["outcome"]
+        traces.setdefault(event["model"], {}).setdefault(event.get("batch_size", 1), []).append(
+            {"latency": event["latency_seconds"], "outcome": outcome, "cost_usd": event.get("cost_usd") or 0.0}
+        )
+    return {model: ProviderTrace(samples) for model, samples in traces.items()}
+
+
+class _VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+
+class _VirtualSelector(selectors.SelectSelector):
+    """Never blocks: jumps the virtual clock to the next timer instead."""
+
+    def __init__(self, clock: _VirtualClock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if not events and timeout:
+            self.clock.now += timeout
+        elif not events and timeout is None:
+            raise RuntimeError("Simulation stalled: no call or timer is pending.")
+        return events
+
+
+class _VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: _VirtualClock):
+        super().__init__(selector=_VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.now
+
+
+async def _simulate(
+    song_counts: dict,
+    traces: dict,
+    batch_size: int,
+    limits: dict,
+    hedging: HedgePolicy | None,
+    rng: random.Random,
+) -> dict:
+    loop = asyncio.get_running_loop()
+    scheduler = AsyncScheduler(list(song_counts), rate_limited=True, clock=loop.time, limits=limits)
+    totals = {"songs_answered": 0, "songs_failed": 0, "provider_requests": 0, "cost_usd": 0.0}
+
+    async def attempt(model_name: str, size: int) -> int:
+        """One simulated HTTP request; returns the number of songs whose answers were invalid."""
+        sample = traces[model_name].sample(rng, size)
+        totals["provider_requests"] += 1
+        totals["cost_usd"] += sample["cost_usd"]
+        await asyncio.sleep(sample["latency"])
+        if sample["outcome"] == "invalid":
+            raise ValueError("simulated invalid answer")
+        if sample["outcome"] in OUTCOME_STATUS:
+            raise SimulatedProviderError(OUTCOME_STATUS[sample["outcome"]])
+        if size == 1:
+            return 0
+        return sum(rng.random() < traces[model_name].invalid_rate for _ in range(size))
+
+    async def call(model_name: str, size: int, endpoint: str) -> int:
+        key = model_name if size == 1 else f"{model_name} batch"
+        return await hedged_race(hedging, key, lambda: attempt(model_name, size), scheduler, endpoint)
+
+    async def run(model_name: str, size: int) -> None:
+        try:
+            invalid = await scheduler.run(model_name, lambda attempt_number, endpoint: call(model_name, size, endpoint))
+        except (SimulatedProviderError, ValueError, ProviderUnavailableError):
+            totals["songs_failed"] += size
+            return
+        totals["songs_answered"] += size - invalid
+        if invalid:
+            # The engine retries unanswered batch songs in halves, down to single-song prompts.
+            middle = (invalid + 1) // 2
+            await asyncio.gather(*[run(model_name, part) for part in [middle, invalid - middle] if part])
+
+    jobs = []
+    for model_name, count in song_counts.items():
+        size = max(1, batch_size)
+        jobs.extend(run(model_name, min(size, count - start)) for start in range(0, count, size))
+    # The scheduler prints every retry; keep simulated runs quiet.
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*jobs)
+
+    return {
+        **totals,
+        "hedged_requests": sum(counts["hedged"] for counts in hedging.counts.values()) if hedging is not None else 0,
+        "wall_time_seconds": loop.time(),
+        "scheduler": scheduler.stats(),
+        "hedging": hedging.stats() if hedging is not None else None,
+    }
+
+
+def simulate_plan(
+    song_counts: dict,
+    traces: dict,
+    batch_size: int = 1,
+    max_concurrency: int | None = None,
+    requests_per_minute: float | None = None,
+    hedging: bool = False,
+    hedge_quantile: float = HEDGE_QUANTILE,
+    hedge_budget: float = HEDGE_BUDGET_FRACTION,
+    seed: int = 0,
+) -> dict:
+    """Predict a run annotating song_counts[model] songs per model, on a virtual clock.
+
+    Uses the annotation engine's scheduler and hedging policies; traces maps
+    each model to a ProviderTrace. Limits default to the annotator registry.
+    """
+    limits = {}
+    for model_name in song_counts:
+        model_limits = dict(annotator_config(model_name))
+        if max_concurrency is not None:
+            model_limits["max_concurrency"] = max_concurrency
+        if requests_per_minute is not None:
+            model_limits["requests_per_minute"] = requests_per_minute
+        limits[model_name] = model_limits
+    hedge_policy = HedgePolicy(quantile=hedge_quantile, budget_fraction=hedge_budget) if hedging else None
+
+    clock = _VirtualClock()
+    loop = _VirtualTimeLoop(clock)
+    try:
+        result = loop.run_until_complete(
+            _simulate(song_counts, traces, batch_size, limits, hedge_policy, random.Random(seed))
+        )
+    finally:
+        loop.close()
+    return {
+        "batch_size": batch_size,
+        "max_concurrency": max_concurrency,
+        "requests_per_minute": requests_per_minute,
+        "hedging": hedging,
+        **result,
+    }
+
+
+def _fold_song_counts(fold_number: int, model_names: list[str]) -> dict:
+    """Songs each model still has to annotate for a fold, after pool reuse."""
+    assignments = fold_orchestrator.load_fold_assignments()
+    _, song_keys = fold_orchestrator.build_song_payloads(fold_test_users(assignments, fold_number))
+    return {
+        model_name: sum(song_key not in load_pool(model_name) for song_key in song_keys)
+        for model_name in model_names
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Predict annotation run time and request counts on a virtual clock")
+    plan = parser.add_mutually_exclusive_group(required=True)
+    plan.add_argument("--songs", type=int, help="Songs to annotate per model")
+    plan.add_argument("--fold", type=int, help="Use the songs fold N still needs after pool reuse")
+    parser.add_argument("--models", nargs="+", default=None, help="Annotators (default: all registered)")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1], help="Batch sizes to compare")
+    parser.add_argument("--max-concurrency", type=int, nargs="+", default=[None], help="Concurrency caps to compare")
+    parser.add_argument("--requests-per-minute", type=float, help="Override each annotator's rate limit")
+    parser.add_argument("--hedging", choices=["off", "on", "both"], default="off")
+    parser.add_argument("--synthetic", action="store_true", help="Ignore the telemetry log and use synthetic traces")
+    for key, value in SYNTHETIC_DEFAULTS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value, help="Synthetic trace setting")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model_names = args.models or annotator_names()
+    song_counts = (
+        {model_name: args.songs for model_name in model_names}
+        if args.songs is not None
+        else _fold_song_counts(args.fold, model_names)
+    )
+    synthetic = ProviderTrace(synthetic={key: getattr(args, key) for key in SYNTHETIC_DEFAULTS})
+    traces = {} if args.synthetic else recorded_traces(load_events(TELEMETRY_PATH))
+    for model_name in model_names:
+        if model_name not in traces:
+            print(f"[simulator] {model_name}: no recorded live calls, using the synthetic trace")
+            traces[model_name] = synthetic
+
+    hedging_modes = {"off": [False], "on": [True], "both": [False, True]}[args.hedging]
+    rows = []
+    for batch_size, max_concurrency, hedging in itertools.product(args.batch_size, args.max_concurrency, hedging_modes):
+        result = simulate_plan(
+            song_counts,
+            traces,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            requests_per_minute=args.requests_per_minute,
+            hedging=hedging,
+            seed=args.seed,
+        )
+        rows.append(result)
+        print(
+            f"batch={batch_size} concurrency={max_concurrency or 'registry'} hedging={'on' if hedging else 'off'}: "
+            f"{result['wall_time_seconds'] / 60:.1f} min, {result['provider_requests']} requests "
+            f"({result['hedged_requests']} hedges), "
+            f"{sum(stats['retries'] for stats in result['scheduler'].values())} retries, "
+            f"{result['songs_failed']} songs failed, ${result['cost_usd']:.4f}"
+        )
+    print(json.dumps({"song_counts": song_counts, "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from annotation.mock_annotator import annotate_with_mock
+from annotation.registry import annotator_config, annotator_names
+from annotation.scheduler import TokenBucket
+
+
+EMOTION_ORDER = [
+    "amusement",
+    "anger",
+    "awe",
+    "contentment",
+    "disgust",
+    "excitement",
+    "fear",
+    "sadness",
+]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LATENCY_DISTRIBUTIONS = ["fixed", "exponential", "lognormal"]
+DEFAULT_SETTINGS = {
+    "latency_distribution": "lognormal",
+    # Median for lognormal, mean for exponential, the value itself for fixed.
+    "latency_seconds": 0.5,
+    "latency_sigma": 0.6,
+    "throttle_rate": 0.0,
+    "server_error_rate": 0.0,
+    "malformed_rate": 0.0,
+    # Per-model limit enforced with 429s; 0 disables it.
+    "requests_per_minute": 0.0,
+    "retry_after_seconds": 1.0,
+    "seed": None,
+}
+
+# The stand-in sits on the provider side, so like a real model it only sees the prompt text
+# and parses the ratings back out of it. The filename is not in the prompt, so answers are
+# keyed by intended emotion and differ from in-process mock answers, which use the filename.
+_SCORE_PATTERNS = {emotion: re.compile(rf"{emotion}=([0-9]*\.?[0-9]+)") for emotion in EMOTION_ORDER}
+_INTENDED_EMOTION_PATTERN = re.compile(r"primarily evoking ([^.]+)\.")
+_BATCH_SONG_PATTERN = re.compile(r"^- song_id (\S+): categorised as primarily evoking ([^.]+)\. (.+)$", re.MULTILINE)
+
+
+def _scores(text: str) -> dict:
+    values = {}
+    for emotion, pattern in _SCORE_PATTERNS.items():
+        match = pattern.search(text)
+        if not match:
+            raise ValueError(f"Malformed prompt: missing score for '{emotion}'.")
+        values[emotion] = float(match.group(1))
+    return values
+
+
+def _annotator_for(model: str) -> str:
+    """Map a requested endpoint id back to its registry annotator so it answers with that mock profile."""
+    if model.startswith("mock/"):
+        return model.removeprefix("mock/")
+    for name in annotator_names():
+        if model in annotator_config(name)["endpoints"]:
+            return name
+    return model
+
+
+def answer_prompt(prompt: str, model: str) -> str:
+    """The completion text for a single-song or batch annotation prompt."""
+    annotator = _annotator_for(model)
+    batch_songs = _BATCH_SONG_PATTERN.findall(prompt)
+    if batch_songs:
+        return json.dumps(
+            [
+                {"song_id": song_id, **annotate_with_mock(_scores(ratings), annotator, song_key=intended_emotion)}
+                for song_id, intended_emotion, ratings in batch_songs
+            ]
+        )
+    match = _INTENDED_EMOTION_PATTERN.search(prompt)
+    song_key = match.group(1) if match else "unknown"
+    return json.dumps(annotate_with_mock(_scores(prompt), annotator, song_key=song_key))
+
+
+class StandinState:
+    """Fault injection, latency sampling and counters shared by the handler threads."""
+
+    def __init__(self, settings: dict):
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        if self.settings["latency_distribution"] not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution '{self.settings['latency_distribution']}'. "
+                f"Expected one of: {LATENCY_DISTRIBUTIONS}."
+            )
+        self.rng = random.Random(self.settings["seed"])
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.seen_prefixes = set()
+        self.counts = {"requests": 0, "ok": 0, "throttled": 0, "server_errors": 0, "malformed": 0}
+
+    def sample_latency(self) -> float:
+        distribution = self.settings["latency_distribution"]
+        scale = self.settings["latency_seconds"]
+        with self.lock:
+            if distribution == "exponential":
+                return self.rng.expovariate(1.0 / scale) if scale > 0 else 0.0
+            if distribution == "lognormal":
+                return self.rng.lognormvariate(math.log(scale), self.settings["latency_sigma"]) if scale > 0 else 0.0
+            return scale
+
+    def outcome(self, model: str) -> str:
+        """Decide how to answer one request: ok, throttled, server_error or malformed."""
+        now = time.monotonic()
+        with self.lock:
+            self.counts["requests"] += 1
+            rate = self.settings["requests_per_minute"] / 60.0
+            if rate > 0:
+                bucket = self.buckets.setdefault(model, TokenBucket(rate, capacity=1.0, now=now))
+                if bucket.take(now) > 0.0:
+                    self.counts["throttled"] += 1
+                    return "throttled"
+            draw = self.rng.random()
+            for outcome, key, count in [
+                ("throttled", "throttle_rate", "throttled"),
+                ("server_error", "server_error_rate", "server_errors"),
+                ("malformed", "malformed_rate", "malformed"),
+            ]:
+                if draw < self.settings[key]:
+                    self.counts[count] += 1
+                    return outcome
+                draw -= self.settings[key]
+            self.counts["ok"] += 1
+            return "ok"
+
+    def cached_prefix_characters(self, model: str, messages: list[dict]) -> int:
+        """Rough prefix cache: leading system messages count as cached once a model has seen them."""
+        prefix = ""
+        for message in messages:
+            if message.get("role") != "system":
+                break
+            prefix += str(message.get("content", ""))
+        if not prefix:
+            return 0
+        with self.lock:
+            seen = (model, prefix) in self.seen_prefixes
+            self.seen_prefixes.add((model, prefix))
+        return len(prefix) if seen else 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counts)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: dict | None = None) -> None:
+        self._send_json(status, {"error": {"message": message, "code": status}}, headers)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.server.standin.stats())
+        else:
+            self._send_error(404, f"Unknown path {self.path}")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}")
+            return
+
+        state = self.server.standin
+        model = request.get("model", "")
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        # Song data is never in a system message; the system_prefix variant keeps only instructions there.
+        song_text = "\n".join(
+            str(message.get("content", "")) for message in messages if message.get("role") != "system"
+        )
+        outcome = state.outcome(model)
+        time.sleep(state.sample_latency())
+
+        if outcome == "throttled":
+            retry_after = state.settings["retry_after_seconds"]
+            self._send_error(429, "Rate limit exceeded (stand-in)", {"Retry-After": f"{retry_after:g}"})
+            return
+        if outcome == "server_error":
+            self._send_error(503, "Upstream unavailable (stand-in)")
+            return
+        try:
+            content = answer_prompt(song_text, model)
+        except ValueError as exc:
+            self._send_error(400, str(exc))
+            return
+        if outcome == "malformed":
+            content = content[: len(content) // 2]
+
+        # Token counts are rough (4 characters per token) but keep cost and telemetry paths exercised.
+        prompt_tokens = len(prompt) // 4
+        cached_tokens = state.cached_prefix_characters(model, messages) // 4
+        completion_tokens = len(content) // 4
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-standin-{time.monotonic_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                },
+            },
+        )
+
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **settings) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.standin = StandinState(settings)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for the annotation providers")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-seconds", type=float, default=DEFAULT_SETTINGS["latency_seconds"])
+    parser.add_argument("--latency-sigma", type=float, default=DEFAULT_SETTINGS["latency_sigma"])
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of answers with truncated JSON")
+    parser.add_argument("--requests-per-minute", type=float, default=0.0, help="Per-model limit; 0 disables it")
+    parser.add_argument("--retry-after-seconds", type=float, default=DEFAULT_SETTINGS["retry_after_seconds"])
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    settings = {key: value for key, value in vars(args).items() if key not in {"host", "port"}}
+    server = make_server(args.host, args.port, **settings)
+    print(f"Stand-in server on http://{args.host}:{args.port}/v1 with {server.standin.settings}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from annotation.registry import endpoint_prices
+from evaluation.utils import append_jsonl
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TELEMETRY_PATH = ROOT_DIR / "state" / "telemetry" / "llm_calls.jsonl"
+
+_LOCK = threading.Lock()
+
+
+def new_run_id() -> str:
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def timestamp(epoch_seconds: float) -> str:
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).isoformat()
+
+
+def estimate_cost_usd(endpoint: str, prompt_tokens: int | None, completion_tokens: int | None) -> float:
+    prices = endpoint_prices().get(endpoint)
+    if prices is None:
+        return 0.0
+    return ((prompt_tokens or 0) * prices["input"] + (completion_tokens or 0) * prices["output"]) / 1_000_000
+
+
+def record_call(
+    model: str,
+    endpoint: str | None,
+    trace: dict | None,
+    started: float,
+    ended: float,
+    cache: str,
+    outcome: str,
+    status: int | None = None,
+    usage: dict | None = None,
+    error: str | None = None,
+    batch_size: int = 1,
+    prompt_variant: str | None = None,
+    run_mode: str | None = None,
+) -> None:
+    """Append one provider call (or cache hit) to the telemetry log.
+
+    started/ended are epoch seconds; trace carries run_id, songs and attempt
+    from the annotation engine.
+    """
+    trace = trace or {}
+    usage = usage or {}
+    event = {
+        "run_id": trace.get("run_id"),
+        "run_mode": run_mode,
+        "model": model,
+        "endpoint": endpoint,
+        "songs": trace.get("songs", []),
+        "attempt": trace.get("attempt", 0),
+        "batch_size": batch_size,
+        "prompt_variant": prompt_variant,
+        "started_at": timestamp(started),
+        "ended_at": timestamp(ended),
+        "latency_seconds": round(ended - started, 6),
+        "status": status,
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "cached_prompt_tokens": usage.get("cached_prompt_tokens"),
+        "cost_usd": estimate_cost_usd(endpoint, usage.get("prompt_tokens"), usage.get("completion_tokens")),
+        "cache": cache,
+        "outcome": outcome,
+        "error": error,
+    }
+    with _LOCK:
+        append_jsonl(TELEMETRY_PATH, event)
+
+
+def load_events(path: Path = TELEMETRY_PATH) -> list[dict]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
@@ -53,6 +53,7 @@ def main():
                 "Fold Comparison",
                 "Cross-Model Analysis",
                 "Agent Reports",
+                "Telemetry",
             ],
             key="llm_analysis_page",
             label_visibility="collapsed",
@@ -1,7 +1,11 @@
 import argparse
 import json
 
+from evaluation.constants import N_FOLDS, N_REPEATS, RANDOM_SEED
+from evaluation.louo import run_leave_one_user_out
+from evaluation.model import BASELINE_MODELS
 from evaluation.orchestrator import load_review_bundle, prepare_folds, review_fold, run_final_validations, run_fold
+from evaluation.repeated_cv import run_repeated_cv
 from evaluation.state import load_state
 
 
@@ -13,6 +17,7 @@ def _build_parser() -> argparse.ArgumentParser:
 
     run_parser = subparsers.add_parser("run-fold", help="Run exactly one fold")
     run_parser.add_argument("--fold", type=int, required=True, help="Fold index to run")
+    run_parser.add_argument("--model", choices=sorted(BASELINE_MODELS), default="linear", help="Baseline model to fit")
 
     review_parser = subparsers.add_parser("review", help="Mark a completed fold as reviewed")
     review_parser.add_argument("--fold", type=int, required=True, help="Fold index to review")
@@ -21,6 +26,26 @@ def _build_parser() -> argparse.ArgumentParser:
     bundle_parser = subparsers.add_parser("show-fold", help="Print the review bundle for one fold")
     bundle_parser.add_argument("--fold", type=int, required=False, help="Fold index to inspect")
 
+    repeated_parser = subparsers.add_parser(
+        "repeated-cv",
+        help="Evaluate a baseline over repeated multi-seed folds (automated, outside the manual flow)",
+    )
+    repeated_parser.add_argument("--repeats", type=int, default=N_REPEATS, help="Number of repetitions")
+    repeated_parser.add_argument("--folds", type=int, default=N_FOLDS, help="Folds per repetition")
+    repeated_parser.add_argument("--seed", type=int, default=RANDOM_SEED, help="Seed of the first repetition")
+    repeated_parser.add_argument(
+        "--model",
+        choices=sorted(BASELINE_MODELS),
+        default="linear",
+        help="Baseline model to fit",
+    )
+    repeated_parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+
+    subparsers.add_parser(
+        "louo",
+        help="Leave-one-user-out evaluation of the linear baseline and human consensus",
+    )
+
     subparsers.add_parser("status", help="Show current manual CV state")
     subparsers.add_parser("validate", help="Run validation reports")
     return parser
@@ -33,11 +58,32 @@ def main() -> None:
     if args.command == "prepare":
         print(json.dumps(prepare_folds(), indent=2))
     elif args.command == "run-fold":
-        print(json.dumps(run_fold(args.fold), indent=2))
+        print(json.dumps(run_fold(args.fold, model_name=args.model), indent=2))
     elif args.command == "review":
         print(json.dumps(review_fold(args.fold, approve_next=args.approve_next), indent=2))
     elif args.command == "show-fold":
         print(json.dumps(load_review_bundle(args.fold), indent=2))
+    elif args.command == "repeated-cv":
+        report = run_repeated_cv(
+            n_repeats=args.repeats,
+            n_folds=args.folds,
+            base_seed=args.seed,
+            model_name=args.model,
+            max_workers=args.workers,
+        )
+        print(json.dumps(report["summary"], indent=2))
+    elif args.command == "louo":
+        report = run_leave_one_user_out()
+        print(
+            json.dumps(
+                {
+                    "n_folds": report["n_folds"],
+                    "baseline": report["baseline"]["metrics"]["overall"],
+                    "human_consensus": report["human_consensus"]["metrics"]["overall"],
+                },
+                indent=2,
+            )
+        )
     elif args.command == "status":
         print(json.dumps(load_state(), indent=2))
     elif args.command == "validate":
@@ -11,14 +11,17 @@ RESULTS_DIR = ROOT_DIR / "results"
 STATE_DIR = ROOT_DIR / "state"
 AGENT_LOG_DIR = STATE_DIR / "agent_logs"
 AGENT_REPORT_DIR = STATE_DIR / "agent_reports"
+REPEATED_CV_DIR = STATE_DIR / "repeated_cv"
 
 MANUAL_CV_STATE_PATH = STATE_DIR / "manual_cv_state.json"
 FINAL_VALIDATION_REPORT_PATH = STATE_DIR / "final_validation_report.json"
+LOUO_REPORT_PATH = STATE_DIR / "louo_report.json"
 ELIGIBLE_SAMPLES_PATH = SPLITS_DIR / "eligible_samples.csv"
 FOLDS_MANIFEST_PATH = SPLITS_DIR / "folds_manifest.json"
 
 RANDOM_SEED = 42
 N_FOLDS = 5
+N_REPEATS = 5
 
 EMOTION_COLUMNS = [
     "amusement",
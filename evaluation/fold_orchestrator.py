@@ -3,9 +3,18 @@ import hashlib
 import json
 from pathlib import Path
 
-from annotation.annotate import annotate_songs
+from annotation.annotate import OUTPUT_MODELS, annotate_songs
 from annotation.llm_clients import get_run_mode
-from evaluation.fold_users import N_FOLDS, USER_FOLDS_PATH, build_user_folds
+from annotation.pool import pool_identity
+from annotation.prompt_builder import PROMPT_VARIANT
+from evaluation.fold_users import (
+    FOLD_BALANCE,
+    N_FOLDS,
+    USER_FOLDS_PATH,
+    build_user_folds,
+    fold_test_users,
+    user_fold_map,
+)
 from evaluation.utils import utc_now
 
 
@@ -16,6 +25,7 @@ STATE_DIR = ROOT_DIR / "state"
 WORKFLOW_STATE_PATH = STATE_DIR / "fold_workflow.json"
 ANNOTATIONS_DIR = ROOT_DIR / "data" / "annotations"
 LLM_ANALYSIS_DIR = STATE_DIR / "llm_analysis"
+SONG_AGGREGATES_PATH = STATE_DIR / "song_aggregates.json"
 EMOTION_COLUMNS = [
     "amusement",
     "anger",
@@ -151,6 +161,8 @@ def _prepare_annotation_run_manifest(fold_number: int, test_users: set[str]) ->
             "fold": fold_number,
             "status": "running",
             "run_mode": get_run_mode(),
+            "prompt_variant": PROMPT_VARIANT,
+            **pool_identity(),
             "source_files": _source_file_metadata(),
             "test_users": sorted(test_users),
             "started_at": manifest.get("started_at") or utc_now(),
@@ -159,6 +171,15 @@ def _prepare_annotation_run_manifest(fold_number: int, test_users: set[str]) ->
     )
 
 
+def _record_pool_usage(fold_number: int, pool_usage: dict) -> None:
+    """Note which fold rows came from the annotation pool rather than new LLM calls."""
+    manifest = _load_annotation_manifest(fold_number) or {}
+    _write_annotation_manifest(
+        fold_number,
+        {**manifest, "annotation_pool": pool_usage, "updated_at": utc_now()},
+    )
+
+
 def _persist_fold_artifacts(
     fold_number: int,
     song_keys: list[str],
@@ -185,7 +206,7 @@ def _persist_fold_artifacts(
         "songs_annotated": song_keys,
         "annotation_files": {
             annotator: str(_annotation_dir(fold_number) / f"{annotator}.csv")
-            for annotator in ["deepseek", "gemini", "mistral", "human_test", "human_consensus"]
+            for annotator in [*OUTPUT_MODELS, "human_test", "human_consensus", "human_train_consensus"]
         },
         "agent_report_path": str(report_path),
         "fold_metrics_path": str(_analysis_metrics_path(fold_number)),
@@ -296,14 +317,18 @@ def _load_user_responses() -> dict:
         return json.load(handle)
 
 
-def _load_fold_assignments() -> dict:
+def _build_fold_assignments() -> dict:
+    return build_user_folds(balance=FOLD_BALANCE)
+
+
+def load_fold_assignments() -> dict:
     if not USER_FOLDS_PATH.exists():
-        return build_user_folds()
+        return _build_fold_assignments()
     return _read_json(USER_FOLDS_PATH, default={})
 
 
 def prepare_folds() -> dict:
-    user_folds = build_user_folds()
+    user_folds = _build_fold_assignments()
     state = _create_initial_state(user_folds)
     state["run_mode"] = get_run_mode()
     state["source_files"] = _source_file_metadata()
@@ -328,7 +353,7 @@ def approve_fold(fold_number: int) -> dict:
     return state
 
 
-def _build_song_payloads(test_users: set[str]) -> tuple[list[dict], list[str]]:
+def build_song_payloads(test_users: set[str]) -> tuple[list[dict], list[str]]:
     raw_data = _load_user_responses()
     ground_truth_by_key = _load_ground_truth_by_key()
     song_payloads = {}
@@ -353,56 +378,114 @@ def _build_song_payloads(test_users: set[str]) -> tuple[list[dict], list[str]]:
     return [song_payloads[key] for key in sorted(song_payloads)], sorted(song_payloads)
 
 
-def _average_song_vectors(user_ids: set[str] | None = None) -> dict:
+def _fold_signature(fold_assignments: dict) -> str:
+    fold_map = user_fold_map(fold_assignments)
+    return hashlib.sha256(json.dumps(fold_map, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _accumulate_song(bucket: dict, song_key: str, vector: list[float]) -> None:
+    stats = bucket.setdefault(
+        song_key,
+        {"count": 0, "sums": [0.0] * len(EMOTION_COLUMNS), "sumsq": [0.0] * len(EMOTION_COLUMNS)},
+    )
+    stats["count"] += 1
+    for position, value in enumerate(vector):
+        stats["sums"][position] += value
+        stats["sumsq"][position] += value * value
+
+
+def build_song_aggregates(fold_assignments: dict) -> dict:
     raw_data = _load_user_responses()
-    grouped = {}
+    fold_of_user = {user_id: str(fold) for user_id, fold in user_fold_map(fold_assignments).items()}
+    global_stats = {}
+    fold_stats = {fold_key: {} for fold_key in fold_assignments.get("folds", {})}
+
     for user_id, user_info in raw_data.get("userData", {}).items():
-        if user_ids is not None and user_id not in user_ids:
-            continue
+        fold_key = fold_of_user.get(user_id)
         for response in user_info.get("emotionResponses", []):
             song_path = response.get("song")
             emotion_values = response.get("emotionValues")
             if not song_path or not emotion_values:
                 continue
             song_key = _normalize_song_key(song_path)
-            bucket = grouped.setdefault(song_key, {emotion: [] for emotion in EMOTION_COLUMNS})
-            for emotion in EMOTION_COLUMNS:
-                bucket[emotion].append(float(emotion_values[emotion]))
+            vector = [float(emotion_values[emotion]) for emotion in EMOTION_COLUMNS]
+            _accumulate_song(global_stats, song_key, vector)
+            if fold_key is not None:
+                _accumulate_song(fold_stats[fold_key], song_key, vector)
 
     return {
-        song_key: {
-            emotion: sum(values[emotion]) / len(values[emotion])
-            for emotion in EMOTION_COLUMNS
-        }
-        for song_key, values in grouped.items()
-        if all(values[emotion] for emotion in EMOTION_COLUMNS)
+        "user_responses_sha256": _sha256_file(USER_RESPONSES_PATH),
+        "fold_signature": _fold_signature(fold_assignments),
+        "built_at": utc_now(),
+        "global": global_stats,
+        "folds": fold_stats,
     }
 
 
-def _export_human_baselines(fold_number: int, song_keys: list[str], test_users: set[str]) -> dict:
-    output_dir = ANNOTATIONS_DIR / f"fold_{fold_number}"
-    consensus_rows = _average_song_vectors()
-    test_rows = _average_song_vectors(test_users)
+def _load_song_aggregates(fold_assignments: dict) -> dict:
+    """Per-song sums, sums of squares and counts, globally and per test fold.
+
+    Rebuilt from the raw responses only when the response file or the fold
+    assignment changes; every consensus is then derived from these totals.
+    """
+    cached = _read_json(SONG_AGGREGATES_PATH, default={})
+    if (
+        cached.get("user_responses_sha256") == _sha256_file(USER_RESPONSES_PATH)
+        and cached.get("fold_signature") == _fold_signature(fold_assignments)
+    ):
+        return cached
+
+    aggregates = build_song_aggregates(fold_assignments)
+    _write_json(SONG_AGGREGATES_PATH, aggregates)
+    return aggregates
+
+
+def _song_mean_rows(song_keys: list[str], totals: dict, excluded: dict | None = None) -> list[dict]:
+    excluded = excluded or {}
+    rows = []
+    for song_key in song_keys:
+        stats = totals.get(song_key)
+        if not stats:
+            continue
+        removed = excluded.get(song_key, {"count": 0, "sums": [0.0] * len(EMOTION_COLUMNS)})
+        count = stats["count"] - removed["count"]
+        if count <= 0:
+            continue
+        rows.append(
+            {
+                "filename": song_key,
+                **{
+                    emotion: (stats["sums"][position] - removed["sums"][position]) / count
+                    for position, emotion in enumerate(EMOTION_COLUMNS)
+                },
+            }
+        )
+    return rows
+
+
+def write_human_views(output_dir: Path, song_keys: list[str], aggregates: dict, fold_number: int) -> dict:
+    """Write the human consensus, test and train-consensus CSVs for one fold from song aggregates."""
+    fold_totals = aggregates["folds"].get(str(fold_number), {})
 
-    human_consensus = [
-        {"filename": song_key, **{emotion: consensus_rows[song_key][emotion] for emotion in EMOTION_COLUMNS}}
-        for song_key in song_keys
-        if song_key in consensus_rows
-    ]
-    human_test = [
-        {"filename": song_key, **{emotion: test_rows[song_key][emotion] for emotion in EMOTION_COLUMNS}}
-        for song_key in song_keys
-        if song_key in test_rows
-    ]
+    human_consensus = _song_mean_rows(song_keys, aggregates["global"])
+    human_test = _song_mean_rows(song_keys, fold_totals)
+    human_train_consensus = _song_mean_rows(song_keys, aggregates["global"], excluded=fold_totals)
 
     _write_annotation_csv(output_dir / "human_consensus.csv", human_consensus)
     _write_annotation_csv(output_dir / "human_test.csv", human_test)
+    _write_annotation_csv(output_dir / "human_train_consensus.csv", human_train_consensus)
     return {
         "human_consensus_count": len(human_consensus),
         "human_test_count": len(human_test),
+        "human_train_consensus_count": len(human_train_consensus),
     }
 
 
+def _export_human_baselines(fold_number: int, song_keys: list[str], fold_assignments: dict) -> dict:
+    aggregates = _load_song_aggregates(fold_assignments)
+    return write_human_views(ANNOTATIONS_DIR / f"fold_{fold_number}", song_keys, aggregates, fold_number)
+
+
 def run_fold(fold_number: int) -> dict:
     state = _load_state()
     if not state.get("prepared"):
@@ -411,14 +494,14 @@ def run_fold(fold_number: int) -> dict:
 
     _assert_can_run_fold(state, fold_number)
     _assert_annotation_storage_is_compatible(fold_number)
-    fold_assignments = _load_fold_assignments()
-    fold_info = fold_assignments["folds"][str(fold_number)]
-    test_users = set(fold_info["test_users"])
-    songs, song_keys = _build_song_payloads(test_users)
+    fold_assignments = load_fold_assignments()
+    test_users = fold_test_users(fold_assignments, fold_number)
+    songs, song_keys = build_song_payloads(test_users)
     _prepare_annotation_run_manifest(fold_number, test_users)
 
-    annotate_songs(songs, fold_number)
-    baseline_counts = _export_human_baselines(fold_number, song_keys, test_users)
+    pool_usage = annotate_songs(songs, fold_number)
+    _record_pool_usage(fold_number, pool_usage)
+    baseline_counts = _export_human_baselines(fold_number, song_keys, fold_assignments)
     summary = _persist_fold_artifacts(fold_number, song_keys, test_users, baseline_counts)
 
     state = _mark_fold_completed(state, fold_number)
@@ -1,62 +1,215 @@
+import csv
 import json
-import random
-from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
+
+from annotation.registry import annotator_names
+
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 USER_RESPONSES_PATH = ROOT_DIR / "data" / "user_emotion_responses.json"
+GROUND_TRUTH_PATH = ROOT_DIR / "data" / "song_emotion_ground_truth.csv"
 USER_FOLDS_PATH = ROOT_DIR / "state" / "user_folds.json"
 N_FOLDS = 5
 SEED = 42
+STRATIFY_BY = ["gender", "age_range"]
+BALANCE_MODES = ["none", "responses", "annotation_cost"]
+FOLD_BALANCE = "none"
 
 
-def build_user_folds() -> dict:
-    with USER_RESPONSES_PATH.open("r", encoding="utf-8") as handle:
-        raw_data = json.load(handle)
+def _normalize_song_key(value: str) -> str:
+    return value.replace("\\", "/").removeprefix("songs/")
+
 
-    users = []
-    rows_by_stratum = defaultdict(list)
+def _ground_truth_song_keys() -> set[str]:
+    with GROUND_TRUTH_PATH.open("r", encoding="utf-8", newline="") as handle:
+        return {_normalize_song_key(row["filename"]) for row in csv.DictReader(handle)}
+
+
+def _user_table(raw_data: dict, with_songs: bool = False) -> dict:
+    user_ids = []
+    strata = []
+    response_counts = []
+    song_sets = []
+    annotatable_songs = _ground_truth_song_keys() if with_songs else set()
     for user_id, user_info in sorted(raw_data.get("userData", {}).items()):
         demographics = user_info.get("demographics", {})
-        payload = {
-            "user_id": user_id,
-            "gender": demographics.get("gender", "N/A"),
-            "age_range": demographics.get("age_range", "N/A"),
-            "nationality": demographics.get("nationality", "N/A"),
-            "music_genres": demographics.get("music_genres", []),
+        responses = user_info.get("emotionResponses", [])
+        user_ids.append(user_id)
+        strata.append("|".join(str(demographics.get(field, "N/A")) for field in STRATIFY_BY))
+        response_counts.append(len(responses))
+        if with_songs:
+            song_keys = {_normalize_song_key(response["song"]) for response in responses if response.get("song")}
+            song_sets.append(song_keys & annotatable_songs)
+    return {
+        "user_ids": user_ids,
+        "strata": np.asarray(strata, dtype=str),
+        "response_counts": np.asarray(response_counts, dtype=int),
+        "song_sets": song_sets,
+    }
+
+
+def assign_user_folds(
+    strata: np.ndarray,
+    response_counts: np.ndarray,
+    n_folds: int,
+    seed: int,
+    balance_responses: bool = False,
+) -> np.ndarray:
+    """Return a 1-based fold number per user, stratified by demographic stratum.
+
+    Users are shuffled once, grouped by stratum and dealt round-robin. With
+    ``balance_responses`` each stratum is dealt heaviest-first in snake order
+    so folds also receive similar numbers of responses.
+    """
+    stratum_labels, stratum_codes = np.unique(strata, return_inverse=True)
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permutation(len(stratum_codes))
+    if balance_responses:
+        shuffled = shuffled[np.argsort(-response_counts[shuffled], kind="stable")]
+    order = shuffled[np.argsort(stratum_codes[shuffled], kind="stable")]
+
+    sorted_codes = stratum_codes[order]
+    counts = np.bincount(sorted_codes, minlength=len(stratum_labels))
+    stratum_starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+    ranks = np.arange(len(order)) - stratum_starts[sorted_codes]
+    slots = ranks % n_folds
+    if balance_responses:
+        reversed_rounds = (ranks // n_folds) % 2 == 1
+        slots = np.where(reversed_rounds, n_folds - 1 - slots, slots)
+    # Rotate each stratum's first fold so stratum remainders spread across folds.
+    slots = (slots + stratum_starts[sorted_codes]) % n_folds
+
+    assignment = np.empty(len(order), dtype=int)
+    assignment[order] = slots + 1
+    return assignment
+
+
+def assign_cost_balanced_folds(strata: np.ndarray, song_sets: list[set], n_folds: int, seed: int) -> np.ndarray:
+    """Even out unique songs per fold, i.e. the LLM calls each fold will make.
+
+    LPT placement: users with the most songs first, each into the fold whose
+    song set grows least. At most ceil(stratum size / n_folds) users of a
+    stratum go to one fold, so the demographic stratification is kept.
+    """
+    _, stratum_codes = np.unique(strata, return_inverse=True)
+    stratum_sizes = np.bincount(stratum_codes)
+    capacity = -(-stratum_sizes // n_folds)
+    placed = np.zeros((len(stratum_sizes), n_folds), dtype=int)
+    fold_users = [0] * n_folds
+    fold_songs = [set() for _ in range(n_folds)]
+
+    sizes = np.array([len(songs) for songs in song_sets], dtype=int)
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permutation(len(sizes))
+    order = shuffled[np.argsort(-sizes[shuffled], kind="stable")]
+
+    assignment = np.empty(len(sizes), dtype=int)
+    for user_position in order.tolist():
+        stratum = stratum_codes[user_position]
+        songs = song_sets[user_position]
+        fold = min(
+            (candidate for candidate in range(n_folds) if placed[stratum, candidate] < capacity[stratum]),
+            # The grown size is the fold's size plus the songs it lacks; only the user's songs are scanned.
+            key=lambda candidate: (
+                len(fold_songs[candidate]) + len(songs - fold_songs[candidate]),
+                fold_users[candidate],
+            ),
+        )
+        assignment[user_position] = fold + 1
+        placed[stratum, fold] += 1
+        fold_users[fold] += 1
+        fold_songs[fold] |= songs
+    return assignment
+
+
+def _fold_summaries(table: dict, assignment: np.ndarray, n_folds: int, n_models: int) -> dict:
+    stratum_labels, stratum_codes = np.unique(table["strata"], return_inverse=True)
+    fold_codes = assignment - 1
+    test_counts = np.bincount(fold_codes, minlength=n_folds)
+    response_counts = np.bincount(fold_codes, weights=table["response_counts"], minlength=n_folds)
+    strata_counts = np.zeros((n_folds, len(stratum_labels)), dtype=int)
+    np.add.at(strata_counts, (fold_codes, stratum_codes), 1)
+
+    summaries = {
+        str(fold_index): {
+            "fold_index": fold_index,
+            "test_count": int(test_counts[fold_index - 1]),
+            "train_count": int(len(assignment) - test_counts[fold_index - 1]),
+            "test_response_count": int(response_counts[fold_index - 1]),
+            "strata": {
+                str(label): int(strata_counts[fold_index - 1, position])
+                for position, label in enumerate(stratum_labels)
+                if strata_counts[fold_index - 1, position]
+            },
         }
-        users.append(payload)
-        stratum = f"{payload['gender']}|{payload['age_range']}"
-        rows_by_stratum[stratum].append(payload)
-
-    rng = random.Random(SEED)
-    fold_tests = {fold_index: [] for fold_index in range(1, N_FOLDS + 1)}
-    for stratum in sorted(rows_by_stratum):
-        stratum_users = list(rows_by_stratum[stratum])
-        rng.shuffle(stratum_users)
-        for index, user_payload in enumerate(stratum_users):
-            fold_index = (index % N_FOLDS) + 1
-            fold_tests[fold_index].append(user_payload["user_id"])
+        for fold_index in range(1, n_folds + 1)
+    }
+
+    if table["song_sets"]:
+        fold_songs = {fold_key: set() for fold_key in summaries}
+        for songs, fold in zip(table["song_sets"], assignment.tolist()):
+            fold_songs[str(fold)] |= songs
+        for fold_key, summary in summaries.items():
+            summary["unique_song_count"] = len(fold_songs[fold_key])
+            summary["expected_annotation_calls"] = len(fold_songs[fold_key]) * n_models
+    return summaries
+
+
+def build_user_folds(
+    seed: int = SEED,
+    n_folds: int = N_FOLDS,
+    balance: str = "none",
+    n_models: int | None = None,
+    output_path: Path | None = USER_FOLDS_PATH,
+) -> dict:
+    if balance not in BALANCE_MODES:
+        raise ValueError(f"Unknown fold balance '{balance}'. Expected one of: {BALANCE_MODES}.")
+    if n_models is None:
+        n_models = len(annotator_names())
+    with USER_RESPONSES_PATH.open("r", encoding="utf-8") as handle:
+        raw_data = json.load(handle)
+
+    table = _user_table(raw_data, with_songs=balance == "annotation_cost")
+    if balance == "annotation_cost":
+        assignment = assign_cost_balanced_folds(table["strata"], table["song_sets"], n_folds, seed)
+    else:
+        assignment = assign_user_folds(
+            table["strata"],
+            table["response_counts"],
+            n_folds,
+            seed,
+            balance_responses=balance == "responses",
+        )
 
     result = {
-        "seed": SEED,
-        "n_folds": N_FOLDS,
-        "users": users,
-        "folds": {},
+        "seed": seed,
+        "n_folds": n_folds,
+        "stratify_by": STRATIFY_BY,
+        "balance": balance,
+        "user_ids": table["user_ids"],
+        "assignment": assignment.tolist(),
+        "folds": _fold_summaries(table, assignment, n_folds, n_models),
     }
-    all_user_ids = sorted(user["user_id"] for user in users)
-    for fold_index in range(1, N_FOLDS + 1):
-        test_users = sorted(fold_tests[fold_index])
-        train_users = sorted(user_id for user_id in all_user_ids if user_id not in set(test_users))
-        result["folds"][str(fold_index)] = {
-            "fold_index": fold_index,
-            "train_users": train_users,
-            "test_users": test_users,
-            "train_count": len(train_users),
-            "test_count": len(test_users),
-        }
 
-    USER_FOLDS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    USER_FOLDS_PATH.write_text(json.dumps(result, indent=2, sort_keys=True), encoding="utf-8")
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(result, indent=2, sort_keys=True), encoding="utf-8")
     return result
+
+
+def user_fold_map(user_folds: dict) -> dict:
+    """Map user_id -> fold number for a saved fold assignment."""
+    if "assignment" in user_folds:
+        return dict(zip(user_folds["user_ids"], user_folds["assignment"]))
+    # Assignments written before the array format listed test users per fold.
+    return {
+        user_id: int(fold_key)
+        for fold_key, fold_info in user_folds.get("folds", {}).items()
+        for user_id in fold_info.get("test_users", [])
+    }
+
+
+def fold_test_users(user_folds: dict, fold_number: int) -> set[str]:
+    return {user_id for user_id, fold in user_fold_map(user_folds).items() if fold == fold_number}
@@ -0,0 +1,135 @@
+import numpy as np
+
+from evaluation.agents import log_agent_action
+from evaluation.constants import EMOTION_COLUMNS, LOUO_REPORT_PATH
+from evaluation.dataset import discover_eligible_samples
+from evaluation.metrics import evaluate_prediction_matrix
+from evaluation.model import rows_to_matrix
+from evaluation.utils import utc_now, write_json
+
+
+def _segment_totals(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    return np.stack(
+        [np.bincount(codes, weights=values[:, column], minlength=size) for column in range(values.shape[1])],
+        axis=1,
+    )
+
+
+def _leave_one_user_out_linear(user_codes: np.ndarray, song_matrix: np.ndarray, true_matrix: np.ndarray) -> np.ndarray:
+    """Predict every row with the linear baseline refitted without that row's user.
+
+    The per-emotion regression only needs n, sum x, sum y, sum x^2 and sum xy,
+    so each held-out model is the global statistics minus one user's totals.
+    """
+    user_count = int(user_codes.max()) + 1
+    user_n = np.bincount(user_codes, minlength=user_count).astype(float)[:, None]
+    user_x = _segment_totals(user_codes, song_matrix, user_count)
+    user_y = _segment_totals(user_codes, true_matrix, user_count)
+    user_xx = _segment_totals(user_codes, song_matrix * song_matrix, user_count)
+    user_xy = _segment_totals(user_codes, song_matrix * true_matrix, user_count)
+
+    n = len(user_codes) - user_n
+    sum_x = user_x.sum(axis=0) - user_x
+    sum_y = user_y.sum(axis=0) - user_y
+    sum_xx = user_xx.sum(axis=0) - user_xx
+    sum_xy = user_xy.sum(axis=0) - user_xy
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = sum_x / n
+        y_mean = sum_y / n
+        variance = sum_xx - (sum_x * x_mean)
+        covariance = sum_xy - (sum_x * y_mean)
+        slopes = np.where(np.abs(variance) > 1e-12, covariance / variance, 0.0)
+    intercepts = y_mean - (slopes * x_mean)
+
+    predictions = (slopes[user_codes] * song_matrix) + intercepts[user_codes]
+    return np.round(np.clip(predictions, 0.0, 1.0), 6)
+
+
+def _leave_one_user_out_consensus(
+    user_codes: np.ndarray,
+    song_codes: np.ndarray,
+    true_matrix: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row song consensus over every user except the row's own user."""
+    song_count = int(song_codes.max()) + 1
+    song_totals = _segment_totals(song_codes, true_matrix, song_count)
+    song_counts = np.bincount(song_codes, minlength=song_count)
+
+    pair_keys, pair_codes = np.unique(user_codes * song_count + song_codes, return_inverse=True)
+    pair_totals = _segment_totals(pair_codes, true_matrix, len(pair_keys))
+    pair_counts = np.bincount(pair_codes, minlength=len(pair_keys))
+
+    remaining_counts = song_counts[song_codes] - pair_counts[pair_codes]
+    has_consensus = remaining_counts > 0
+    consensus = np.zeros_like(true_matrix)
+    consensus[has_consensus] = (
+        song_totals[song_codes[has_consensus]] - pair_totals[pair_codes[has_consensus]]
+    ) / remaining_counts[has_consensus, None]
+    return consensus, has_consensus
+
+
+def _per_user_mae(user_codes: np.ndarray, errors: np.ndarray) -> dict:
+    user_count = int(user_codes.max()) + 1 if len(user_codes) else 0
+    counts = np.bincount(user_codes, minlength=user_count)
+    totals = np.bincount(user_codes, weights=np.abs(errors).mean(axis=1), minlength=user_count)
+    present = counts > 0
+    per_user = totals[present] / counts[present]
+    if not len(per_user):
+        return {"n_users": 0, "mean": None, "std": None, "min": None, "max": None}
+    return {
+        "n_users": int(present.sum()),
+        "mean": float(per_user.mean()),
+        "std": float(per_user.std()),
+        "min": float(per_user.min()),
+        "max": float(per_user.max()),
+    }
+
+
+def run_leave_one_user_out() -> dict:
+    """Leave-one-user-out evaluation of the linear baseline and the human consensus."""
+    log_agent_action(7, "run_leave_one_user_out", "started", {})
+    discovery_bundle = discover_eligible_samples()
+    if discovery_bundle["integrity_report"]["status"] == "failed":
+        raise RuntimeError("Dataset integrity checks failed. See state/agent_reports for details.")
+
+    matrix = rows_to_matrix(discovery_bundle["eligible_rows"])
+    user_ids, user_codes = np.unique(np.asarray(matrix["user_ids"], dtype=str), return_inverse=True)
+    _, song_codes = np.unique(np.asarray(matrix["song_keys"], dtype=str), return_inverse=True)
+    true_matrix = matrix["true"]
+
+    baseline_predictions = _leave_one_user_out_linear(user_codes, matrix["song"], true_matrix)
+    consensus, has_consensus = _leave_one_user_out_consensus(user_codes, song_codes, true_matrix)
+
+    report = {
+        "generated_at": utc_now(),
+        "n_folds": len(user_ids),
+        "eligible_sample_count": len(true_matrix),
+        "emotions": EMOTION_COLUMNS,
+        "baseline": {
+            "model_type": "per_emotion_univariate_linear_baseline",
+            "metrics": evaluate_prediction_matrix(baseline_predictions, true_matrix),
+            "per_user_mae": _per_user_mae(user_codes, baseline_predictions - true_matrix),
+        },
+        "human_consensus": {
+            "rows_without_other_listeners": int((~has_consensus).sum()),
+            "metrics": evaluate_prediction_matrix(consensus[has_consensus], true_matrix[has_consensus]),
+            "per_user_mae": _per_user_mae(
+                user_codes[has_consensus],
+                consensus[has_consensus] - true_matrix[has_consensus],
+            ),
+        },
+    }
+    write_json(LOUO_REPORT_PATH, report)
+    log_agent_action(
+        7,
+        "run_leave_one_user_out",
+        "completed",
+        {
+            "report_path": str(LOUO_REPORT_PATH),
+            "n_folds": report["n_folds"],
+            "baseline_mae": report["baseline"]["metrics"]["overall"]["mae"],
+            "human_consensus_mae": report["human_consensus"]["metrics"]["overall"]["mae"],
+        },
+    )
+    return report
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from evaluation.constants import EMOTION_COLUMNS
 
 
@@ -106,3 +108,42 @@ def evaluate_predictions(prediction_rows: list) -> dict:
         "per_emotion": per_emotion,
     }
 
+
+
+def evaluate_prediction_matrix(pred_matrix, true_matrix) -> dict:
+    """Array counterpart of evaluate_predictions for (samples x emotions) matrices."""
+    per_emotion = {}
+    for position, emotion in enumerate(EMOTION_COLUMNS):
+        true_values = true_matrix[:, position].tolist()
+        pred_values = pred_matrix[:, position].tolist()
+        per_emotion[emotion] = {
+            "pearson": _pearson(pred_values, true_values),
+            "spearman": _spearman(pred_values, true_values),
+            "mae": _mae(pred_values, true_values),
+            "rmse": _rmse(pred_values, true_values),
+        }
+
+    flat_true = true_matrix.T.ravel().tolist()
+    flat_pred = pred_matrix.T.ravel().tolist()
+    sample_count = len(true_matrix)
+
+    pred_norms = np.linalg.norm(pred_matrix, axis=1)
+    true_norms = np.linalg.norm(true_matrix, axis=1)
+    denominators = pred_norms * true_norms
+    dots = np.einsum("ij,ij->i", pred_matrix, true_matrix)
+    vector_cosines = np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators != 0)
+
+    return {
+        "n_test_samples": sample_count,
+        "overall": {
+            "pearson": _pearson(flat_pred, flat_true),
+            "spearman": _spearman(flat_pred, flat_true),
+            "mae": _mae(flat_pred, flat_true),
+            "rmse": _rmse(flat_pred, flat_true),
+            "top_emotion_accuracy": float(
+                np.mean(pred_matrix.argmax(axis=1) == true_matrix.argmax(axis=1))
+            ) if sample_count else 0.0,
+            "mean_vector_cosine_similarity": float(vector_cosines.mean()) if sample_count else 0.0,
+        },
+        "per_emotion": per_emotion,
+    }
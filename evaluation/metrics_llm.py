@@ -3,6 +3,7 @@ import math
 from pathlib import Path
 from evaluation.utils import read_json, write_json
 
+from annotation.registry import annotator_names
 from evaluation import fold_orchestrator
 
 try:
@@ -16,7 +17,16 @@ ANNOTATIONS_DIR = ROOT_DIR / "data" / "annotations"
 GROUND_TRUTH_PATH = ROOT_DIR / "data" / "song_emotion_ground_truth.csv"
 LLM_ANALYSIS_DIR = ROOT_DIR / "state" / "llm_analysis"
 EMOTION_COLUMNS = fold_orchestrator.EMOTION_COLUMNS
-ANNOTATORS = ["human_test", "human_consensus", "deepseek", "gemini", "mistral", "ground_truth"]
+ANNOTATORS = [
+    "human_test",
+    "human_consensus",
+    "human_train_consensus",
+    *annotator_names(),
+    "ground_truth",
+]
+# Songs heard only by a fold's test users have no train consensus, so this
+# annotator must not shrink the song set shared by the others.
+PARTIAL_ANNOTATORS = {"human_train_consensus"}
 
 
 def fold_metrics_path(fold_number: int) -> Path:
@@ -208,15 +218,18 @@ def compute_metrics(reference_rows: dict, predicted_rows: dict) -> dict:
     }
 
 
-def _load_fold_annotators(fold_number: int) -> dict:
-    fold_dir = ANNOTATIONS_DIR / f"fold_{fold_number}"
+def _load_fold_annotators(fold_number: int, fold_dir: Path | None = None) -> dict:
+    fold_dir = fold_dir or ANNOTATIONS_DIR / f"fold_{fold_number}"
     annotators = {
         annotator: _load_annotation_csv(fold_dir / f"{annotator}.csv")
-        for annotator in ["human_test", "human_consensus", "deepseek", "gemini", "mistral"]
+        for annotator in ANNOTATORS
+        if annotator != "ground_truth"
     }
     ground_truth = _load_ground_truth()
     shared_keys = None
-    for annotator_rows in annotators.values():
+    for annotator, annotator_rows in annotators.items():
+        if annotator in PARTIAL_ANNOTATORS:
+            continue
         if shared_keys is None:
             shared_keys = set(annotator_rows)
         else:
@@ -225,17 +238,21 @@ def _load_fold_annotators(fold_number: int) -> dict:
     shared_keys &= set(ground_truth)
 
     trimmed = {
-        annotator: {song_key: rows[song_key] for song_key in sorted(shared_keys)}
+        annotator: {song_key: rows[song_key] for song_key in sorted(shared_keys) if song_key in rows}
         for annotator, rows in annotators.items()
     }
     trimmed["ground_truth"] = {song_key: ground_truth[song_key] for song_key in sorted(shared_keys)}
     return trimmed
 
 
-def compute_fold_metrics(fold_number: int) -> dict:
-    annotators = _load_fold_annotators(fold_number)
+def compute_fold_metrics(
+    fold_number: int,
+    fold_dir: Path | None = None,
+    reference_names: list[str] | None = None,
+) -> dict:
+    annotators = _load_fold_annotators(fold_number, fold_dir)
     comparisons = {}
-    for reference_name in ANNOTATORS:
+    for reference_name in reference_names or ANNOTATORS:
         comparisons[reference_name] = {}
         for predicted_name in ANNOTATORS:
             comparisons[reference_name][predicted_name] = compute_metrics(
@@ -1,27 +1,21 @@
-from evaluation.constants import EMOTION_COLUMNS
-from evaluation.utils import clamp
+from functools import partial
 
+import numpy as np
 
-def _fit_univariate_linear_regression(xs: list, ys: list) -> dict:
-    x_mean = sum(xs) / len(xs)
-    y_mean = sum(ys) / len(ys)
+from evaluation.constants import EMOTION_COLUMNS
+from evaluation.spatial_index import KDTree
 
-    variance = sum((value - x_mean) ** 2 for value in xs)
-    if variance == 0:
-        return {"slope": 0.0, "intercept": y_mean}
 
-    covariance = sum((x_value - x_mean) * (y_value - y_mean) for x_value, y_value in zip(xs, ys))
-    slope = covariance / variance
-    intercept = y_mean - (slope * x_mean)
-    return {"slope": slope, "intercept": intercept}
+KNN_NEIGHBOURS = 5
+USER_EFFECTS_ITERATIONS = 10
+USER_EFFECTS_BIAS_REGULARIZATION = 5.0
+USER_EFFECTS_FACTOR_REGULARIZATION = 1.0
+USER_EFFECTS_RANK = 4
+USER_EFFECTS_SEED = 42
 
 
 def fit_baseline_model(train_rows: list) -> dict:
-    coefficients = {}
-    for emotion in EMOTION_COLUMNS:
-        xs = [row[f"song_{emotion}"] for row in train_rows]
-        ys = [row[f"true_{emotion}"] for row in train_rows]
-        coefficients[emotion] = _fit_univariate_linear_regression(xs, ys)
+    coefficients = _fit_linear_coefficients(_column_matrix(train_rows, "song_"), _column_matrix(train_rows, "true_"))
     return {
         "model_type": "per_emotion_univariate_linear_baseline",
         "coefficients": coefficients,
@@ -29,19 +23,244 @@ def fit_baseline_model(train_rows: list) -> dict:
     }
 
 
-def predict_rows(model: dict, test_rows: list) -> list:
+def fit_knn_model(train_rows: list, k: int = KNN_NEIGHBOURS) -> dict:
+    songs = {}
+    for row in train_rows:
+        bucket = songs.setdefault(
+            row["song_key"],
+            {
+                "vector": [row[f"song_{emotion}"] for emotion in EMOTION_COLUMNS],
+                "totals": [0.0] * len(EMOTION_COLUMNS),
+                "count": 0,
+            },
+        )
+        for position, emotion in enumerate(EMOTION_COLUMNS):
+            bucket["totals"][position] += row[f"true_{emotion}"]
+        bucket["count"] += 1
+
+    song_keys = sorted(songs)
+    return {
+        "model_type": "song_knn_regressor",
+        "k": k,
+        "song_keys": song_keys,
+        "song_vectors": [songs[song_key]["vector"] for song_key in song_keys],
+        "listener_means": [
+            [total / songs[song_key]["count"] for total in songs[song_key]["totals"]]
+            for song_key in song_keys
+        ],
+        "training_song_count": len(song_keys),
+        "training_row_count": len(train_rows),
+    }
+
+
+def build_song_index(model: dict) -> KDTree:
+    return KDTree(model["song_vectors"])
+
+
+def _column_matrix(rows: list, prefix: str) -> np.ndarray:
+    columns = [f"{prefix}{emotion}" for emotion in EMOTION_COLUMNS]
+    values = np.array([[row[column] for column in columns] for row in rows], dtype=float)
+    return values.reshape(len(rows), len(EMOTION_COLUMNS))
+
+
+def rows_to_matrix(rows: list) -> dict:
+    """Pack sample rows into the typed arrays consumed by predict_matrix."""
+    return {
+        "sample_ids": [row["sample_id"] for row in rows],
+        "user_ids": [row["user_id"] for row in rows],
+        "song_keys": [row["song_key"] for row in rows],
+        "song": _column_matrix(rows, "song_"),
+        "true": _column_matrix(rows, "true_"),
+    }
+
+
+def _index_labels(labels: list) -> tuple[list, np.ndarray]:
+    keys, codes = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    return keys.tolist(), codes
+
+
+def _linear_matrix(model: dict, song_matrix: np.ndarray) -> np.ndarray:
+    slopes = np.array([model["coefficients"][emotion]["slope"] for emotion in EMOTION_COLUMNS])
+    intercepts = np.array([model["coefficients"][emotion]["intercept"] for emotion in EMOTION_COLUMNS])
+    return (song_matrix * slopes) + intercepts
+
+
+def _fit_linear_coefficients(song_matrix: np.ndarray, true_matrix: np.ndarray) -> dict:
+    x_deltas = song_matrix - song_matrix.mean(axis=0)
+    y_means = true_matrix.mean(axis=0)
+    variances = (x_deltas * x_deltas).sum(axis=0)
+    covariances = (x_deltas * (true_matrix - y_means)).sum(axis=0)
+    slopes = np.divide(covariances, variances, out=np.zeros_like(covariances), where=variances != 0)
+    intercepts = y_means - (slopes * song_matrix.mean(axis=0))
+    return {
+        emotion: {"slope": float(slope), "intercept": float(intercept)}
+        for emotion, slope, intercept in zip(EMOTION_COLUMNS, slopes, intercepts)
+    }
+
+
+def _segment_layout(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    order = np.argsort(codes, kind="stable")
+    _, boundaries, counts = np.unique(codes[order], return_index=True, return_counts=True)
+    return order, boundaries, counts
+
+
+def _segment_sums(values: np.ndarray, layout: tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    order, boundaries, _ = layout
+    flat = values.reshape(len(values), -1)[order]
+    return np.add.reduceat(flat, boundaries, axis=0).reshape((len(boundaries),) + values.shape[1:])
+
+
+def _regularized_solve(gram: np.ndarray, rhs: np.ndarray, regularization: float) -> np.ndarray:
+    gram = gram + (regularization * np.eye(gram.shape[-1]))
+    return np.linalg.solve(gram, rhs[..., None])[..., 0]
+
+
+def fit_user_effects_model(train_rows: list, rank: int = 0) -> dict:
+    matrix = rows_to_matrix(train_rows)
+    user_ids, user_codes = _index_labels(matrix["user_ids"])
+    song_keys, song_codes = _index_labels(matrix["song_keys"])
+    song_matrix, true_matrix = matrix["song"], matrix["true"]
+    population = {
+        "model_type": "per_emotion_univariate_linear_baseline",
+        "coefficients": _fit_linear_coefficients(song_matrix, true_matrix),
+        "training_row_count": len(train_rows),
+    }
+
+    residuals = true_matrix - _linear_matrix(population, song_matrix)
+    user_layout = _segment_layout(user_codes)
+    song_layout = _segment_layout(song_codes)
+    user_bias = np.zeros((len(user_ids), len(EMOTION_COLUMNS)))
+    song_bias = np.zeros((len(song_keys), len(EMOTION_COLUMNS)))
+    interactions = np.zeros_like(residuals)
+
+    if rank:
+        rng = np.random.default_rng(USER_EFFECTS_SEED)
+        user_factors = np.zeros((len(user_ids), rank))
+        item_factors = rng.normal(scale=0.1, size=(len(song_keys), len(EMOTION_COLUMNS), rank))
+
+    for _ in range(USER_EFFECTS_ITERATIONS):
+        target = residuals - song_bias[song_codes] - interactions
+        user_bias = _segment_sums(target, user_layout) / (user_layout[2][:, None] + USER_EFFECTS_BIAS_REGULARIZATION)
+        target = residuals - user_bias[user_codes] - interactions
+        song_bias = _segment_sums(target, song_layout) / (song_layout[2][:, None] + USER_EFFECTS_BIAS_REGULARIZATION)
+        if not rank:
+            continue
+
+        # Every response touches all eight (song, emotion) items of its song, so the
+        # normal equations can be accumulated per response instead of per cell.
+        remaining = residuals - user_bias[user_codes] - song_bias[song_codes]
+        song_grams = np.einsum("sef,seg->sfg", item_factors, item_factors)
+        user_factors = _regularized_solve(
+            _segment_sums(song_grams[song_codes], user_layout),
+            _segment_sums(np.einsum("nef,ne->nf", item_factors[song_codes], remaining), user_layout),
+            USER_EFFECTS_FACTOR_REGULARIZATION,
+        )
+        gathered_users = user_factors[user_codes]
+        response_grams = _segment_sums(np.einsum("nf,ng->nfg", gathered_users, gathered_users), song_layout)
+        item_factors = _regularized_solve(
+            response_grams[:, None, :, :],
+            _segment_sums(np.einsum("nf,ne->nef", gathered_users, remaining), song_layout),
+            USER_EFFECTS_FACTOR_REGULARIZATION,
+        )
+        interactions = np.einsum("nf,nef->ne", user_factors[user_codes], item_factors[song_codes])
+
+    model = {
+        "model_type": "user_effects_als",
+        "population_model": population,
+        "rank": rank,
+        "iterations": USER_EFFECTS_ITERATIONS,
+        "bias_regularization": USER_EFFECTS_BIAS_REGULARIZATION,
+        "user_ids": user_ids,
+        "song_keys": song_keys,
+        "user_bias": user_bias.tolist(),
+        "song_bias": song_bias.tolist(),
+        "training_user_count": len(user_ids),
+        "training_song_count": len(song_keys),
+        "training_row_count": len(train_rows),
+    }
+    if rank:
+        model["factor_regularization"] = USER_EFFECTS_FACTOR_REGULARIZATION
+        model["user_factors"] = user_factors.tolist()
+        model["item_factors"] = item_factors.tolist()
+    return model
+
+
+BASELINE_MODELS = {
+    "linear": fit_baseline_model,
+    "knn": fit_knn_model,
+    "user_effects": fit_user_effects_model,
+    "user_effects_mf": partial(fit_user_effects_model, rank=USER_EFFECTS_RANK),
+}
+
+
+def fit_model(train_rows: list, model_name: str = "linear") -> dict:
+    if model_name not in BASELINE_MODELS:
+        raise ValueError(f"Unknown baseline model '{model_name}'. Expected one of: {sorted(BASELINE_MODELS)}.")
+    return BASELINE_MODELS[model_name](train_rows)
+
+
+def _predict_knn_matrix(model: dict, matrix: dict, index: KDTree | None) -> np.ndarray:
+    index = index or build_song_index(model)
+    # Test rows repeat their song's vector once per response; each distinct vector is queried once.
+    vectors, inverse = np.unique(matrix["song"], axis=0, return_inverse=True)
+    # Folds with fewer training songs than k average over all of them.
+    _, neighbours = index.query(vectors, k=min(model["k"], len(index)))
+    listener_means = np.asarray(model["listener_means"], dtype=float)
+    return listener_means[neighbours].mean(axis=1)[inverse.reshape(-1)]
+
+
+def _lookup_codes(keys: list, labels: list) -> np.ndarray:
+    positions = {key: position for position, key in enumerate(keys)}
+    return np.array([positions.get(str(label), -1) for label in labels], dtype=int)
+
+
+def _predict_user_effects_matrix(model: dict, matrix: dict) -> np.ndarray:
+    predictions = _linear_matrix(model["population_model"], matrix["song"])
+
+    user_codes = _lookup_codes(model["user_ids"], matrix["user_ids"])
+    song_codes = _lookup_codes(model["song_keys"], matrix["song_keys"])
+    known_users = user_codes >= 0
+    known_songs = song_codes >= 0
+    predictions[known_users] += np.asarray(model["user_bias"])[user_codes[known_users]]
+    predictions[known_songs] += np.asarray(model["song_bias"])[song_codes[known_songs]]
+
+    if model["rank"]:
+        known_pairs = known_users & known_songs
+        user_factors = np.asarray(model["user_factors"])[user_codes[known_pairs]]
+        item_factors = np.asarray(model["item_factors"])[song_codes[known_pairs]]
+        predictions[known_pairs] += np.einsum("nf,nef->ne", user_factors, item_factors)
+    return predictions
+
+
+def predict_matrix(model: dict, matrix: dict, index: KDTree | None = None, out: dict | None = None) -> dict:
+    """Predict a whole test matrix at once into preallocated pred/abs_error arrays."""
+    shape = matrix["true"].shape
+    out = out or {"pred": np.empty(shape), "abs_error": np.empty(shape)}
+    if model["model_type"] == "song_knn_regressor":
+        raw = _predict_knn_matrix(model, matrix, index)
+    elif model["model_type"] == "user_effects_als":
+        raw = _predict_user_effects_matrix(model, matrix)
+    else:
+        raw = _linear_matrix(model, matrix["song"])
+
+    np.clip(raw, 0.0, 1.0, out=out["pred"])
+    np.round(out["pred"], 6, out=out["pred"])
+    np.subtract(out["pred"], matrix["true"], out=out["abs_error"])
+    np.abs(out["abs_error"], out=out["abs_error"])
+    np.round(out["abs_error"], 6, out=out["abs_error"])
+    return out
+
+
+def predict_rows(model: dict, test_rows: list, index: KDTree | None = None) -> list:
+    if not test_rows:
+        return []
+    result = predict_matrix(model, rows_to_matrix(test_rows), index=index)
+
     predictions = []
-    for row in test_rows:
+    for row, pred_vector, error_vector in zip(test_rows, result["pred"].tolist(), result["abs_error"].tolist()):
         prediction = dict(row)
-        for emotion in EMOTION_COLUMNS:
-            slope = model["coefficients"][emotion]["slope"]
-            intercept = model["coefficients"][emotion]["intercept"]
-            raw_prediction = (slope * row[f"song_{emotion}"]) + intercept
-            prediction[f"pred_{emotion}"] = round(clamp(raw_prediction), 6)
-            prediction[f"abs_error_{emotion}"] = round(
-                abs(prediction[f"pred_{emotion}"] - row[f"true_{emotion}"]),
-                6,
-            )
+        for emotion, pred_value, error_value in zip(EMOTION_COLUMNS, pred_vector, error_vector):
+            prediction[f"pred_{emotion}"] = pred_value
+            prediction[f"abs_error_{emotion}"] = error_value
         predictions.append(prediction)
     return predictions
-
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import numpy as np
+
 from evaluation.agents import log_agent_action, write_agent_report
 from evaluation.constants import (
     EMOTION_COLUMNS,
@@ -11,8 +13,8 @@ from evaluation.constants import (
 )
 from evaluation.dataset import discover_eligible_samples
 from evaluation.folds import build_folds
-from evaluation.metrics import evaluate_predictions
-from evaluation.model import fit_baseline_model, predict_rows
+from evaluation.metrics import evaluate_prediction_matrix
+from evaluation.model import build_song_index, fit_model, predict_matrix, rows_to_matrix
 from evaluation.state import (
     assert_can_run_fold,
     create_initial_state,
@@ -21,7 +23,19 @@ from evaluation.state import (
     mark_fold_reviewed,
     save_state,
 )
-from evaluation.utils import ensure_directory, ensure_runtime_directories, read_csv_rows, read_json, write_csv, write_json
+from evaluation.utils import (
+    ensure_directory,
+    ensure_runtime_directories,
+    read_csv_column,
+    read_csv_rows,
+    read_json,
+    write_csv,
+    write_csv_records,
+    write_json,
+)
+
+
+PREDICTION_WRITE_CHUNK_ROWS = 4096
 
 
 def prepare_folds() -> dict:
@@ -99,7 +113,27 @@ def _load_split_rows(fold_index: int) -> tuple[list, list]:
     return train_rows, test_rows
 
 
-def run_fold(fold_index: int) -> dict:
+def _write_predictions_csv(path: Path, test_rows: list, result: dict) -> None:
+    base_fieldnames = list(test_rows[0].keys()) if test_rows else []
+    prediction_fieldnames = [
+        fieldname
+        for emotion in EMOTION_COLUMNS
+        for fieldname in (f"pred_{emotion}", f"abs_error_{emotion}")
+    ]
+
+    def records():
+        for start in range(0, len(test_rows), PREDICTION_WRITE_CHUNK_ROWS):
+            stop = start + PREDICTION_WRITE_CHUNK_ROWS
+            pred = result["pred"][start:stop]
+            # Interleave pred/abs_error per emotion for this chunk only.
+            block = np.stack([pred, result["abs_error"][start:stop]], axis=2).reshape(len(pred), -1).tolist()
+            for row, values in zip(test_rows[start:stop], block):
+                yield [*row.values(), *values]
+
+    write_csv_records(path, base_fieldnames + prediction_fieldnames if test_rows else [], records())
+
+
+def run_fold(fold_index: int, model_name: str = "linear") -> dict:
     ensure_runtime_directories()
     state = load_state()
 
@@ -118,17 +152,23 @@ def run_fold(fold_index: int) -> dict:
 
     train_rows, test_rows = _load_split_rows(fold_index)
 
-    model = fit_baseline_model(train_rows)
-    log_agent_action(4, "fit_baseline_model", "completed", {"fold_index": fold_index, "train_rows": len(train_rows)})
+    model = fit_model(train_rows, model_name)
+    log_agent_action(
+        4,
+        "fit_baseline_model",
+        "completed",
+        {"fold_index": fold_index, "model_type": model["model_type"], "train_rows": len(train_rows)},
+    )
 
-    predictions = predict_rows(model, test_rows)
+    index = build_song_index(model) if model["model_type"] == "song_knn_regressor" else None
+    test_matrix = rows_to_matrix(test_rows)
+    result = predict_matrix(model, test_matrix, index=index)
     results_dir = ensure_directory(RESULTS_DIR / f"fold_{fold_index}")
-    prediction_fieldnames = list(predictions[0].keys()) if predictions else []
-    write_csv(results_dir / "predictions.csv", predictions, prediction_fieldnames)
+    _write_predictions_csv(results_dir / "predictions.csv", test_rows, result)
     write_csv(results_dir / "test_items.csv", test_rows, list(test_rows[0].keys()) if test_rows else [])
     write_json(results_dir / "model_summary.json", model)
 
-    metrics = evaluate_predictions(predictions)
+    metrics = evaluate_prediction_matrix(result["pred"], test_matrix["true"])
     metrics_summary = {
         "fold_index": fold_index,
         "train_count": len(train_rows),
@@ -139,13 +179,16 @@ def run_fold(fold_index: int) -> dict:
     log_agent_action(5, "evaluate_fold", "completed", {"fold_index": fold_index, "metrics": metrics["overall"]})
     write_agent_report(5, f"evaluation_fold_{fold_index}", metrics_summary)
 
+    # Compare the written predictions with the split file itself, not with the rows they were made from.
+    split_path = Path("splits") / f"fold_{fold_index}" / "test.csv"
+    split_sample_ids = sorted(read_csv_column(split_path, "sample_id"))
+    written_sample_ids = sorted(read_csv_column(results_dir / "predictions.csv", "sample_id"))
     safety_report = {
         "status": "passed",
         "fold_index": fold_index,
-        "prediction_count_matches_test_count": len(predictions) == len(test_rows),
-        "prediction_sample_ids_match_test_split": sorted(row["sample_id"] for row in predictions)
-        == sorted(row["sample_id"] for row in test_rows),
-        "source_split_path": str(Path("splits") / f"fold_{fold_index}" / "test.csv"),
+        "prediction_count_matches_test_count": len(written_sample_ids) == len(split_sample_ids),
+        "prediction_sample_ids_match_test_split": written_sample_ids == split_sample_ids,
+        "source_split_path": str(split_path),
         "results_path": str(results_dir / "predictions.csv"),
     }
     write_agent_report(9, f"anti_fabrication_fold_{fold_index}", safety_report)
@@ -0,0 +1,150 @@
+import argparse
+import json
+from pathlib import Path
+
+from agents import supervisor
+from annotation.annotate import OUTPUT_MODELS, annotate_pool_songs
+from annotation.pool import harvest_fold_annotations, load_pool, write_pool_view
+from evaluation import fold_orchestrator
+from evaluation.fold_users import BALANCE_MODES, N_FOLDS, build_user_folds, fold_test_users
+from evaluation.metrics_llm import compute_fold_metrics
+from evaluation.repeated_cv import summarize
+from evaluation.utils import utc_now, write_json
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+REFOLDS_DIR = ROOT_DIR / "state" / "refolds"
+STABILITY_METRICS = {
+    "mae": lambda metrics: metrics["mae"]["overall"],
+    "rmse": lambda metrics: metrics["rmse"]["overall"],
+    "pearson": lambda metrics: metrics["pearson"]["overall"],
+    "cosine_similarity": lambda metrics: metrics["cosine_similarity"]["mean_per_song"],
+    "top_emotion_accuracy": lambda metrics: metrics["top_emotion_accuracy"],
+}
+
+
+def refold_dir(seed: int, n_folds: int, balance: str = "none") -> Path:
+    return REFOLDS_DIR / f"seed_{seed}_k{n_folds}_{balance}"
+
+
+def refold(seed: int, n_folds: int = N_FOLDS, balance: str = "none", annotate_missing: bool = True) -> dict:
+    """Re-split users with any seed/K and slice pooled annotations into the new folds.
+
+    The manual fold workflow and its state are not touched; outputs go to
+    state/refolds/. Only songs absent from the annotation pool reach a provider,
+    and every rewritten fold is checked by the supervisor.
+    """
+    output_dir = refold_dir(seed, n_folds, balance)
+    user_folds = build_user_folds(
+        seed=seed,
+        n_folds=n_folds,
+        balance=balance,
+        output_path=output_dir / "user_folds.json",
+    )
+    harvested = harvest_fold_annotations(list(OUTPUT_MODELS))
+
+    fold_songs = {}
+    all_songs = {}
+    for fold_number in range(1, n_folds + 1):
+        songs, song_keys = fold_orchestrator.build_song_payloads(fold_test_users(user_folds, fold_number))
+        fold_songs[fold_number] = song_keys
+        all_songs.update({song["filename"]: song for song in songs})
+
+    pools = {model_name: load_pool(model_name) for model_name in OUTPUT_MODELS}
+    missing = {
+        model_name: sorted(song_key for song_key in all_songs if song_key not in pools[model_name])
+        for model_name in OUTPUT_MODELS
+    }
+    requested = {model_name: 0 for model_name in OUTPUT_MODELS}
+    if annotate_missing and any(missing.values()):
+        missing_keys = sorted(set().union(*missing.values()))
+        requested = annotate_pool_songs([all_songs[song_key] for song_key in missing_keys])
+        pools = {model_name: load_pool(model_name) for model_name in OUTPUT_MODELS}
+
+    aggregates = fold_orchestrator.build_song_aggregates(user_folds)
+    folds = []
+    for fold_number, song_keys in fold_songs.items():
+        fold_dir = output_dir / f"fold_{fold_number}"
+        view_counts = {
+            model_name: write_pool_view(fold_dir / f"{model_name}.csv", model_name, song_keys, pools[model_name])
+            for model_name in OUTPUT_MODELS
+        }
+        fold_orchestrator.write_human_views(fold_dir, song_keys, aggregates, fold_number)
+        # Same checks as the manual workflow; raises when a fold fails them.
+        supervisor.run(
+            fold_number,
+            fold_dir=fold_dir,
+            user_folds_path=output_dir / "user_folds.json",
+            report_path=fold_dir / "supervisor_report.json",
+        )
+        metrics = compute_fold_metrics(fold_number, fold_dir=fold_dir, reference_names=["human_test"])
+        folds.append(
+            {
+                "fold": fold_number,
+                "song_count": len(song_keys),
+                "annotated_song_counts": view_counts,
+                "comparisons": metrics["comparisons"],
+            }
+        )
+
+    report = {
+        "generated_at": utc_now(),
+        "seed": seed,
+        "n_folds": n_folds,
+        "balance": balance,
+        "harvested_rows": harvested,
+        "missing_before_annotation": {model_name: len(keys) for model_name, keys in missing.items()},
+        "provider_requests": requested,
+        "folds": folds,
+    }
+    write_json(output_dir / "refold_report.json", report)
+    return report
+
+
+def refold_stability(seeds: list[int], n_folds: int = N_FOLDS, balance: str = "none") -> dict:
+    """Mean and across-seed variance of LLM-vs-human_test metrics for several fold seeds."""
+    per_seed = {}
+    for seed in seeds:
+        report = refold(seed, n_folds=n_folds, balance=balance)
+        per_seed[seed] = {
+            annotator: {
+                metric: summarize(
+                    [extract(fold["comparisons"]["human_test"][annotator]) for fold in report["folds"]]
+                )["mean"]
+                for metric, extract in STABILITY_METRICS.items()
+            }
+            for annotator in report["folds"][0]["comparisons"]["human_test"]
+        }
+
+    annotators = next(iter(per_seed.values())).keys() if per_seed else []
+    summary = {
+        annotator: {
+            metric: summarize([per_seed[seed][annotator][metric] for seed in per_seed])
+            for metric in STABILITY_METRICS
+        }
+        for annotator in annotators
+    }
+    stability = {
+        "generated_at": utc_now(),
+        "seeds": seeds,
+        "n_folds": n_folds,
+        "balance": balance,
+        "per_seed": {str(seed): values for seed, values in per_seed.items()},
+        "summary": summary,
+    }
+    write_json(REFOLDS_DIR / f"stability_k{n_folds}_{balance}.json", stability)
+    return stability
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-fold LLM experiments from pooled annotations")
+    parser.add_argument("--seeds", type=int, nargs="+", required=True, help="Fold seeds to evaluate")
+    parser.add_argument("--folds", type=int, default=N_FOLDS, help="Number of user folds")
+    parser.add_argument("--balance", choices=BALANCE_MODES, default="none", help="Fold balancing mode")
+    args = parser.parse_args()
+    stability = refold_stability(args.seeds, n_folds=args.folds, balance=args.balance)
+    print(json.dumps(stability["summary"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
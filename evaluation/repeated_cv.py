@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from evaluation.agents import log_agent_action
+from evaluation.constants import N_FOLDS, N_REPEATS, RANDOM_SEED, REPEATED_CV_DIR
+from evaluation.dataset import discover_eligible_samples
+from evaluation.metrics import evaluate_prediction_matrix
+from evaluation.model import build_song_index, fit_model, predict_matrix, rows_to_matrix
+from evaluation.utils import utc_now, write_json
+
+
+_WORKER_ROWS = []
+
+
+def assign_stratified_folds(strata: list, n_folds: int, seed: int) -> np.ndarray:
+    """Return a 0-based fold index per sample from one stratified shuffle."""
+    _, codes = np.unique(np.asarray(strata, dtype=object).astype(str), return_inverse=True)
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permutation(len(codes))
+    order = shuffled[np.argsort(codes[shuffled], kind="stable")]
+
+    sorted_codes = codes[order]
+    counts = np.bincount(sorted_codes)
+    stratum_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    ranks = np.arange(len(order)) - stratum_starts[sorted_codes]
+    # Rotate each stratum's starting fold so remainders do not all pile onto fold 0.
+    offsets = stratum_starts % n_folds
+
+    assignments = np.empty(len(order), dtype=int)
+    assignments[order] = (ranks + offsets[sorted_codes]) % n_folds
+    return assignments
+
+
+def _init_worker(rows: list) -> None:
+    global _WORKER_ROWS
+    _WORKER_ROWS = rows
+
+
+def _evaluate_split(task: dict) -> dict:
+    test_mask = np.zeros(len(_WORKER_ROWS), dtype=bool)
+    test_mask[task["test_indices"]] = True
+    train_rows = [row for row, is_test in zip(_WORKER_ROWS, test_mask) if not is_test]
+    test_rows = [row for row, is_test in zip(_WORKER_ROWS, test_mask) if is_test]
+
+    model = fit_model(train_rows, task["model_name"])
+    index = build_song_index(model) if model["model_type"] == "song_knn_regressor" else None
+    test_matrix = rows_to_matrix(test_rows)
+    result = predict_matrix(model, test_matrix, index=index)
+    metrics = evaluate_prediction_matrix(result["pred"], test_matrix["true"])
+    return {
+        "repeat": task["repeat"],
+        "seed": task["seed"],
+        "fold_index": task["fold"] + 1,
+        "train_count": len(train_rows),
+        "test_count": len(test_rows),
+        "overall": metrics["overall"],
+    }
+
+
+def summarize(values: list) -> dict:
+    """Mean and sample variance of the values that are not None."""
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"mean": None, "variance": None}
+    return {
+        "mean": float(np.mean(values)),
+        "variance": float(np.var(values, ddof=1)) if len(values) > 1 else 0.0,
+    }
+
+
+def run_repeated_cv(
+    n_repeats: int = N_REPEATS,
+    n_folds: int = N_FOLDS,
+    base_seed: int = RANDOM_SEED,
+    model_name: str = "linear",
+    max_workers: int | None = None,
+) -> dict:
+    """Evaluate a baseline model over n_repeats x n_folds stratified splits.
+
+    This is an automated analysis path: it never touches splits/, results/
+    or the manual CV state.
+    """
+    if n_repeats < 1:
+        raise ValueError("Repeated CV needs at least 1 repetition.")
+    if n_folds < 2:
+        raise ValueError("Repeated CV needs at least 2 folds.")
+    log_agent_action(
+        7,
+        "run_repeated_cv",
+        "started",
+        {"n_repeats": n_repeats, "n_folds": n_folds, "base_seed": base_seed, "model_name": model_name},
+    )
+
+    discovery_bundle = discover_eligible_samples()
+    if discovery_bundle["integrity_report"]["status"] == "failed":
+        raise RuntimeError("Dataset integrity checks failed. See state/agent_reports for details.")
+    rows = discovery_bundle["eligible_rows"]
+    strata = [row["intended_emotion"] for row in rows]
+
+    tasks = []
+    for repeat in range(n_repeats):
+        seed = base_seed + repeat
+        assignments = assign_stratified_folds(strata, n_folds, seed)
+        # Each task ships only its own test indices; the rows reach the workers once, via _init_worker.
+        for fold in range(n_folds):
+            tasks.append(
+                {
+                    "repeat": repeat + 1,
+                    "seed": seed,
+                    "fold": fold,
+                    "test_indices": np.flatnonzero(assignments == fold),
+                    "model_name": model_name,
+                }
+            )
+
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if max_workers == 1:
+        _init_worker(rows)
+        split_results = [_evaluate_split(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(rows,)) as executor:
+            split_results = list(executor.map(_evaluate_split, tasks))
+
+    metric_names = sorted(split_results[0]["overall"]) if split_results else []
+    repetitions = []
+    for repeat in range(1, n_repeats + 1):
+        repeat_splits = [split for split in split_results if split["repeat"] == repeat]
+        repetitions.append(
+            {
+                "repeat": repeat,
+                "seed": repeat_splits[0]["seed"],
+                "overall": {
+                    metric: summarize([split["overall"][metric] for split in repeat_splits])["mean"]
+                    for metric in metric_names
+                },
+            }
+        )
+
+    report = {
+        "generated_at": utc_now(),
+        "model_name": model_name,
+        "n_repeats": n_repeats,
+        "n_folds": n_folds,
+        "base_seed": base_seed,
+        "eligible_sample_count": len(rows),
+        "summary": {
+            metric: summarize([repetition["overall"][metric] for repetition in repetitions])
+            for metric in metric_names
+        },
+        "repetitions": repetitions,
+        "splits": split_results,
+    }
+    report_path = REPEATED_CV_DIR / f"{model_name}_r{n_repeats}_k{n_folds}.json"
+    write_json(report_path, report)
+    log_agent_action(
+        7,
+        "run_repeated_cv",
+        "completed",
+        {"report_path": str(report_path), "summary": report["summary"]},
+    )
+    return report
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+DEFAULT_LEAF_SIZE = 16
+QUERY_BLOCK_CELLS = 1 << 22
+
+
+class KDTree:
+    """Static KD-tree over a fixed point set, built once and queried in batches."""
+
+    def __init__(self, points, leaf_size: int = DEFAULT_LEAF_SIZE):
+        self.points = np.ascontiguousarray(points, dtype=float)
+        if self.points.ndim != 2:
+            raise ValueError("KDTree points must be a 2-D array.")
+        self.leaf_size = max(1, int(leaf_size))
+        self.order = np.arange(len(self.points))
+
+        self._start = []
+        self._end = []
+        self._left = []
+        self._right = []
+        self._lower = []
+        self._upper = []
+        if len(self.points):
+            self._build(0, len(self.points))
+            self._pack_leaves()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._start)
+        members = self.order[start:end]
+        block = self.points[members]
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._lower.append(block.min(axis=0))
+        self._upper.append(block.max(axis=0))
+
+        if end - start <= self.leaf_size:
+            return node
+
+        split_dim = int(np.argmax(self._upper[node] - self._lower[node]))
+        middle = (end - start) // 2
+        partition = np.argpartition(block[:, split_dim], middle)
+        self.order[start:end] = members[partition]
+
+        self._left[node] = self._build(start, start + middle)
+        self._right[node] = self._build(start + middle, end)
+        return node
+
+    def _pack_leaves(self) -> None:
+        """Leaf boxes and member indices as padded arrays, so a batch of queries scans leaves together."""
+        leaves = [node for node in range(len(self._start)) if self._left[node] < 0]
+        width = max(self._end[node] - self._start[node] for node in leaves)
+        self._leaf_lower = np.array([self._lower[node] for node in leaves])
+        self._leaf_upper = np.array([self._upper[node] for node in leaves])
+        # Padding slots point at an extra row at infinity, which never ranks among the k nearest.
+        self._leaf_members = np.full((len(leaves), width), len(self.points))
+        for row, node in enumerate(leaves):
+            members = self.order[self._start[node]:self._end[node]]
+            self._leaf_members[row, :len(members)] = members
+        self._padded_points = np.vstack([self.points, np.full((1, self.points.shape[1]), np.inf)])
+
+    def _query_block(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Visit each query's leaves nearest box first until no unvisited box can beat its k-th neighbour."""
+        gaps = np.maximum(self._leaf_lower[None] - queries[:, None], 0.0)
+        gaps += np.maximum(queries[:, None] - self._leaf_upper[None], 0.0)
+        bounds = np.einsum("qld,qld->ql", gaps, gaps)
+        visit_order = np.argsort(bounds, axis=1)
+        rows = np.arange(len(queries))
+
+        best_distances = np.full((len(queries), k), np.inf)
+        best_indices = np.full((len(queries), k), len(self.points))
+        for rank in range(visit_order.shape[1]):
+            leaves = visit_order[:, rank]
+            # Boxes are visited in increasing bound order, so a query that stops here is finished.
+            active = np.flatnonzero(bounds[rows, leaves] <= best_distances[:, -1])
+            if not len(active):
+                break
+            members = self._leaf_members[leaves[active]]
+            deltas = self._padded_points[members] - queries[active, None, :]
+            distances = np.einsum("asd,asd->as", deltas, deltas)
+            merged_distances = np.concatenate([best_distances[active], distances], axis=1)
+            merged_indices = np.concatenate([best_indices[active], members], axis=1)
+            # Ties go to the lower point index, as in a stable brute-force sort.
+            keep = np.lexsort((merged_indices, merged_distances), axis=-1)[:, :k]
+            best_distances[active] = np.take_along_axis(merged_distances, keep, axis=1)
+            best_indices[active] = np.take_along_axis(merged_indices, keep, axis=1)
+        return np.sqrt(best_distances), best_indices
+
+    def query(self, queries, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """Return (distances, indices) of the k nearest points for every query row."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        if not len(self.points):
+            raise ValueError("Cannot query an empty KDTree.")
+        k = int(k)
+        if not 1 <= k <= len(self.points):
+            raise ValueError(f"k must be between 1 and the number of points ({len(self.points)}); got {k}.")
+
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=int)
+        # Bound the (queries x leaves x dims) box-distance temporaries.
+        block = max(1, QUERY_BLOCK_CELLS // (len(self._leaf_members) * self.points.shape[1]))
+        for start in range(0, len(queries), block):
+            stop = start + block
+            distances[start:stop], indices[start:stop] = self._query_block(queries[start:stop], k)
+        return distances, indices
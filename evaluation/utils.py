@@ -38,6 +38,18 @@ def read_csv_rows(path: Path):
         return list(csv.DictReader(handle))
 
 
+def read_csv_column(path: Path, column: str) -> list:
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        if not any(header):
+            return []
+        if column not in header:
+            raise KeyError(f"{path} has no '{column}' column.")
+        position = header.index(column)
+        return [record[position] for record in reader]
+
+
 def write_csv(path: Path, rows, fieldnames) -> None:
     ensure_directory(path.parent)
     with path.open("w", encoding="utf-8", newline="") as handle:
@@ -47,6 +59,14 @@ def write_csv(path: Path, rows, fieldnames) -> None:
             writer.writerow(row)
 
 
+def write_csv_records(path: Path, fieldnames, records) -> None:
+    ensure_directory(path.parent)
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(fieldnames)
+        writer.writerows(records)
+
+
 def append_jsonl(path: Path, payload) -> None:
     ensure_directory(path.parent)
     with path.open("a", encoding="utf-8") as handle:
@@ -8,6 +8,8 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from annotation.llm_clients import USE_MOCK
+from annotation.registry import annotator_names
+from annotation.telemetry import load_events
 from evaluation import fold_orchestrator
 from evaluation.export_results import (
     export_fold_metrics_csv,
@@ -27,7 +29,7 @@ USER_RESPONSES_PATH = ROOT_DIR / "data" / "user_emotion_responses.json"
 USER_FOLDS_PATH = ROOT_DIR / "state" / "user_folds.json"
 REPORTS_DIR = ROOT_DIR / "state" / "agent_reports"
 EXPORTS_DIR = ROOT_DIR / "data" / "exports"
-DISPLAY_ANNOTATORS = ["deepseek", "gemini", "mistral", "human_test", "human_consensus"]
+DISPLAY_ANNOTATORS = [*annotator_names(), "human_test", "human_consensus", "human_train_consensus"]
 
 
 def _load_json(path: Path, default):
@@ -79,7 +81,7 @@ def _render_overview() -> None:
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("**Active Models**")
-        st.write(", ".join(["deepseek", "gemini", "mistral"]))
+        st.write(", ".join(annotator_names()))
     with col2:
         st.markdown("**Execution Mode**")
         _render_badge("MOCK" if USE_MOCK else "LIVE", "#d97706" if USE_MOCK else "#15803d")
@@ -217,7 +219,7 @@ def _render_cross_model_analysis() -> None:
 
     for fold_result in results["folds"]:
         fold_number = fold_result["fold"]
-        for annotator in ["deepseek", "gemini", "mistral"]:
+        for annotator in annotator_names():
             metrics = fold_result["comparisons"]["human_test"][annotator]
             for emotion in EMOTION_COLUMNS:
                 per_emotion_rows.append(
@@ -300,6 +302,105 @@ def _render_agent_reports() -> None:
     st.json(report)
 
 
+def _telemetry_frame() -> pd.DataFrame:
+    df = pd.DataFrame(load_events())
+    if df.empty:
+        return df
+    df["started_at"] = pd.to_datetime(df["started_at"], utc=True)
+    df["ended_at"] = pd.to_datetime(df["ended_at"], utc=True)
+    return df
+
+
+def _render_telemetry() -> None:
+    df = _telemetry_frame()
+    if df.empty:
+        st.info("No LLM call telemetry recorded yet.")
+        return
+
+    run_ids = sorted(df["run_id"].dropna().unique(), reverse=True)
+    selected_runs = st.multiselect("Runs", run_ids, default=run_ids[:1])
+    if selected_runs:
+        df = df[df["run_id"].isin(selected_runs)]
+
+    calls = df[df["cache"] != "hit"]
+    cache_hit_rate = float((df["cache"] == "hit").mean())
+    # Cancelled hedge losers are billed calls but not errors.
+    failed = ~calls["outcome"].isin(["ok", "cancelled"])
+    error_rate = float(failed.mean()) if len(calls) else 0.0
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Provider Calls", len(calls))
+    col2.metric("Cache Hit Rate", f"{cache_hit_rate:.1%}")
+    col3.metric("Error Rate", f"{error_rate:.1%}")
+    col4.metric("Estimated Cost", f"${calls['cost_usd'].sum():.4f}")
+    if calls.empty:
+        st.info("The selected runs were served entirely from the cache.")
+        return
+
+    st.subheader("Throughput")
+    successes = calls[calls["outcome"] == "ok"]
+    throughput = (
+        successes.set_index("ended_at")
+        .groupby("model")
+        .resample("1min")["songs"]
+        .apply(lambda songs: sum(len(entry) for entry in songs))
+        .reset_index(name="songs_per_minute")
+    )
+    st.plotly_chart(
+        px.line(throughput, x="ended_at", y="songs_per_minute", color="model", title="Annotated Songs per Minute"),
+        use_container_width=True,
+    )
+
+    st.subheader("Latency per Model")
+    latency_rows = []
+    for model, group in calls.groupby("model"):
+        latencies = group.loc[group["outcome"] == "ok", "latency_seconds"]
+        latency_rows.append(
+            {
+                "model": model,
+                "calls": len(group),
+                "p50_seconds": latencies.quantile(0.5) if len(latencies) else None,
+                "p95_seconds": latencies.quantile(0.95) if len(latencies) else None,
+                "p99_seconds": latencies.quantile(0.99) if len(latencies) else None,
+                "error_rate": float(failed[group.index].mean()),
+                "retries": int((group["attempt"] > 0).sum()),
+                "prompt_tokens": group["prompt_tokens"].sum(min_count=1),
+                "completion_tokens": group["completion_tokens"].sum(min_count=1),
+                "estimated_cost_usd": group["cost_usd"].sum(),
+            }
+        )
+    st.dataframe(pd.DataFrame(latency_rows), hide_index=True, use_container_width=True)
+    st.plotly_chart(
+        px.box(calls[calls["outcome"] == "ok"], x="model", y="latency_seconds", title="Latency Distribution"),
+        use_container_width=True,
+    )
+
+    if "prompt_variant" in calls and calls["prompt_variant"].notna().any():
+        st.subheader("Prompt Variants")
+        variant_rows = []
+        for variant, group in calls.groupby("prompt_variant"):
+            succeeded = group[group["outcome"] == "ok"]
+            variant_rows.append(
+                {
+                    "prompt_variant": variant,
+                    "calls": len(group),
+                    "mean_prompt_tokens": succeeded["prompt_tokens"].mean(),
+                    "mean_cached_prompt_tokens": succeeded.get("cached_prompt_tokens", pd.Series(dtype=float)).mean(),
+                    "mean_completion_tokens": succeeded["completion_tokens"].mean(),
+                    "p50_seconds": succeeded["latency_seconds"].quantile(0.5) if len(succeeded) else None,
+                    "p95_seconds": succeeded["latency_seconds"].quantile(0.95) if len(succeeded) else None,
+                    "estimated_cost_usd": group["cost_usd"].sum(),
+                }
+            )
+        st.dataframe(pd.DataFrame(variant_rows), hide_index=True, use_container_width=True)
+
+    st.subheader("Outcomes")
+    outcomes = calls.groupby(["model", "outcome"]).size().reset_index(name="calls")
+    st.plotly_chart(
+        px.bar(outcomes, x="model", y="calls", color="outcome", title="Call Outcomes per Model"),
+        use_container_width=True,
+    )
+
+
 def render(page_name: str):
     st.header("LLM Analysis")
 
@@ -311,5 +412,7 @@ def render(page_name: str):
         _render_cross_model_analysis()
     elif page_name == "Agent Reports":
         _render_agent_reports()
+    elif page_name == "Telemetry":
+        _render_telemetry()
     else:
         st.info("Unknown LLM Analysis page.")
@@ -0,0 +1,34 @@
+import csv
+
+import pytest
+
+from annotation import llm_clients, pool, response_cache, telemetry
+from annotation.prompt_builder import EMOTION_ORDER
+
+
+_SONGS = [
+    {"filename": f"awe\\awe_{index:05d}.mp3", **{emotion: 0.1 * (index + 1) for emotion in EMOTION_ORDER}}
+    for index in range(3)
+]
+
+
+@pytest.fixture
+def mock_state(tmp_path, monkeypatch):
+    """Mock mode with the pool, cache and telemetry kept under tmp_path."""
+    ground_truth = tmp_path / "ground_truth.csv"
+    with ground_truth.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=["filename", *EMOTION_ORDER])
+        writer.writeheader()
+        writer.writerows(_SONGS)
+    monkeypatch.setattr(llm_clients, "USE_MOCK", True)
+    monkeypatch.setattr(pool, "GROUND_TRUTH_PATH", ground_truth)
+    monkeypatch.setattr(pool, "POOL_DIR", tmp_path / "pool")
+    monkeypatch.setattr(response_cache, "CACHE_MODE", "bypass")
+    monkeypatch.setattr(telemetry, "TELEMETRY_PATH", tmp_path / "llm_calls.jsonl")
+    return tmp_path
+
+
+@pytest.fixture
+def mock_songs(mock_state):
+    """The ground-truth rows written by mock_state."""
+    return [dict(song) for song in _SONGS]
@@ -0,0 +1,82 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from annotation import annotate
+from annotation.llm_clients import _validate_batch_response
+from annotation.prompt_builder import EMOTION_ORDER, AnnotationRequest
+
+
+ANSWER = {emotion: 0.5 for emotion in EMOTION_ORDER}
+
+
+def _requests(count: int) -> list[AnnotationRequest]:
+    model_name = annotate.OUTPUT_MODELS[0]
+    return [
+        AnnotationRequest(model_name, f"awe\\awe_{index:05d}.mp3", "awe", ANSWER)
+        for index in range(count)
+    ]
+
+
+def test_batch_response_keeps_valid_elements_only():
+    payload = {
+        "annotations": [
+            {"song_id": "1", **ANSWER},
+            {"song_id": "2", **ANSWER},
+            {"song_id": "2", **ANSWER},
+            {"song_id": "3", **ANSWER, "anger": 1.5},
+            {"song_id": "4", "anger": 0.1},
+            {"song_id": "9", **ANSWER},
+            "not an element",
+        ]
+    }
+
+    validated, errors = _validate_batch_response(payload, ["1", "2", "3", "4", "5"], "p")
+
+    assert validated == {"1": ANSWER}
+    assert "more than once" in errors["2"]
+    assert "out-of-range" in errors["3"]
+    assert "keys invalid" in errors["4"]
+    assert "no element" in errors["5"]
+
+
+def test_batch_response_must_be_an_array():
+    assert _validate_batch_response([{"song_id": "1", **ANSWER}], ["1"], "p") == ({"1": ANSWER}, {})
+    with pytest.raises(ValueError, match="non-array"):
+        _validate_batch_response({"a": [], "b": []}, ["1"], "p")
+
+
+def test_unanswered_songs_are_split_down_to_single_prompts(mock_state, monkeypatch):
+    requests = _requests(8)
+    # These songs only get a valid answer from the single-song prompt.
+    stubborn = {request.filename for request in requests[::2]}
+    batch_sizes = []
+    single_calls = []
+
+    async def fake_batch_call(pending, trace=None, endpoint=None, scheduler=None):
+        batch_sizes.append(len(pending))
+        results = {request.filename: ANSWER for request in pending if request.filename not in stubborn}
+        errors = {request.filename: "invalid" for request in pending if request.filename in stubborn}
+        return results, errors, endpoint
+
+    async def fake_single_call(request, trace=None, endpoint=None, scheduler=None):
+        single_calls.append(request.filename)
+        return ANSWER, endpoint
+
+    monkeypatch.setattr(annotate, "call_model_batch_async", fake_batch_call)
+    monkeypatch.setattr(annotate, "call_model_async", fake_single_call)
+    saved = Counter()
+
+    failures = asyncio.run(
+        annotate.run_annotation_tasks(
+            requests,
+            lambda filename, model_name, row: saved.update([filename]),
+            batch_size=8,
+        )
+    )
+
+    assert failures == []
+    assert batch_sizes == [8, 2, 2]
+    assert sorted(single_calls) == sorted(stubborn)
+    assert saved == Counter(request.filename for request in requests)
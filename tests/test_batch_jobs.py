@@ -0,0 +1,38 @@
+import csv
+
+from annotation import batch_jobs, pool
+from annotation.prompt_builder import AnnotationRequest
+from annotation.registry import annotator_names
+
+
+def _pool_lines(model_name: str) -> int:
+    with pool.pool_path(model_name).open("r", encoding="utf-8", newline="") as handle:
+        return sum(1 for _ in csv.DictReader(handle))
+
+
+def test_ingest_is_idempotent_and_resumable(mock_state, mock_songs):
+    job = mock_state / "job"
+    model_name = annotator_names()[0]
+    requests = [AnnotationRequest.from_song(song, model_name) for song in mock_songs]
+    batch_jobs.write_batch_requests(job, requests)
+
+    assert batch_jobs.process_batch_locally(job, limit=2) == 2
+    assert batch_jobs.ingest_batch_results(job)["ingested"] == 2
+    again = batch_jobs.ingest_batch_results(job)
+    assert again["ingested"] == 0 and again["already_pooled"] == 2
+    assert _pool_lines(model_name) == 2
+
+    # The rest of the job arrives, with a repeated line and a truncated one.
+    assert batch_jobs.process_batch_locally(job) == 1
+    results_path = job / batch_jobs.RESULTS_FILENAME
+    first_line = results_path.read_text(encoding="utf-8").splitlines()[0]
+    with results_path.open("a", encoding="utf-8") as handle:
+        handle.write(first_line + "\n")
+        handle.write(first_line[:40] + "\n")
+
+    summary = batch_jobs.ingest_batch_results(job)
+    assert summary["ingested"] == 1 and summary["already_pooled"] == 3
+    assert list(summary["failed"]) == ["line 5"]
+    assert _pool_lines(model_name) == 3
+    assert set(pool.load_pool(model_name)) == {song["filename"] for song in mock_songs}
+    assert batch_jobs.job_status(job)["pending"] == 0
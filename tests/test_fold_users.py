@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pytest
+
+from evaluation import fold_users
+from evaluation.fold_users import assign_cost_balanced_folds, assign_user_folds, fold_test_users, user_fold_map
+
+
+N_FOLDS = 5
+
+
+def _strata(size: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.array([f"{gender}|{age}" for gender, age in zip(rng.integers(3, size=size), rng.integers(4, size=size))])
+
+
+def _assert_stratified(strata: np.ndarray, assignment: np.ndarray) -> None:
+    assert set(assignment.tolist()) <= set(range(1, N_FOLDS + 1))
+    for stratum in np.unique(strata):
+        members = assignment[strata == stratum]
+        per_fold = np.bincount(members, minlength=N_FOLDS + 1)[1:]
+        assert per_fold.max() <= -(-len(members) // N_FOLDS)
+
+
+@pytest.mark.parametrize("balance_responses", [False, True])
+def test_assignment_is_stratified_and_deterministic(balance_responses):
+    strata = _strata(997)
+    response_counts = np.random.default_rng(1).integers(1, 60, size=len(strata))
+
+    assignment = assign_user_folds(strata, response_counts, N_FOLDS, seed=7, balance_responses=balance_responses)
+
+    _assert_stratified(strata, assignment)
+    repeated = assign_user_folds(strata, response_counts, N_FOLDS, seed=7, balance_responses=balance_responses)
+    np.testing.assert_array_equal(assignment, repeated)
+
+
+def test_round_robin_deals_users_evenly():
+    assignment = assign_user_folds(_strata(997), np.ones(997, dtype=int), N_FOLDS, seed=7)
+    user_counts = np.bincount(assignment, minlength=N_FOLDS + 1)[1:]
+    assert user_counts.max() - user_counts.min() <= 1
+
+
+def test_response_balancing_evens_out_fold_responses():
+    strata = _strata(2000, seed=2)
+    response_counts = np.random.default_rng(3).integers(1, 200, size=len(strata))
+
+    plain = assign_user_folds(strata, response_counts, N_FOLDS, seed=0)
+    balanced = assign_user_folds(strata, response_counts, N_FOLDS, seed=0, balance_responses=True)
+
+    def spread(assignment: np.ndarray) -> float:
+        loads = np.bincount(assignment, weights=response_counts, minlength=N_FOLDS + 1)[1:]
+        return loads.max() - loads.min()
+
+    assert spread(balanced) < spread(plain)
+    assert spread(balanced) <= response_counts.max()
+
+
+def test_cost_balancing_respects_strata_and_evens_out_songs():
+    strata = _strata(300, seed=4)
+    rng = np.random.default_rng(5)
+    song_sets = [set(rng.choice(400, size=rng.integers(1, 30), replace=False).tolist()) for _ in strata]
+
+    assignment = assign_cost_balanced_folds(strata, song_sets, N_FOLDS, seed=0)
+
+    _assert_stratified(strata, assignment)
+    unique_songs = [
+        len(set().union(*(songs for songs, fold in zip(song_sets, assignment) if fold == fold_number)))
+        for fold_number in range(1, N_FOLDS + 1)
+    ]
+    assert max(unique_songs) - min(unique_songs) <= 0.1 * max(unique_songs)
+
+
+def test_user_fold_map_reads_both_formats():
+    assignment_format = {"user_ids": ["a", "b", "c"], "assignment": [2, 1, 2]}
+    legacy_format = {"folds": {"1": {"test_users": ["b"]}, "2": {"test_users": ["a", "c"]}}}
+
+    assert user_fold_map(assignment_format) == user_fold_map(legacy_format) == {"a": 2, "b": 1, "c": 2}
+    assert fold_test_users(assignment_format, 2) == {"a", "c"}
+
+
+def test_saved_folds_keep_only_the_assignment(tmp_path, monkeypatch):
+    demographics = {"gender": "F", "age_range": "18-24", "nationality": "Atlantis", "music_genres": ["Polka"]}
+    raw_data = {
+        "userData": {
+            f"user{index}": {"demographics": demographics, "emotionResponses": [{"song": "songs/a.mp3"}]}
+            for index in range(10)
+        }
+    }
+    responses_path = tmp_path / "responses.json"
+    responses_path.write_text(json.dumps(raw_data), encoding="utf-8")
+    monkeypatch.setattr(fold_users, "USER_RESPONSES_PATH", responses_path)
+    output_path = tmp_path / "user_folds.json"
+
+    result = fold_users.build_user_folds(n_folds=N_FOLDS, output_path=output_path)
+
+    saved = output_path.read_text(encoding="utf-8")
+    assert json.loads(saved) == result
+    assert "users" not in result and "Atlantis" not in saved and "Polka" not in saved
+    assert len(fold_test_users(result, 1)) == 2
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from annotation.llm_clients import HedgePolicy, hedged_race
+from annotation.scheduler import AsyncScheduler
+
+
+TRIGGER_SECONDS = 0.02
+PRIMARY_SECONDS = 0.2
+
+
+def test_trigger_waits_for_enough_history():
+    policy = HedgePolicy(quantile=0.9, min_samples=10)
+    for latency in range(1, 10):
+        policy.record_latency("p", float(latency))
+    assert policy.trigger_delay("p") is None
+    policy.record_latency("p", 10.0)
+    assert policy.trigger_delay("p") == 10.0
+
+
+def test_hedges_are_capped_by_the_budget():
+    policy = HedgePolicy(budget_fraction=0.1)
+    spent = 0
+    for _ in range(100):
+        policy.trigger_delay("p")
+        spent += policy.try_spend("p")
+    assert spent == 10
+    stats = policy.stats()["p"]
+    assert stats["hedged"] == 10 and stats["skipped_budget"] == 90
+    assert stats["hedge_rate"] == pytest.approx(0.1)
+
+    # A refused admission hands the hedge back to the budget.
+    policy.refund("p")
+    assert policy.stats()["p"]["hedged"] == 9 and policy.stats()["p"]["skipped_admission"] == 1
+
+
+def _race(max_concurrency: int):
+    hedging = HedgePolicy(min_samples=1, budget_fraction=1.0)
+    hedging.record_latency("p", TRIGGER_SECONDS)
+    abandoned = []
+    calls = []
+
+    async def make_call():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(PRIMARY_SECONDS)
+            return "primary"
+        return "hedge"
+
+    async def main():
+        scheduler = AsyncScheduler(
+            ["p"],
+            rate_limited=False,
+            limits={"p": {"requests_per_minute": 60, "max_concurrency": max_concurrency}},
+        )
+        result = await scheduler.run(
+            "p",
+            lambda attempt, endpoint: hedged_race(
+                hedging,
+                "p",
+                make_call,
+                scheduler=scheduler,
+                endpoint=endpoint,
+                on_abandoned=lambda *attempt: abandoned.append(attempt),
+            ),
+        )
+        return scheduler, result
+
+    scheduler, result = asyncio.run(main())
+    return hedging, scheduler, result, abandoned
+
+
+def test_hedge_is_admitted_and_the_loser_is_reported():
+    hedging, scheduler, result, abandoned = _race(max_concurrency=2)
+
+    assert result == "hedge"
+    assert hedging.stats()["p"]["hedge_wins"] == 1
+    assert scheduler.stats()["p"]["requests"] == 2
+    assert scheduler.policies["p"].in_flight == 0
+    # The cancelled primary is logged, and its elapsed time is kept as a lower bound.
+    [(elapsed, loser_result, exc)] = abandoned
+    assert isinstance(exc, asyncio.CancelledError) and loser_result is None
+    assert elapsed >= TRIGGER_SECONDS
+    assert len(hedging.latencies["p"]) == 3 and max(hedging.latencies["p"]) >= TRIGGER_SECONDS
+
+
+def test_hedge_without_a_free_slot_is_skipped():
+    hedging, scheduler, result, abandoned = _race(max_concurrency=1)
+
+    assert result == "primary" and abandoned == []
+    stats = hedging.stats()["p"]
+    assert stats["hedged"] == 0 and stats["skipped_admission"] == 1
+    assert scheduler.stats()["p"]["requests"] == 1
+
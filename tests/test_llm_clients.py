@@ -0,0 +1,17 @@
+from annotation import llm_clients
+
+
+def test_standin_answers_get_their_own_run_mode_and_cache_keys(monkeypatch):
+    monkeypatch.setattr(llm_clients, "USE_MOCK", False)
+    monkeypatch.setattr(llm_clients, "OPENROUTER_BASE_URL", llm_clients.DEFAULT_OPENROUTER_BASE_URL)
+    live = llm_clients._cache_params(batched=False)
+    assert llm_clients.get_run_mode() == "live"
+    assert "base_url" not in live
+
+    monkeypatch.setattr(llm_clients, "OPENROUTER_BASE_URL", "http://127.0.0.1:8765/v1")
+    assert llm_clients.get_run_mode() == "standin"
+    assert llm_clients._cache_params(batched=False) == {**live, "base_url": "http://127.0.0.1:8765/v1"}
+    assert llm_clients._cache_params(batched=True)["base_url"] == "http://127.0.0.1:8765/v1"
+
+    monkeypatch.setattr(llm_clients, "USE_MOCK", True)
+    assert llm_clients.get_run_mode() == "mock"
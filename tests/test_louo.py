@@ -0,0 +1,69 @@
+import numpy as np
+
+from evaluation.constants import EMOTION_COLUMNS
+from evaluation.louo import _leave_one_user_out_consensus, _leave_one_user_out_linear
+from evaluation.model import fit_baseline_model, predict_rows
+
+
+def _rows(seed: int = 0, users: int = 6, songs: int = 9, responses: int = 40) -> list:
+    rng = np.random.default_rng(seed)
+    song_vectors = rng.random((songs, len(EMOTION_COLUMNS)))
+    rows = []
+    for index in range(responses):
+        user = int(rng.integers(users))
+        song = int(rng.integers(songs))
+        rows.append(
+            {
+                "sample_id": f"s{index}",
+                "user_id": f"u{user}",
+                "song_key": f"song{song}",
+                **{
+                    f"song_{emotion}": float(song_vectors[song, position])
+                    for position, emotion in enumerate(EMOTION_COLUMNS)
+                },
+                **{f"true_{emotion}": float(rng.random()) for emotion in EMOTION_COLUMNS},
+            }
+        )
+    return rows
+
+
+def _arrays(rows: list) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    _, user_codes = np.unique([row["user_id"] for row in rows], return_inverse=True)
+    _, song_codes = np.unique([row["song_key"] for row in rows], return_inverse=True)
+    song_matrix = np.array([[row[f"song_{emotion}"] for emotion in EMOTION_COLUMNS] for row in rows])
+    true_matrix = np.array([[row[f"true_{emotion}"] for emotion in EMOTION_COLUMNS] for row in rows])
+    return user_codes, song_codes, song_matrix, true_matrix
+
+
+def test_linear_downdating_matches_refit_without_each_user():
+    rows = _rows()
+    user_codes, _, song_matrix, true_matrix = _arrays(rows)
+    downdated = _leave_one_user_out_linear(user_codes, song_matrix, true_matrix)
+
+    for user_id in sorted({row["user_id"] for row in rows}):
+        held_out = [row for row in rows if row["user_id"] == user_id]
+        model = fit_baseline_model([row for row in rows if row["user_id"] != user_id])
+        positions = [position for position, row in enumerate(rows) if row["user_id"] == user_id]
+        refit = np.array(
+            [
+                [prediction[f"pred_{emotion}"] for emotion in EMOTION_COLUMNS]
+                for prediction in predict_rows(model, held_out)
+            ]
+        )
+        np.testing.assert_allclose(downdated[positions], refit, atol=1e-6)
+
+
+def test_consensus_excludes_the_rows_own_user():
+    rows = _rows(seed=1)
+    user_codes, song_codes, _, true_matrix = _arrays(rows)
+    consensus, has_consensus = _leave_one_user_out_consensus(user_codes, song_codes, true_matrix)
+
+    for position, row in enumerate(rows):
+        others = [
+            other_position
+            for other_position, other in enumerate(rows)
+            if other["song_key"] == row["song_key"] and other["user_id"] != row["user_id"]
+        ]
+        assert has_consensus[position] == bool(others)
+        if others:
+            np.testing.assert_allclose(consensus[position], true_matrix[others].mean(axis=0))
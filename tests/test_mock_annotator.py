@@ -0,0 +1,33 @@
+import numpy as np
+
+from annotation.mock_annotator import EMOTION_ORDER, annotate_matrix_with_mock, annotate_with_mock
+
+
+MODELS = ["deepseek", "gemini", "mistral", "unprofiled-annotator"]
+
+
+def _songs(count: int, seed: int = 0) -> tuple[list[str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    song_keys = [f"{EMOTION_ORDER[index % 8]}\\clip_{index:05d}.mp3" for index in range(count)]
+    return song_keys, np.round(rng.random((count, len(EMOTION_ORDER))), 4)
+
+
+def test_bulk_mock_matches_per_song_mock():
+    song_keys, ground_truth = _songs(40)
+    bulk = annotate_matrix_with_mock(ground_truth, MODELS, song_keys)
+
+    for model_name in MODELS:
+        for row, (song_key, values) in enumerate(zip(song_keys, ground_truth)):
+            single = annotate_with_mock(dict(zip(EMOTION_ORDER, values.tolist())), model_name, song_key)
+            assert [single[emotion] for emotion in EMOTION_ORDER] == bulk[model_name][row].tolist()
+
+
+def test_answers_do_not_depend_on_the_rest_of_the_matrix():
+    song_keys, ground_truth = _songs(30, seed=1)
+    full = annotate_matrix_with_mock(ground_truth, MODELS, song_keys)
+    order = np.random.default_rng(2).permutation(len(song_keys))[:10]
+    subset = annotate_matrix_with_mock(ground_truth[order], MODELS[::-1], [song_keys[index] for index in order])
+
+    for model_name in MODELS:
+        np.testing.assert_array_equal(subset[model_name], full[model_name][order])
+        assert ((full[model_name] >= 0.0) & (full[model_name] <= 1.0)).all()
@@ -0,0 +1,87 @@
+import numpy as np
+
+from evaluation.constants import EMOTION_COLUMNS
+from evaluation.model import fit_baseline_model, fit_model, fit_user_effects_model, predict_matrix, rows_to_matrix
+
+
+N_USERS = 40
+N_SONGS = 60
+N_EMOTIONS = len(EMOTION_COLUMNS)
+
+
+def _planted(interaction_scale: float = 0.0, seed: int = 0) -> dict:
+    """Every user rates every song: true = 0.8 * song + 0.1 + user offset + song offset (+ rank-2 interaction)."""
+    rng = np.random.default_rng(seed)
+    song_vectors = rng.uniform(0.2, 0.8, size=(N_SONGS, N_EMOTIONS))
+    user_offsets = rng.normal(scale=0.05, size=(N_USERS, N_EMOTIONS))
+    song_offsets = rng.normal(scale=0.05, size=(N_SONGS, N_EMOTIONS))
+    user_factors = rng.normal(size=(N_USERS, 2))
+    item_factors = rng.normal(size=(N_SONGS, N_EMOTIONS, 2))
+
+    rows = []
+    for user in range(N_USERS):
+        for song in range(N_SONGS):
+            true = 0.8 * song_vectors[song] + 0.1 + user_offsets[user] + song_offsets[song]
+            true = true + interaction_scale * (item_factors[song] @ user_factors[user])
+            true = true + rng.normal(scale=0.01, size=N_EMOTIONS)
+            rows.append(
+                {
+                    "sample_id": f"u{user}_s{song}",
+                    "user_id": f"u{user:02d}",
+                    "song_key": f"s{song:02d}",
+                    **{f"song_{emotion}": value for emotion, value in zip(EMOTION_COLUMNS, song_vectors[song])},
+                    **{f"true_{emotion}": value for emotion, value in zip(EMOTION_COLUMNS, true)},
+                }
+            )
+    return {"rows": rows, "user_offsets": user_offsets, "song_offsets": song_offsets}
+
+
+def _mae(model: dict, rows: list) -> float:
+    matrix = rows_to_matrix(rows)
+    return float(predict_matrix(model, matrix)["abs_error"].mean())
+
+
+def test_planted_user_and_song_offsets_are_recovered():
+    planted = _planted()
+    model = fit_user_effects_model(planted["rows"])
+
+    assert model["user_ids"] == [f"u{user:02d}" for user in range(N_USERS)]
+    user_bias = np.asarray(model["user_bias"])
+    song_bias = np.asarray(model["song_bias"])
+    # Ridge shrinkage leaves the offsets slightly smaller than planted.
+    assert np.corrcoef(user_bias.ravel(), planted["user_offsets"].ravel())[0, 1] > 0.95
+    assert np.corrcoef(song_bias.ravel(), planted["song_offsets"].ravel())[0, 1] > 0.95
+    assert np.abs(user_bias - planted["user_offsets"]).max() < 0.03
+    assert _mae(model, planted["rows"]) < 0.5 * _mae(fit_baseline_model(planted["rows"]), planted["rows"])
+
+
+def test_unseen_users_and_songs_fall_back_to_the_population_model():
+    rows = _planted()["rows"]
+    model = fit_user_effects_model(rows, rank=2)
+    known = rows_to_matrix([row for row in rows if row["user_id"] == "u00"])
+    population = predict_matrix(model["population_model"], known)["pred"]
+    # u00 rated every song in song_keys order, so the song biases line up with its rows.
+    song_bias = np.asarray(model["song_bias"])
+
+    unseen_user = {**known, "user_ids": ["new"] * len(known["user_ids"])}
+    np.testing.assert_allclose(
+        predict_matrix(model, unseen_user)["pred"],
+        np.round(np.clip(population + song_bias, 0.0, 1.0), 6),
+        atol=1e-6,
+    )
+    unseen_pair = {**unseen_user, "song_keys": ["new"] * len(known["song_keys"])}
+    np.testing.assert_array_equal(predict_matrix(model, unseen_pair)["pred"], population)
+
+
+def test_low_rank_interactions_beat_the_linear_baseline():
+    rows = _planted(interaction_scale=0.05, seed=1)["rows"]
+    held_out = np.random.default_rng(2).random(len(rows)) < 0.2
+    train_rows = [row for row, is_test in zip(rows, held_out) if not is_test]
+    test_rows = [row for row, is_test in zip(rows, held_out) if is_test]
+
+    linear = _mae(fit_model(train_rows, "linear"), test_rows)
+    biases = _mae(fit_model(train_rows, "user_effects"), test_rows)
+    low_rank = _mae(fit_user_effects_model(train_rows, rank=2), test_rows)
+
+    assert low_rank < biases < linear
+    assert low_rank < 0.6 * linear
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from annotation import mock_annotator, pool
+
+
+def test_mock_pool_records_and_checks_the_generator_version(mock_state, monkeypatch):
+    pool.ensure_pool_is_current()
+    manifest = json.loads((pool.pool_dir() / "pool_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["mock_generator"] == mock_annotator.MOCK_GENERATOR_VERSION
+    pool.ensure_pool_is_current()
+
+    monkeypatch.setattr(pool, "MOCK_GENERATOR_VERSION", mock_annotator.MOCK_GENERATOR_VERSION + 1)
+    with pytest.raises(RuntimeError, match="mock_generator"):
+        pool.ensure_pool_is_current()
+
+
+def test_pool_from_before_versioning_is_refused(mock_state):
+    manifest_path = pool.pool_dir() / "pool_manifest.json"
+    manifest_path.parent.mkdir(parents=True)
+    manifest_path.write_text(
+        json.dumps({"run_mode": "mock", "ground_truth_sha256": pool._ground_truth_sha256()}),
+        encoding="utf-8",
+    )
+    with pytest.raises(RuntimeError, match="Remove it"):
+        pool.ensure_pool_is_current()
+
+
+def test_live_pool_is_tied_to_the_prompt_variant(mock_state, monkeypatch):
+    monkeypatch.setattr(pool, "get_run_mode", lambda: "live")
+    monkeypatch.setattr(pool, "PROMPT_VARIANT", "inline")
+    pool.ensure_pool_is_current()
+    manifest = json.loads((pool.pool_dir() / "pool_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["prompt_variant"] == "inline"
+
+    monkeypatch.setattr(pool, "PROMPT_VARIANT", "system_prefix")
+    with pytest.raises(RuntimeError, match="prompt_variant"):
+        pool.ensure_pool_is_current()
+
+
+def test_live_pool_from_before_variants_counts_as_inline(mock_state, monkeypatch):
+    monkeypatch.setattr(pool, "get_run_mode", lambda: "live")
+    manifest_path = pool.pool_dir() / "pool_manifest.json"
+    manifest_path.parent.mkdir(parents=True)
+    manifest_path.write_text(
+        json.dumps({"run_mode": "live", "ground_truth_sha256": pool._ground_truth_sha256()}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(pool, "PROMPT_VARIANT", "inline")
+    pool.ensure_pool_is_current()
+
+    monkeypatch.setattr(pool, "PROMPT_VARIANT", "system_prefix")
+    with pytest.raises(RuntimeError, match="prompt_variant"):
+        pool.ensure_pool_is_current()
@@ -0,0 +1,69 @@
+import pytest
+
+from annotation.prompt_builder import (
+    EMOTION_ORDER,
+    PROMPT_VARIANTS,
+    SYSTEM_PREFIX_BATCH_INSTRUCTIONS,
+    SYSTEM_PREFIX_INSTRUCTIONS,
+    AnnotationRequest,
+    build_batch_messages,
+    build_prompt,
+    messages_text,
+)
+
+
+SONG = {
+    "filename": "fear\\fear_00042.mp3",
+    **{emotion: 0.125 * position for position, emotion in enumerate(EMOTION_ORDER)},
+}
+OTHER_SONG = {"filename": "awe\\awe_00007.mp3", **{emotion: 0.5 for emotion in EMOTION_ORDER}}
+
+
+@pytest.mark.parametrize("variant", sorted(PROMPT_VARIANTS))
+def test_every_variant_renders_the_song_data(variant):
+    request = AnnotationRequest.from_song(SONG, "gemini", variant=variant)
+
+    assert request.variant == variant
+    assert request.intended_emotion == "fear"
+    assert request.prompt == messages_text(request.messages)
+    assert "primarily evoking fear" in request.messages[-1]["content"]
+    assert "amusement=0.0, anger=0.125" in request.messages[-1]["content"]
+
+
+def test_inline_is_the_original_single_message_prompt():
+    request = AnnotationRequest.from_song(SONG, "gemini", variant="inline")
+    assert request.messages == [{"role": "user", "content": build_prompt("", "fear", request.ground_truth)}]
+    assert request.prompt == request.messages[0]["content"]
+
+
+def test_system_prefix_shares_one_system_message_across_songs():
+    first = AnnotationRequest.from_song(SONG, "gemini", variant="system_prefix")
+    second = AnnotationRequest.from_song(OTHER_SONG, "mistral", variant="system_prefix")
+
+    assert [message["role"] for message in first.messages] == ["system", "user"]
+    assert first.messages[0] == second.messages[0] == {"role": "system", "content": SYSTEM_PREFIX_INSTRUCTIONS}
+    assert first.prompt != second.prompt
+    assert first.prompt != AnnotationRequest.from_song(SONG, "gemini", variant="inline").prompt
+
+
+@pytest.mark.parametrize("variant", sorted(PROMPT_VARIANTS))
+def test_batch_messages_label_each_song(variant):
+    requests = [AnnotationRequest.from_song(song, "gemini", variant=variant) for song in [SONG, OTHER_SONG]]
+    messages = build_batch_messages(requests, ["1", "2"])
+
+    text = messages_text(messages)
+    assert "- song_id 1: categorised as primarily evoking fear." in text
+    assert "- song_id 2: categorised as primarily evoking awe." in text
+    if variant == "system_prefix":
+        assert messages[0] == {"role": "system", "content": SYSTEM_PREFIX_BATCH_INSTRUCTIONS}
+
+
+def test_mixed_or_unknown_variants_are_rejected():
+    requests = [
+        AnnotationRequest.from_song(SONG, "gemini", variant="inline"),
+        AnnotationRequest.from_song(OTHER_SONG, "gemini", variant="system_prefix"),
+    ]
+    with pytest.raises(ValueError):
+        build_batch_messages(requests, ["1", "2"])
+    with pytest.raises(ValueError):
+        AnnotationRequest.from_song(SONG, "gemini", variant="no_such_variant")
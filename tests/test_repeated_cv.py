@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from evaluation.repeated_cv import assign_stratified_folds, run_repeated_cv
+
+
+N_FOLDS = 5
+
+
+def test_stratified_folds_are_balanced_and_seeded():
+    rng = np.random.default_rng(0)
+    strata = rng.choice(["awe", "fear", "sadness", "anger"], size=503, p=[0.4, 0.3, 0.2, 0.1]).tolist()
+
+    assignments = assign_stratified_folds(strata, N_FOLDS, seed=11)
+
+    assert set(assignments.tolist()) == set(range(N_FOLDS))
+    fold_sizes = np.bincount(assignments, minlength=N_FOLDS)
+    assert fold_sizes.max() - fold_sizes.min() <= 1
+    for stratum in set(strata):
+        per_fold = np.bincount(assignments[np.asarray(strata) == stratum], minlength=N_FOLDS)
+        assert per_fold.max() - per_fold.min() <= 1
+
+    np.testing.assert_array_equal(assignments, assign_stratified_folds(strata, N_FOLDS, seed=11))
+    assert not np.array_equal(assignments, assign_stratified_folds(strata, N_FOLDS, seed=12))
+
+
+@pytest.mark.parametrize(("n_repeats", "n_folds"), [(0, N_FOLDS), (1, 1)])
+def test_degenerate_settings_are_rejected(n_repeats, n_folds):
+    with pytest.raises(ValueError):
+        run_repeated_cv(n_repeats=n_repeats, n_folds=n_folds)
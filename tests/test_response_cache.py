@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from annotation import llm_clients, response_cache
+from annotation.prompt_builder import AnnotationRequest
+from annotation.registry import annotator_names
+
+
+PARAMS = {"temperature": 0}
+ANSWER = {"awe": 0.5}
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    """A fresh cache database under tmp_path; returns a setter for the cache mode."""
+    monkeypatch.setattr(response_cache, "CACHE_PATH", tmp_path / "llm_cache.sqlite3")
+    monkeypatch.setattr(response_cache, "_CONNECTIONS", {})
+    yield lambda mode: monkeypatch.setattr(response_cache, "CACHE_MODE", mode)
+    for connection in response_cache._CONNECTIONS.values():
+        connection.close()
+
+
+def test_read_through_stores_and_serves(cache_db):
+    cache_db("read_through")
+    assert response_cache.lookup("m", "prompt", PARAMS) is None
+    response_cache.store("m", "prompt", PARAMS, ANSWER, 1.5)
+
+    assert response_cache.lookup("m", "prompt", PARAMS) == ANSWER
+    assert response_cache.lookup("m", "prompt", {"temperature": 1}) is None
+    stats = response_cache.cache_stats()
+    assert stats["path"] == str(response_cache.CACHE_PATH) and stats["entries"] == 1
+    assert stats["models"]["m"] == {"entries": 1, "mean_latency_seconds": 1.5}
+
+
+def test_write_through_refreshes_without_reading(cache_db):
+    cache_db("read_through")
+    response_cache.store("m", "prompt", PARAMS, ANSWER, 1.0)
+
+    cache_db("write_through")
+    assert response_cache.lookup("m", "prompt", PARAMS) is None
+    response_cache.store("m", "prompt", PARAMS, {"awe": 0.9}, 1.0)
+
+    cache_db("read_through")
+    assert response_cache.lookup("m", "prompt", PARAMS) == {"awe": 0.9}
+
+
+def test_replay_serves_hits_and_raises_on_a_miss(cache_db, mock_state, mock_songs):
+    cache_db("read_through")
+    response_cache.store("m", "prompt", PARAMS, ANSWER, 1.0)
+
+    cache_db("replay")
+    assert response_cache.lookup("m", "prompt", PARAMS) == ANSWER
+    response_cache.store("m", "other prompt", PARAMS, ANSWER, 1.0)
+    assert response_cache.cache_stats()["entries"] == 1
+
+    request = AnnotationRequest.from_song(mock_songs[0], annotator_names()[0])
+    with pytest.raises(RuntimeError, match="replay miss"):
+        asyncio.run(llm_clients.call_model_async(request))
+
+
+def test_bypass_neither_reads_nor_writes(cache_db):
+    cache_db("read_through")
+    response_cache.store("m", "prompt", PARAMS, ANSWER, 1.0)
+
+    cache_db("bypass")
+    assert response_cache.lookup("m", "prompt", PARAMS) is None
+    response_cache.store("m", "new prompt", PARAMS, ANSWER, 1.0)
+
+    cache_db("read_through")
+    assert response_cache.lookup("m", "new prompt", PARAMS) is None
+    assert response_cache.cache_stats()["entries"] == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from annotation import routing
+from annotation.routing import EndpointRouter
+
+
+@pytest.fixture
+def no_exploration(monkeypatch):
+    monkeypatch.setattr(routing, "EXPLORE_PROBABILITY", 0.0)
+
+
+def test_single_candidate_is_returned_without_scoring():
+    router = EndpointRouter(seed=0)
+    assert router.choose(["only:free"]) == "only:free"
+    assert router.stats() == {}
+
+
+def test_untried_endpoints_are_tried_in_order(no_exploration):
+    router = EndpointRouter(seed=0)
+    assert router.choose(["a", "b"]) == "a"
+    router.record("a", 1.0, ok=True)
+    assert router.choose(["a", "b"]) == "b"
+
+
+def test_lowest_expected_time_per_valid_answer_wins(no_exploration):
+    router = EndpointRouter(seed=0)
+    router.record("fast", 1.0, ok=True)
+    router.record("slow", 3.0, ok=True)
+    assert router.choose(["fast", "slow"]) == "fast"
+
+    # Errors raise the score: latency / (1 - error rate).
+    for _ in range(5):
+        router.record("fast", None, ok=False)
+    assert router.stats()["fast"]["error_rate_ewma"] == pytest.approx(1 - (1 - routing.EWMA_ALPHA) ** 5)
+    assert router.choose(["fast", "slow"]) == "slow"
+
+
+def test_record_updates_latency_ewma_on_success_only():
+    router = EndpointRouter(seed=0)
+    router.record("a", 2.0, ok=True)
+    router.record("a", 4.0, ok=True)
+    router.record("a", 100.0, ok=False)
+
+    stats = router.stats()["a"]
+    assert stats["calls"] == 3 and stats["errors"] == 1
+    assert stats["latency_ewma"] == pytest.approx(2.0 + routing.EWMA_ALPHA * 2.0)
+
+
+def test_exploration_is_seeded(monkeypatch):
+    monkeypatch.setattr(routing, "EXPLORE_PROBABILITY", 1.0)
+    choices = []
+    for _ in range(2):
+        router = EndpointRouter(seed=3)
+        router.record("a", 1.0, ok=True)
+        router.record("b", 5.0, ok=True)
+        choices.append([router.choose(["a", "b"]) for _ in range(20)])
+    assert choices[0] == choices[1]
+    assert set(choices[0]) == {"a", "b"}
+
+
+def test_free_endpoints_only_without_paid_opt_in(monkeypatch):
+    monkeypatch.setattr(routing, "ALLOW_PAID_ENDPOINTS", False)
+    monkeypatch.setattr(routing, "annotator_config", lambda name: {"endpoints": ["m:free", "m"]})
+    assert routing.routable_endpoints("m") == ["m:free"]
+
+    monkeypatch.setattr(routing, "ALLOW_PAID_ENDPOINTS", True)
+    assert routing.routable_endpoints("m") == ["m:free", "m"]
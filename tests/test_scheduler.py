@@ -0,0 +1,219 @@
+import asyncio
+import random
+
+import pytest
+
+from annotation import scheduler
+from annotation.scheduler import (
+    AdaptiveConcurrency,
+    AsyncScheduler,
+    CircuitBreaker,
+    ProviderPolicy,
+    RunAbortedError,
+    TokenBucket,
+    backoff_delay,
+    classify_error,
+)
+
+
+LIMITS = {"requests_per_minute": 60, "max_concurrency": 4}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0.0
+    assert bucket.take(0.75) == pytest.approx(0.25)
+    # Refills never exceed the capacity.
+    bucket.take(100.0)
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_adaptive_concurrency_halves_once_per_cooldown_and_grows_back():
+    limit = AdaptiveConcurrency(maximum=8, latency_target=10.0)
+
+    limit.on_congestion(now=0.0)
+    assert limit.allowed == 4
+    limit.on_congestion(now=scheduler.DECREASE_COOLDOWN_SECONDS / 2)
+    assert limit.allowed == 4
+    limit.on_success(latency=20.0, now=scheduler.DECREASE_COOLDOWN_SECONDS)
+    assert limit.allowed == 2
+
+    # Additive increase: one slot per window of successes (2 + 1/2 + 1/2.5 + 1/2.9 > 3).
+    for _ in range(3):
+        limit.on_success(latency=1.0, now=100.0)
+    assert limit.allowed == 3
+    for _ in range(100):
+        limit.on_success(latency=1.0, now=100.0)
+    assert limit.allowed == 8
+
+
+def test_adaptive_concurrency_never_drops_below_minimum():
+    limit = AdaptiveConcurrency(maximum=2, minimum=1)
+    for step in range(5):
+        limit.on_congestion(now=step * scheduler.DECREASE_COOLDOWN_SECONDS)
+    assert limit.allowed == 1
+
+
+def test_circuit_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10.0)
+
+    breaker.record_failure(now=0.0)
+    assert breaker.state == "closed" and breaker.allow(now=0.0)
+    breaker.record_failure(now=1.0)
+    assert breaker.state == "open"
+    assert not breaker.allow(now=5.0)
+    assert breaker.retry_in(now=5.0) == pytest.approx(6.0)
+
+    # One probe after the reset timeout; a failed probe reopens at once.
+    assert breaker.allow(now=11.0)
+    assert breaker.state == "half_open"
+    assert not breaker.allow(now=11.0)
+    breaker.record_failure(now=12.0)
+    assert breaker.state == "open" and breaker.open_streak == 2
+
+    assert breaker.allow(now=22.0)
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.open_streak == 0 and breaker.open_count == 2
+
+
+def test_circuit_breaker_exhausts_after_repeated_failed_probes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=1.0)
+    now = 0.0
+    for _ in range(scheduler.BREAKER_MAX_OPENS):
+        breaker.allow(now)
+        breaker.record_failure(now)
+        now += 1.0
+    assert breaker.exhausted
+
+
+def test_backoff_honours_retry_after_and_cap():
+    rng = random.Random(0)
+    assert all(0.0 <= backoff_delay(attempt, None, rng) <= 2 ** attempt for attempt in range(4))
+    assert backoff_delay(0, 30.0, rng) == 30.0
+    assert backoff_delay(20, None, rng) <= scheduler.BACKOFF_CAP_SECONDS
+
+
+@pytest.mark.parametrize(
+    "exc, kind",
+    [
+        (HTTPError(429, {"retry-after": "7"}), "throttled"),
+        (HTTPError(503), "transient"),
+        (HTTPError(408), "transient"),
+        (HTTPError(400), "fatal"),
+        (TimeoutError(), "transient"),
+        (ValueError("bad json"), "invalid"),
+        (RuntimeError("Missing OPENROUTER_API_KEY"), "config"),
+        (KeyError("unexpected"), "fatal"),
+    ],
+)
+def test_classify_error(exc, kind):
+    assert classify_error(exc)[0] == kind
+
+
+def test_retry_after_header_is_read():
+    assert classify_error(HTTPError(429, {"Retry-After": "7"})) == ("throttled", 7.0)
+
+
+@pytest.mark.parametrize("exc", [HTTPError(400), RuntimeError("missing key"), ValueError("bad json")])
+def test_non_provider_errors_do_not_open_the_breaker(exc):
+    policy = ProviderPolicy("p", now=0.0, rate_limited=False, limits=LIMITS, seed=0)
+    for attempt in range(scheduler.BREAKER_FAILURE_THRESHOLD + 1):
+        assert policy.admission_delay(now=0.0) is None
+        policy.on_failure(exc, attempt % 2, now=0.0)
+    assert policy.breaker.state == "closed"
+
+
+def test_provider_errors_open_the_breaker():
+    policy = ProviderPolicy("p", now=0.0, limits=LIMITS, seed=0)
+    for _ in range(scheduler.BREAKER_FAILURE_THRESHOLD):
+        policy.admission_delay(now=0.0)
+        policy.on_failure(HTTPError(503), 0, now=0.0)
+    assert policy.breaker.state == "open"
+
+
+def test_throttling_halves_concurrency_and_retries():
+    policy = ProviderPolicy("p", now=0.0, limits=LIMITS, seed=0)
+    policy.admission_delay(now=0.0)
+    delay = policy.on_failure(HTTPError(429, {"retry-after": "3"}), 0, now=0.0)
+    assert delay >= 3.0
+    assert policy.concurrency.allowed == 2
+    assert policy.stats["throttled"] == 1 and policy.stats["retries"] == 1
+
+
+def test_configuration_error_aborts_every_pending_call():
+    calls = []
+
+    async def call(attempt, endpoint):
+        calls.append(attempt)
+        await asyncio.sleep(0)
+        raise RuntimeError("Missing OPENROUTER_API_KEY")
+
+    async def main():
+        run = AsyncScheduler(["p"], rate_limited=False, limits={"p": {**LIMITS, "max_concurrency": 1}})
+        results = await asyncio.gather(*(run.run("p", call) for _ in range(20)), return_exceptions=True)
+        return run, results
+
+    run, results = asyncio.run(main())
+    assert len(calls) == 1
+    assert isinstance(results[0], RuntimeError) and not isinstance(results[0], RunAbortedError)
+    assert all(isinstance(result, RunAbortedError) for result in results[1:])
+    assert run.policies["p"].breaker.state == "closed"
+
+
+def test_scheduler_retries_transient_errors():
+    outcomes = [HTTPError(503), HTTPError(503), "ok"]
+
+    async def call(attempt, endpoint):
+        outcome = outcomes[attempt]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def no_sleep(seconds):
+        return None
+
+    run = AsyncScheduler(["p"], rate_limited=False, sleep=no_sleep, limits={"p": LIMITS})
+    assert asyncio.run(run.run("p", call)) == "ok"
+    assert run.stats()["p"]["retries"] == 2 and run.stats()["p"]["successes"] == 1
+
+
+def test_failing_endpoint_is_drained_without_stalling_the_provider():
+    attempts = []
+
+    async def call(attempt, endpoint):
+        attempts.append(endpoint)
+        if endpoint == "bad":
+            raise HTTPError(503)
+        return endpoint
+
+    async def no_sleep(seconds):
+        return None
+
+    async def main():
+        run = AsyncScheduler(
+            ["p"],
+            rate_limited=False,
+            sleep=no_sleep,
+            limits={"p": LIMITS},
+            endpoints={"p": ["bad", "good"]},
+            choose=lambda candidates: candidates[0],
+        )
+        results = [await run.run("p", call) for _ in range(20)]
+        return run, results
+
+    run, results = asyncio.run(main())
+    assert results == ["good"] * 20
+    assert attempts.count("bad") == scheduler.BREAKER_FAILURE_THRESHOLD
+    stats = run.stats()
+    assert stats["bad"]["breaker_state"] == "open"
+    assert stats["good"]["breaker_state"] == "closed" and stats["good"]["successes"] == 20
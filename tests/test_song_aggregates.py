@@ -0,0 +1,112 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from evaluation import fold_orchestrator
+from evaluation.fold_orchestrator import EMOTION_COLUMNS
+
+
+SONGS = ["songs/awe\\awe_00001.mp3", "fear/fear_00002.mp3", "sadness/sadness_00003.mp3"]
+USERS = [f"user{index}" for index in range(6)]
+
+
+def _raw_responses(seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    user_data = {}
+    for position, user_id in enumerate(USERS):
+        # The last song is only heard by the first two users, who are both in fold 1.
+        songs = SONGS if position < 2 else SONGS[:2]
+        responses = [
+            {"song": song, "emotionValues": dict(zip(EMOTION_COLUMNS, rng.random(len(EMOTION_COLUMNS)).tolist()))}
+            for song in songs
+        ]
+        responses.append({"song": SONGS[0]})
+        user_data[user_id] = {"emotionResponses": responses}
+    return {"userData": user_data}
+
+
+def _fold_assignments(assignment: list[int]) -> dict:
+    return {"user_ids": USERS, "assignment": assignment, "folds": {str(fold): {} for fold in set(assignment)}}
+
+
+def _expected_means(raw_data: dict, users: set[str]) -> dict:
+    vectors = {}
+    for user_id in users:
+        for response in raw_data["userData"][user_id]["emotionResponses"]:
+            if "emotionValues" in response:
+                song_key = fold_orchestrator._normalize_song_key(response["song"])
+                vectors.setdefault(song_key, []).append([response["emotionValues"][e] for e in EMOTION_COLUMNS])
+    return {song_key: np.mean(values, axis=0) for song_key, values in vectors.items()}
+
+
+def _read_view(path) -> dict:
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return {row["filename"]: [float(row[e]) for e in EMOTION_COLUMNS] for row in csv.DictReader(handle)}
+
+
+@pytest.fixture
+def responses(tmp_path, monkeypatch):
+    """Write the raw responses under tmp_path and point the orchestrator (and its aggregate cache) there."""
+    path = tmp_path / "user_emotion_responses.json"
+    monkeypatch.setattr(fold_orchestrator, "USER_RESPONSES_PATH", path)
+    monkeypatch.setattr(fold_orchestrator, "SONG_AGGREGATES_PATH", tmp_path / "song_aggregates.json")
+
+    def write(raw_data: dict) -> dict:
+        path.write_text(json.dumps(raw_data), encoding="utf-8")
+        return raw_data
+
+    return write
+
+
+def test_human_views_match_a_direct_recomputation(responses, tmp_path):
+    raw_data = responses(_raw_responses())
+    folds = _fold_assignments([1, 1, 2, 2, 3, 3])
+    song_keys = sorted(fold_orchestrator._normalize_song_key(song) for song in SONGS)
+
+    counts = fold_orchestrator.write_human_views(
+        tmp_path / "fold_1",
+        song_keys,
+        fold_orchestrator._load_song_aggregates(folds),
+        fold_number=1,
+    )
+
+    test_users, train_users = set(USERS[:2]), set(USERS[2:])
+    expected = {
+        "human_consensus": _expected_means(raw_data, set(USERS)),
+        "human_test": _expected_means(raw_data, test_users),
+        "human_train_consensus": _expected_means(raw_data, train_users),
+    }
+    for view, means in expected.items():
+        written = _read_view(tmp_path / "fold_1" / f"{view}.csv")
+        assert sorted(written) == sorted(means) and counts[f"{view}_count"] == len(means)
+        for song_key, mean in means.items():
+            np.testing.assert_allclose(written[song_key], mean)
+    # Only fold-1 users heard the last song, so it has no train consensus.
+    assert "sadness/sadness_00003.mp3" not in expected["human_train_consensus"]
+
+
+def test_cached_aggregates_are_rebuilt_when_inputs_change(responses, monkeypatch):
+    builds = []
+    build = fold_orchestrator.build_song_aggregates
+    monkeypatch.setattr(
+        fold_orchestrator,
+        "build_song_aggregates",
+        lambda fold_assignments: builds.append(1) or build(fold_assignments),
+    )
+    responses(_raw_responses())
+    folds = _fold_assignments([1, 1, 2, 2, 3, 3])
+
+    first = fold_orchestrator._load_song_aggregates(folds)
+    assert fold_orchestrator._load_song_aggregates(folds) == first and len(builds) == 1
+
+    responses(_raw_responses(seed=1))
+    changed_responses = fold_orchestrator._load_song_aggregates(folds)
+    assert len(builds) == 2
+    assert changed_responses["user_responses_sha256"] != first["user_responses_sha256"]
+
+    refolded = fold_orchestrator._load_song_aggregates(_fold_assignments([1, 2, 1, 2, 3, 3]))
+    assert len(builds) == 3
+    assert refolded["fold_signature"] != changed_responses["fold_signature"]
+    assert refolded["global"] == changed_responses["global"] and refolded["folds"] != changed_responses["folds"]
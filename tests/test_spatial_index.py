@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from evaluation.constants import EMOTION_COLUMNS
+from evaluation.model import predict_matrix
+from evaluation.spatial_index import KDTree
+
+
+def _brute_force(points: np.ndarray, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    distances = np.sqrt(((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+    indices = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(distances, indices, axis=1), indices
+
+
+@pytest.mark.parametrize("leaf_size", [1, 4, 16])
+@pytest.mark.parametrize("k", [1, 5, 37])
+def test_query_matches_brute_force(leaf_size, k):
+    rng = np.random.default_rng(0)
+    points = rng.random((300, 8))
+    queries = rng.random((50, 8))
+
+    distances, indices = KDTree(points, leaf_size=leaf_size).query(queries, k=k)
+    expected_distances, expected_indices = _brute_force(points, queries, k)
+
+    np.testing.assert_allclose(distances, expected_distances)
+    np.testing.assert_array_equal(indices, expected_indices)
+
+
+def test_query_all_points():
+    points = np.random.default_rng(1).random((20, 3))
+    distances, indices = KDTree(points, leaf_size=2).query(points[:3], k=20)
+
+    assert sorted(indices[0].tolist()) == list(range(20))
+    assert distances[:, 0].tolist() == [0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("k", [0, -1, 21])
+def test_query_rejects_invalid_k(k):
+    tree = KDTree(np.random.default_rng(2).random((20, 3)))
+    with pytest.raises(ValueError):
+        tree.query(np.zeros(3), k=k)
+
+
+def test_query_rejects_empty_tree():
+    with pytest.raises(ValueError):
+        KDTree(np.empty((0, 3))).query(np.zeros(3))
+
+
+def test_ties_and_repeated_queries_match_brute_force():
+    rng = np.random.default_rng(3)
+    # Integer grid points: many equal distances, broken by point index like a stable sort.
+    points = rng.integers(0, 3, size=(200, 4)).astype(float)
+    queries = np.repeat(rng.integers(0, 3, size=(20, 4)).astype(float), 3, axis=0)
+
+    distances, indices = KDTree(points, leaf_size=8).query(queries, k=9)
+    expected_distances, expected_indices = _brute_force(points, queries, 9)
+
+    np.testing.assert_allclose(distances, expected_distances)
+    np.testing.assert_array_equal(indices, expected_indices)
+
+
+def test_knn_predictions_expand_shared_song_vectors():
+    rng = np.random.default_rng(4)
+    train_vectors = rng.random((30, len(EMOTION_COLUMNS)))
+    model = {
+        "model_type": "song_knn_regressor",
+        "k": 3,
+        "song_vectors": train_vectors.tolist(),
+        "listener_means": rng.random((30, len(EMOTION_COLUMNS))).tolist(),
+    }
+    songs = rng.random((5, len(EMOTION_COLUMNS)))
+    rows = rng.integers(5, size=40)
+    matrix = {"song": songs[rows], "true": np.zeros((40, len(EMOTION_COLUMNS)))}
+
+    predictions = predict_matrix(model, matrix)["pred"]
+
+    _, neighbours = _brute_force(train_vectors, songs[rows], 3)
+    expected = np.round(np.clip(np.asarray(model["listener_means"])[neighbours].mean(axis=1), 0.0, 1.0), 6)
+    np.testing.assert_array_equal(predictions, expected)